@@ -0,0 +1,72 @@
+"""Замер задержки инференса на кадр для бэкендов детектора.
+Per-frame inference latency benchmark for the detector backends.
+
+    python counterpick/benchmarks/bench_backends.py --backend onnx --weights counterpick/weights/best.pt
+"""
+import argparse  # Аргументы CLI / CLI arguments
+import statistics  # Перцентили / Percentiles
+import sys
+import time
+from pathlib import Path
+
+import cv2
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "scripts_for_help"))  # Модули детектора / Detector modules
+
+from inference_backends import create_backend  # noqa: E402
+from pick_zones import layout_for, pick_rois  # noqa: E402
+from roi_crop import stack_rois  # noqa: E402
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--backend", default="auto", help="auto | cuda | onnx | torch-cpu")
+    ap.add_argument("--weights", default=str(ROOT / "weights" / "best.pt"))
+    ap.add_argument("--images", default=str(ROOT / "tests" / "fixtures" / "screenshots_sample"))
+    ap.add_argument("--mode", default="roi", choices=("roi", "full"))
+    ap.add_argument("--imgsz", type=int, default=640)
+    ap.add_argument("--int8", action="store_true", help="INT8-квантизация ONNX / INT8 ONNX quantization")
+    ap.add_argument("--threads", type=int, default=0)
+    ap.add_argument("--batch", type=int, default=1, help="кадров на проход / frames per forward pass")
+    ap.add_argument("--runs", type=int, default=50)
+    ap.add_argument("--warmup", type=int, default=5)
+    args = ap.parse_args()
+
+    frames = [cv2.imread(str(p)) for p in sorted(Path(args.images).glob("*.png"))]
+    frames = [f for f in frames if f is not None]
+    if not frames:
+        print(f"no PNG frames in {args.images}", file=sys.stderr)
+        return 1
+    if args.mode == "roi":
+        frames = [stack_rois(f, pick_rois(layout_for(f.shape[1], f.shape[0])))[0] for f in frames]
+
+    t0 = time.perf_counter()
+    backend = create_backend(args.backend, args.weights, args.imgsz, 0.25, 0.6,
+                             int8=args.int8, threads=args.threads)
+    load_s = time.perf_counter() - t0
+
+    def batch_at(i: int):
+        return [frames[(i * args.batch + k) % len(frames)] for k in range(args.batch)]
+
+    for i in range(args.warmup):
+        backend.predict_batch(batch_at(i))
+
+    times_ms = []
+    for i in range(args.runs):
+        t = time.perf_counter()
+        backend.predict_batch(batch_at(i))
+        times_ms.append((time.perf_counter() - t) * 1000.0 / args.batch)  # На кадр / Per frame
+
+    q = statistics.quantiles(times_ms, n=100) if len(times_ms) > 1 else times_ms * 99
+    print(f"backend : {backend.name} | {backend.describe()}")
+    print(f"mode    : {args.mode}, input {frames[0].shape[1]}x{frames[0].shape[0]}, imgsz {args.imgsz}, "
+          f"batch {args.batch}")
+    print(f"load    : {load_s:.2f} s")
+    print(f"latency : mean {statistics.fmean(times_ms):.1f} ms | p50 {q[49]:.1f} | p95 {q[94]:.1f} "
+          f"| min {min(times_ms):.1f} ms per frame over {len(times_ms)} batches")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
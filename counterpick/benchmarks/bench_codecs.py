@@ -0,0 +1,80 @@
+"""Замер форматов кадров захвата: кодирование, чтение детектором и размер файла.
+Capture frame format benchmark: encode, detector-side read and file size.
+
+    python counterpick/benchmarks/bench_codecs.py --runs 20
+"""
+import argparse  # Аргументы CLI / CLI arguments
+import os
+import statistics  # Медианы / Medians
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "scripts_for_help"))  # Модули захвата / Capture modules
+
+from frame_codec import FORMATS, extension, read_frame, write_frame  # noqa: E402
+from pick_zones import layout_for, pick_rois  # noqa: E402
+
+
+def load_frames(folder: str):
+    """BGRA-кадры из PNG-фикстур или синтетический кадр 1920×1080 / BGRA frames from PNG fixtures or a synthetic 1920×1080 frame."""
+    frames = [cv2.imread(str(p)) for p in sorted(Path(folder).glob("*.png"))]
+    frames = [cv2.cvtColor(f, cv2.COLOR_BGR2BGRA) for f in frames if f is not None]
+    if frames:
+        return frames
+    rng = np.random.default_rng(0)
+    frame = np.zeros((1080, 1920, 4), np.uint8)
+    frame[::8, :, :3] = rng.integers(0, 255, (135, 1920, 3), dtype=np.uint8)  # Немного текстуры / Some texture
+    return [frame]
+
+
+def zones_region(frame: np.ndarray):
+    """Область зон пиков как при COUNTERPICK_CAPTURE_REGION=zones / Pick-zone region as with COUNTERPICK_CAPTURE_REGION=zones."""
+    h, w = frame.shape[:2]
+    rois = pick_rois(layout_for(w, h))
+    x1, y1 = max(0, min(r[0] for r in rois)), max(0, min(r[1] for r in rois))
+    x2, y2 = min(w, max(r[2] for r in rois)), min(h, max(r[3] for r in rois))
+    return np.ascontiguousarray(frame[y1:y2, x1:x2]), (x1, y1), (w, h)
+
+
+def bench(fmt: str, frames, runs: int, tmp: str, region: bool):
+    enc_ms, dec_ms, sizes = [], [], []
+    for i in range(runs):
+        frame, origin, full = frames[i % len(frames)], (0, 0), None
+        if region:
+            frame, origin, full = zones_region(frame)
+        path = os.path.join(tmp, f"frame{extension(fmt)}")
+        t = time.perf_counter()
+        sizes.append(write_frame(path, frame, fmt, origin, full))
+        enc_ms.append((time.perf_counter() - t) * 1000.0)
+        t = time.perf_counter()
+        read_frame(path)
+        dec_ms.append((time.perf_counter() - t) * 1000.0)
+        os.remove(path)
+    return statistics.median(enc_ms), statistics.median(dec_ms), statistics.fmean(sizes)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--images", default=str(ROOT / "tests" / "fixtures" / "screenshots_sample"))
+    ap.add_argument("--runs", type=int, default=20)
+    args = ap.parse_args()
+
+    frames = load_frames(args.images)
+    print(f"frames  : {len(frames)} x {frames[0].shape[1]}x{frames[0].shape[0]} BGRA")
+    with tempfile.TemporaryDirectory() as tmp:
+        cases = [(fmt, False) for fmt in FORMATS] + [("raw", True)]
+        for fmt, region in cases:
+            enc, dec, size = bench(fmt, frames, args.runs, tmp, region)
+            name = fmt + (" (zones)" if region else "")
+            print(f"{name:<13}: encode {enc:6.1f} ms | read {dec:6.1f} ms | {size / 1024:8.0f} KiB per frame")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+"""Офлайн-прогон обработки детектора по папке кадров: кадры/с и перцентили стадий по бэкендам, батчам и imgsz.
+Offline replay of the detector processing over a frame folder: fps and stage percentiles per backend, batch and imgsz.
+
+    python counterpick/benchmarks/replay_bench.py --backend onnx --batch 1,4 --imgsz 480,640 --out replay.json
+    python counterpick/benchmarks/replay_bench.py --frames 200 --format raw --baseline old_replay.json
+"""
+import argparse  # Аргументы CLI / CLI arguments
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "scripts_for_help"))  # Модули детектора / Detector modules
+
+from detector_core import Detector  # noqa: E402
+from frame_codec import FORMATS, extension, read_frame, write_frame  # noqa: E402
+from inference_backends import BackendUnavailable  # noqa: E402
+from latency_trace import summarize  # noqa: E402
+
+
+def _ints(text: str):
+    return [int(v) for v in text.split(",") if v.strip()]
+
+
+def build_corpus(images: str, frames: int, fmt: str, out_dir: str, seed: int = 0):
+    """Записать корпус в формате захвата: кадры папки по кругу, повторы — с лёгким шумом яркости.
+    Без картинок — синтетические кадры 1920×1080.
+    Write the corpus in a capture format: folder frames round-robin, repeats get slight brightness noise.
+    Without images — synthetic 1920×1080 frames."""
+    rng = np.random.default_rng(seed)
+    src = [cv2.imread(str(p)) for p in sorted(Path(images).glob("*.png"))]
+    src = [img for img in src if img is not None]
+    if not src:
+        src = [rng.integers(0, 255, (1080, 1920, 3), dtype=np.uint8)]
+    count = frames or len(src)
+    paths = []
+    for i in range(count):
+        img = src[i % len(src)]
+        if i >= len(src):
+            img = cv2.convertScaleAbs(img, alpha=1.0, beta=float(rng.integers(-8, 9)))  # Другой кадр той же сцены / Another frame of the scene
+        path = os.path.join(out_dir, f"{i:08d}{extension(fmt)}")
+        write_frame(path, cv2.cvtColor(img, cv2.COLOR_BGR2BGRA), fmt)
+        paths.append(path)
+    return paths
+
+
+def replay(detector: Detector, paths, batch: int):
+    """Прогон обработки детектора (decode -> roi -> infer -> postprocess) последовательно, с нового драфта.
+    Вернуть (стенное время, записи стадий).
+    Replay the detector processing (decode -> roi -> infer -> postprocess) serially, from a new draft.
+    Return (wall time, stage records)."""
+    detector.reset()
+    records = []
+
+    def rec(i, stage, t0):
+        records.append({"id": str(i), "stage": stage, "t": 0.0, "ms": (time.perf_counter() - t0) * 1000.0})
+
+    wall = time.perf_counter()
+    for start in range(0, len(paths), batch):
+        ids = range(start, min(start + batch, len(paths)))
+        frames, sources, placements = [], [], []
+        for i in ids:
+            t0 = time.perf_counter()
+            frame = read_frame(paths[i])
+            rec(i, "decode", t0)
+            t0 = time.perf_counter()
+            source, placed = detector.prepare(frame)
+            rec(i, "roi", t0)
+            frames.append(frame)
+            sources.append(source)
+            placements.append(placed)
+
+        t0 = time.perf_counter()
+        dets = detector.infer(sources)
+        infer_ms = (time.perf_counter() - t0) * 1000.0
+        for i in ids:
+            records.append({"id": str(i), "stage": "infer", "t": 0.0, "ms": infer_ms})  # Время батча / Batch time
+
+        for i, frame, placed, det in zip(ids, frames, placements, dets):
+            t0 = time.perf_counter()
+            detector.finish(frame, placed, det)
+            rec(i, "postprocess", t0)
+    return time.perf_counter() - wall, records
+
+
+def result_row(backend, imgsz: int, batch: int, mode: str, slot_lock_conf: float, frames: int, wall: float,
+               records) -> dict:
+    """Строка результатов: кадры/с и перцентили стадий / Results row: fps and stage percentiles."""
+    return {"backend": backend.name, "describe": backend.describe(), "imgsz": imgsz,
+            "batch": batch, "mode": mode, "slot_lock_conf": slot_lock_conf, "frames": frames,
+            "fps": round(frames / wall, 2), "stages": summarize(records)}
+
+
+def result_key(row: dict):
+    """Ключ сравнения с --baseline / Comparison key against --baseline."""
+    return row.get("backend"), row.get("imgsz"), row.get("batch"), row.get("mode"), row.get("slot_lock_conf", 0.0)
+
+
+def compare(results, old: dict):
+    """Строки изменения кадров/с против прошлого отчёта / fps change lines against an earlier report."""
+    before = {result_key(r): r for r in old.get("results", []) if "fps" in r}
+    lines = []
+    for r in results:
+        prev = before.get(result_key(r))
+        if prev and "fps" in r:
+            lines.append(f"vs {old.get('meta', {}).get('commit', '?')}: {r['backend']} imgsz {r['imgsz']} "
+                         f"batch {r['batch']}: {prev['fps']:.2f} -> {r['fps']:.2f} fps "
+                         f"({(r['fps'] / prev['fps'] - 1) * 100:+.1f}%)")
+    return lines
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, timeout=5).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--images", default=str(ROOT / "tests" / "fixtures" / "screenshots_sample"))
+    ap.add_argument("--frames", type=int, default=0, help="размер корпуса, 0 — по числу картинок / corpus size, 0 — image count")
+    ap.add_argument("--format", default="png", choices=FORMATS, help="формат файлов корпуса / corpus file format")
+    ap.add_argument("--backend", default="auto", help="через запятую: auto,cuda,onnx,torch-cpu / comma-separated")
+    ap.add_argument("--weights", default=str(ROOT / "weights" / "best.pt"))
+    ap.add_argument("--counters", default=str(ROOT / "scripts_for_help" / "counters.json"))
+    ap.add_argument("--batch", default="1", help="через запятую / comma-separated")
+    ap.add_argument("--imgsz", default="640", help="через запятую / comma-separated")
+    ap.add_argument("--mode", default="roi", choices=("roi", "full"))
+    ap.add_argument("--int8", action="store_true", help="INT8-квантизация ONNX / INT8 ONNX quantization")
+    ap.add_argument("--threads", type=int, default=0)
+    ap.add_argument("--slot-lock-conf", type=float, default=0.0,
+                    help="кэш слотов пиков, 0 — выключен / pick slot cache, 0 disables")
+    ap.add_argument("--repeat", type=int, default=3, help="проходов по корпусу / passes over the corpus")
+    ap.add_argument("--out", default="replay_results.json")
+    ap.add_argument("--baseline", help="прошлый JSON для сравнения кадров/с / previous JSON to compare fps")
+    args = ap.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = build_corpus(args.images, args.frames, args.format, tmp)
+        print(f"corpus  : {len(paths)} frames ({args.format}) from {args.images}")
+        for name in [b.strip() for b in args.backend.split(",") if b.strip()]:
+            for imgsz in _ints(args.imgsz):
+                try:
+                    detector = Detector.load(args.weights, args.counters, name, imgsz, int8=args.int8,
+                                             threads=args.threads, infer_mode=args.mode,
+                                             slot_lock_conf=args.slot_lock_conf)
+                except (BackendUnavailable, ImportError, OSError) as e:
+                    print(f"{name:<10} imgsz {imgsz}: unavailable ({e})")
+                    results.append({"backend": name, "imgsz": imgsz, "error": str(e)})
+                    continue
+                backend = detector.backend
+                for batch in _ints(args.batch):
+                    replay(detector, paths[:batch], batch)  # Прогрев / Warmup
+                    wall, records = 0.0, []
+                    for _ in range(max(1, args.repeat)):
+                        w, r = replay(detector, paths, batch)
+                        wall += w
+                        records += r
+                    row = result_row(backend, imgsz, batch, args.mode, args.slot_lock_conf,
+                                     len(paths) * max(1, args.repeat), wall, records)
+                    results.append(row)
+                    print(f"{backend.name:<10} imgsz {imgsz:<4} batch {batch:<3}: {row['fps']:7.2f} fps | "
+                          + " | ".join(f"{s} p50 {v['p50']:.1f} p95 {v['p95']:.1f}" for s, v in row["stages"].items()))
+
+    report = {
+        "meta": {"commit": git_commit(), "python": platform.python_version(), "platform": platform.platform(),
+                 "cpu_count": os.cpu_count(), "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                 "format": args.format, "corpus_frames": len(paths), "repeat": args.repeat},
+        "results": results,
+    }
+    Path(args.out).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"results : {args.out}")
+
+    if args.baseline:
+        old = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        for line in compare(results, old):
+            print(line)
+    return 0 if any("fps" in r for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,41 @@
+"""Сводка сквозной трассы задержки: p50/p95/p99 по стадиям захват -> детектор -> оверлей.
+End-to-end latency trace summary: p50/p95/p99 per stage, capture -> detector -> overlay.
+
+    python counterpick/benchmarks/trace_summary.py path/to/release [--json summary.json]
+"""
+import argparse  # Аргументы CLI / CLI arguments
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "scripts_for_help"))  # Модули трассы / Trace modules
+
+from latency_trace import format_summary, load_records, summarize  # noqa: E402
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("paths", nargs="+", help="папки с trace_*.jsonl или сами файлы / folders with trace_*.jsonl or the files")
+    ap.add_argument("--json", help="записать сводку в JSON / write the summary as JSON")
+    args = ap.parse_args()
+
+    files = []
+    for p in map(Path, args.paths):
+        files.extend(sorted(p.glob("trace_*.jsonl")) if p.is_dir() else [p])
+    records = load_records(str(f) for f in files)
+    if not records:
+        print("no trace records (run with COUNTERPICK_TRACE=1)", file=sys.stderr)
+        return 1
+
+    summary = summarize(records)
+    print(f"files   : {', '.join(f.name for f in files)}")
+    print(f"frames  : {len({r['id'] for r in records})}")
+    print(format_summary(summary))
+    if args.json:
+        Path(args.json).write_text(json.dumps(summary, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
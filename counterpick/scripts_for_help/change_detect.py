@@ -0,0 +1,59 @@
+import time  # Интервал ключевых кадров / Keyframe interval
+from typing import Optional, Sequence  # Типы для аннотаций / Type hints
+
+import numpy as np  # Дешёвая подпись зон / Cheap zone signature
+
+from pick_zones import Rect  # Прямоугольник экрана / Screen rect
+
+
+class ZoneChangeDetector:
+    """Решает, изменились ли зоны пиков с последнего отправленного кадра.
+    Подпись — прореженные (каждый step-й пиксель) серые значения зон; сравнение —
+    средняя абсолютная разница с подписью последнего ОТПРАВЛЕННОГО кадра, так что
+    медленный дрейф тоже накапливается. Раз в keyframe_interval кадр уходит в любом случае.
+    Decides whether the pick zones changed since the last sent frame.
+    Signature — subsampled (every step-th pixel) gray values of the zones; comparison —
+    mean absolute difference against the signature of the last SENT frame, so slow
+    drift accumulates too. Every keyframe_interval a frame goes through regardless."""
+
+    def __init__(self, rois: Sequence[Rect], step: int = 4, threshold: float = 3.0,
+                 keyframe_interval: float = 10.0):
+        self.rois = list(rois)
+        self.step = max(1, step)
+        self.threshold = threshold                  # Порог в уровнях серого (0..255) / Threshold in gray levels
+        self.keyframe_interval = keyframe_interval  # Принудительный кадр, с / Forced frame period, s
+        self.last_diff = 0.0
+        self.last_reason = ""  # "changed" | "keyframe" | "" (пропуск / skipped)
+        self._prev: Optional[np.ndarray] = None
+        self._last_sent = 0.0
+
+    def signature(self, frame: np.ndarray) -> np.ndarray:
+        """Прореженная серая подпись зон (BGR или BGRA) / Subsampled gray zone signature (BGR or BGRA)."""
+        H, W = frame.shape[:2]
+        parts = []
+        for x1, y1, x2, y2 in self.rois:
+            zone = frame[max(0, y1):min(H, y2):self.step, max(0, x1):min(W, x2):self.step, :3]
+            # Сумма каналов вместо точной яркости — дешевле и достаточно / Channel sum instead of luma — cheaper, enough
+            parts.append(zone.sum(axis=2, dtype=np.int16).ravel())
+        return np.concatenate(parts) if parts else np.zeros(0, np.int16)
+
+    def should_send(self, frame: np.ndarray, now: Optional[float] = None) -> bool:
+        """True — кадр нужно отправить (изменился или пора ключевой кадр).
+        True — the frame must be sent (changed or a keyframe is due)."""
+        now = time.monotonic() if now is None else now
+        sig = self.signature(frame)
+        if self._prev is None or self._prev.shape != sig.shape or self.threshold <= 0:
+            self.last_diff = float("inf")
+        else:
+            # /3: сумма трёх каналов -> уровни серого / /3: sum of three channels -> gray levels
+            self.last_diff = float(np.abs(sig - self._prev).mean()) / 3.0 if len(sig) else 0.0
+        if self.last_diff > self.threshold:
+            self.last_reason = "changed"
+        elif now - self._last_sent >= self.keyframe_interval:
+            self.last_reason = "keyframe"
+        else:
+            self.last_reason = ""
+            return False
+        self._prev = sig
+        self._last_sent = now
+        return True
@@ -0,0 +1,74 @@
+import json  # Загрузка counters.json / Load counters.json
+from typing import Dict, Iterable, List, Optional, Tuple  # Типы для аннотаций / Type hints
+
+import numpy as np  # Плотная матрица очков / Dense score matrix
+
+
+class CounterIndex:
+    """Индекс контрпиков, строится один раз при загрузке.
+    - hero / class_id -> tuple контрпиков, отсортированный по score (по убыванию);
+    - scores[h, c] — очки контрпика c против героя h (0 — нет связи).
+    Counter index, built once at load.
+    - hero / class_id -> tuple of counters sorted by score (descending);
+    - scores[h, c] — score of counter c against hero h (0 — no relation)."""
+
+    def __init__(self, entries: Iterable[Dict], class_names: Optional[Dict[int, str]] = None):
+        entries = [e for e in entries if isinstance(e, dict) and e.get("hero")]
+        self.heroes: Tuple[str, ...] = tuple(e["hero"] for e in entries)   # Порядок строк матрицы / Matrix row order
+        self.hero_ids: Dict[str, int] = {h: i for i, h in enumerate(self.heroes)}
+        self.scores = np.zeros((len(self.heroes), len(self.heroes)), dtype=np.int32)
+
+        self._by_hero: Dict[str, Tuple[str, ...]] = {}
+        for e in entries:
+            pairs: List[Tuple[str, int]] = []
+            for c in e.get("counters", []):
+                # Две формы записи: строка или {counter, score} / Two forms: string or {counter, score}
+                name, score = (c, 0) if isinstance(c, str) else (c.get("counter"), c.get("score") or 0)
+                if name:
+                    pairs.append((name, int(score)))
+            pairs.sort(key=lambda p: -p[1])  # Стабильно: без очков порядок файла / Stable: file order w/o scores
+            self._by_hero[e["hero"]] = tuple(name for name, _ in pairs)
+
+            row = self.hero_ids[e["hero"]]
+            for name, score in pairs:
+                col = self.hero_ids.get(name)
+                if col is not None:
+                    self.scores[row, col] = score
+
+        self._by_class: Dict[int, Tuple[str, ...]] = {}
+        if class_names:
+            self.bind_classes(class_names)
+
+    @classmethod
+    def from_json(cls, path: str, class_names: Optional[Dict[int, str]] = None) -> "CounterIndex":
+        """Загрузить counters.json / Load counters.json."""
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f), class_names)
+
+    def bind_classes(self, class_names: Dict[int, str]) -> None:
+        """Привязать индексы классов модели к героям / Bind model class ids to heroes."""
+        self._by_class = {int(i): self._by_hero.get(name, ()) for i, name in class_names.items()}
+
+    def counters(self, hero: str) -> Tuple[str, ...]:
+        """Контрпики героя по имени (пустой tuple, если героя нет).
+        Counters of a hero by name (empty tuple if unknown)."""
+        return self._by_hero.get(hero, ())
+
+    def counters_for_class(self, cls_id: int) -> Tuple[str, ...]:
+        """Контрпики по индексу класса модели / Counters by model class id."""
+        return self._by_class.get(int(cls_id), ())
+
+    def class_table(self, top: int = 4) -> np.ndarray:
+        """Массив class_id -> топ-N контрпиков для векторного индексирования.
+        Array class_id -> top-N counters for vectorized indexing."""
+        size = (max(self._by_class) + 1) if self._by_class else 0
+        table = np.empty(size, dtype=object)
+        table[:] = [()] * size
+        for cls_id, counters in self._by_class.items():
+            table[cls_id] = counters[:top]
+        return table
+
+    def score(self, hero: str, counter: str) -> int:
+        """Очки контрпика против героя / Score of a counter against a hero."""
+        h, c = self.hero_ids.get(hero), self.hero_ids.get(counter)
+        return 0 if h is None or c is None else int(self.scores[h, c])
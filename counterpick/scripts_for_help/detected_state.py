@@ -0,0 +1,44 @@
+import time  # Окно «записей в минуту» / "Writes per minute" window
+from collections import deque  # Метки последних записей / Recent write stamps
+from typing import Callable, Optional  # Типы для аннотаций / Type hints
+
+
+class DetectedState:
+    """Флаг detected в памяти: запись в overlay_state.json только на переходах.
+    Переход в False — лишь после clear_after подряд пустых кадров (гистерезис),
+    чтобы индикатор не мигал на одиночных промахах модели.
+    In-memory detected flag: overlay_state.json is written on transitions only.
+    Going False takes clear_after consecutive empty frames (hysteresis),
+    so the indicator does not flicker on single model misses."""
+
+    def __init__(self, write: Callable[[bool], None], initial: bool = False, clear_after: int = 3):
+        self._write = write                     # Запись файла состояния / State file writer
+        self.detected = initial
+        self.clear_after = max(1, clear_after)  # Пустых кадров до False / Empty frames before False
+        self.writes = 0
+        self._empty_run = 0
+        self._stamps: deque = deque()           # Время записей за последнюю минуту / Write times over the last minute
+
+    def update(self, detected: bool, now: Optional[float] = None) -> bool:
+        """Учесть кадр; True, если состояние изменилось и было записано.
+        Account for one frame; True if the state changed and was written."""
+        if detected:
+            self._empty_run = 0
+            target = True
+        else:
+            self._empty_run += 1
+            target = self.detected and self._empty_run < self.clear_after  # Держим True до порога / Hold True until the threshold
+        if target == self.detected:
+            return False
+        self._write(target)
+        self.detected = target
+        self.writes += 1
+        self._stamps.append(time.monotonic() if now is None else now)
+        return True
+
+    def writes_per_minute(self, now: Optional[float] = None) -> int:
+        """Сколько записей было за последние 60 с / How many writes in the last 60 s."""
+        now = time.monotonic() if now is None else now
+        while self._stamps and now - self._stamps[0] > 60.0:
+            self._stamps.popleft()
+        return len(self._stamps)
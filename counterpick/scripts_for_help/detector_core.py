@@ -0,0 +1,160 @@
+import time  # Время прогрева / Warmup time
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple  # Типы для аннотаций / Type hints
+
+import numpy as np  # Кадры как массивы / Frames as arrays
+
+from counter_index import CounterIndex  # Индекс контрпиков / Counter index
+from draft_model import DraftModel  # Драфт в памяти / In-memory draft
+from frame_codec import DecodedFrame  # Кадр с началом области / Frame with its region origin
+from frame_processing import detections_to_screen, prepare_frame, prepare_rois  # Обработка кадра / Frame processing
+from inference_backends import Detections, create_backend, empty_detections  # Бэкенды инференса / Inference backends
+from pick_zones import layout_for, pick_slots, slot_strips  # Слоты пиков / Pick slots
+from postprocess import select_heroes  # Векторная постобработка / Vectorized post-processing
+from roi_crop import Placement  # Пересчёт боксов на экран / Box mapping back to the screen
+from slot_cache import SlotCache, SlotPlan  # Кэш заблокированных слотов / Locked slot cache
+
+# === Ядро детектора / Detector core ===
+# Кадр -> снапшот драфта без процесса, файлов и WinAPI: его вызывают процесс детектора,
+# офлайн-бенчмарки и тесты.
+# Frame -> draft snapshot without the process, files or WinAPI: called by the detector process,
+# offline benchmarks and tests.
+
+IMGSZ = 640      # Размер входа модели / Model input size
+CONF = 0.25      # Порог уверенности / Confidence threshold
+IOU = 0.6        # Порог NMS IOU / NMS IoU threshold
+MIN_HEIGHT = 30  # Минимальная высота бокса — меньшие отбрасываем / Min bbox height filter
+TOP_COUNTERS = 4  # Контрпиков на героя в оверлее / Counters per hero in the overlay
+
+
+class Snapshot(NamedTuple):
+    """Итог кадра / Frame outcome.
+    detected — в кадре есть детекции или совпавшие заблокированные слоты (вход гистерезиса detected) /
+               the frame has detections or matching locked slots (input to the detected hysteresis);
+    added — id новых героев драфта / ids of heroes new to the draft;
+    heroes — драфт для оверлея, только если он изменился, иначе None / overlay draft, only when it changed, else None."""
+    detected: bool
+    added: List[int]
+    heroes: Optional[List[Dict]]
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added)
+
+
+class Placed(NamedTuple):
+    """Как вход модели связан с кадром: кропы на холсте и план слотов (None — без кэша слотов).
+    How the model input relates to the frame: crops on the canvas and the slot plan (None — no slot cache)."""
+    placements: List[Placement]
+    slots: Optional[SlotPlan] = None
+
+
+class Detector:
+    """Обработка кадров детектора: вход модели, инференс, боксы на экран, отбор героев и слияние с драфтом.
+    Стадии доступны по отдельности для конвейера (prepare / infer / finish), целиком — через process().
+    Detector frame processing: model input, inference, boxes to screen, hero selection and draft merge.
+    Stages are available separately for the pipeline (prepare / infer / finish), as a whole via process()."""
+
+    def __init__(self, backend, counter_index: CounterIndex, infer_mode: str = "roi",
+                 min_height: int = MIN_HEIGHT, top: int = TOP_COUNTERS, slot_cache: Optional[SlotCache] = None):
+        self.backend = backend
+        self.infer_mode = infer_mode
+        self.min_height = min_height
+        # Только для "roi": весь кадр модель видит целиком / "roi" only: in full mode the model sees the whole frame
+        self.slot_cache = slot_cache if infer_mode == "roi" else None
+        counter_index.bind_classes(backend.names)
+        self.counter_table = counter_index.class_table(top=top)  # Для векторной постобработки / For vectorized post-processing
+        self.draft = DraftModel(backend.names)  # Драфт живёт в памяти / The draft lives in memory
+
+    @classmethod
+    def load(cls, model_path: str, counters_path: str, backend: str = "auto", imgsz: int = IMGSZ,
+             conf: float = CONF, iou: float = IOU, int8: bool = False, threads: int = 0,
+             infer_mode: str = "roi", min_height: int = MIN_HEIGHT, export: str = "none",
+             cache_dir: str = "", slot_lock_conf: float = 0.0) -> "Detector":
+        """Бэкенд и индекс контрпиков из файлов; BackendUnavailable — как у create_backend.
+        slot_lock_conf > 0 — кэш слотов с этим порогом блокировки.
+        Backend and counter index from files; BackendUnavailable as from create_backend.
+        slot_lock_conf > 0 — a slot cache with this lock threshold."""
+        be = create_backend(backend, model_path, imgsz, conf, iou, int8=int8, threads=threads,
+                            export=export, cache_dir=cache_dir)
+        slot_cache = SlotCache(lock_conf=slot_lock_conf) if slot_lock_conf > 0 else None
+        return cls(be, CounterIndex.from_json(counters_path), infer_mode=infer_mode, min_height=min_height,
+                   slot_cache=slot_cache)
+
+    # --- Стадии / Stages ---
+    def prepare(self, frame: DecodedFrame) -> Tuple[Optional[np.ndarray], Placed]:
+        """Вход модели: склеенные полосы пиков или весь кадр. С кэшем слотов — только полосы
+        незаблокированных слотов; None — все слоты заблокированы, модель кадр не видит.
+        Model input: stacked pick strips or the whole frame. With the slot cache — only strips of
+        unlocked slots; None — every slot is locked, the model does not see the frame."""
+        if self.slot_cache is None:
+            return self._prepare_plain(frame)
+        layout = layout_for(*frame.full_size)
+        slots = pick_slots(layout)
+        plan = self.slot_cache.plan(frame, slots)
+        if not plan.inferred:
+            return None, Placed([], plan)
+        source, placements = prepare_rois(frame, slot_strips(slots, plan.inferred, layout.roi_margin))
+        return source, Placed(placements, plan)
+
+    def _prepare_plain(self, frame: DecodedFrame) -> Tuple[np.ndarray, Placed]:
+        source, placements = prepare_frame(frame, self.infer_mode)
+        return source, Placed(placements)
+
+    def infer(self, sources: Sequence[Optional[np.ndarray]]) -> List[Detections]:
+        """Один проход модели на батч; входы None (всё из кэша слотов) модель не видит.
+        One forward pass per batch; None inputs (all from the slot cache) skip the model."""
+        live = [i for i, source in enumerate(sources) if source is not None]
+        if len(live) == len(sources):
+            return self.backend.predict_batch(sources)
+        dets = [empty_detections() for _ in sources]
+        if live:
+            for i, det in zip(live, self.backend.predict_batch([sources[i] for i in live])):
+                dets[i] = det
+        return dets
+
+    def finish(self, frame: DecodedFrame, placed: Placed, det: Detections) -> Snapshot:
+        """Боксы на экран, блокировка слотов, лучший бокс на героя, контрпики и слияние с драфтом.
+        Заблокированные слоты, совпавшие в этом кадре, тоже значат «герои на экране».
+        Boxes to screen, slot locks, best box per hero, counters and the draft merge.
+        Locked slots that matched in this frame also mean "heroes on screen"."""
+        plan = placed.slots
+        cached = plan is not None and plan.cached > 0
+        xyxy = detections_to_screen(det.xyxy, placed.placements, frame.origin)
+        if plan is not None and plan.inferred:
+            self.slot_cache.observe(plan, pick_slots(layout_for(*frame.full_size)), xyxy, det.conf, det.cls,
+                                    self.min_height)
+        if len(det.cls) == 0:
+            return Snapshot(cached, [], None)  # Детекций нет — драфт не трогаем / No detections — draft untouched
+        class_ids, counters, boxes = select_heroes(xyxy, det.conf, det.cls, self.counter_table, self.min_height)
+        # Новые герои — разность множеств id с драфтом / New heroes — set difference of ids against the draft
+        added = self.draft.merge(class_ids, counters, boxes)
+        return Snapshot(True, added, self.draft.to_overlay() if added else None)
+
+    def warmup(self, frame_size: Tuple[int, int] = (1920, 1080), batch: int = 1) -> float:
+        """Прогнать пустой кадр того же размера, что и настоящие: первый проход (выбор ядер, буферы,
+        настройка предиктора) случается до первого кадра драфта. Драфт не трогается; вернуть мс.
+        Run a blank frame of the real size: the first pass (kernel selection, buffers, predictor setup)
+        happens before the first draft frame. The draft is untouched; return ms."""
+        t0 = time.perf_counter()
+        w, h = frame_size
+        blank = DecodedFrame(np.full((h, w, 3), 114, np.uint8), (0, 0), (w, h))
+        source, _ = self._prepare_plain(blank)  # Мимо кэша слотов / Past the slot cache
+        for size in sorted({1, max(1, batch)}):  # Оба размера батча, что будут в работе / Both batch sizes seen at runtime
+            self.infer([source] * size)
+        return (time.perf_counter() - t0) * 1000.0
+
+    # --- Целиком / Whole ---
+    def process_batch(self, frames: Sequence[DecodedFrame]) -> List[Snapshot]:
+        """Кадры по порядку одним проходом модели / Frames in order with one forward pass."""
+        prepared = [self.prepare(f) for f in frames]
+        dets = self.infer([source for source, _ in prepared])
+        return [self.finish(f, placed, det) for f, (_, placed), det in zip(frames, prepared, dets)]
+
+    def process(self, frame: DecodedFrame) -> Snapshot:
+        return self.process_batch([frame])[0]
+
+    def reset(self) -> None:
+        """Новый драфт / A new draft."""
+        self.draft.clear()
+        if self.slot_cache is not None:
+            self.slot_cache.reset()
@@ -0,0 +1,161 @@
+import queue      # Ограниченные очереди между стадиями / Bounded queues between stages
+import threading  # Потоки стадий / Stage threads
+from typing import Any, Callable, Iterable, List, Optional  # Типы для аннотаций / Type hints
+
+# === Конвейер детектора / Detector pipeline ===
+# reader (чтение + декодирование + ROI) -> decoded -> инференс (поток вызывающего) -> results -> publisher
+# reader (read + decode + ROI) -> decoded -> inference (caller's thread) -> results -> publisher
+# Пока модель считает батч, следующий кадр уже декодируется, а предыдущий публикуется и удаляется.
+# Стадии по одному потоку, очереди FIFO — порядок кадров и результаты те же, что у последовательного цикла.
+# While the model runs a batch, the next frame is already being decoded and the previous one published
+# and deleted. One thread per stage and FIFO queues — same frame order and results as the serial loop.
+
+_DONE = object()  # Конец потока результатов / End of the result stream
+
+
+class DetectorPipeline:
+    """Стадии чтения и публикации в своих потоках; инференс забирает кадры через get().
+    cleanup(item) вызывается ровно раз на кадр: после публикации или при выбросе на остановке.
+    Read and publish stages on their own threads; inference takes frames via get().
+    cleanup(item) runs exactly once per frame: after publishing, or when dropped at shutdown."""
+
+    def __init__(self, read: Callable[[float], Optional[Any]], publish: Callable[[Any, Any], None],
+                 cleanup: Optional[Callable[[Any], None]] = None, idle: Optional[Callable[[], None]] = None,
+                 decoded_depth: int = 1, results_depth: int = 2, metrics=None, poll: float = 0.1):
+        self._read = read                                  # read(timeout) -> кадр или None / frame or None
+        self._publish = publish                            # publish(item, result)
+        self._cleanup = cleanup or (lambda item: None)
+        self._idle = idle or (lambda: None)                # Фоновые дела публикатора / Publisher housekeeping
+        self.decoded: "queue.Queue" = queue.Queue(max(1, decoded_depth))
+        self.results: "queue.Queue" = queue.Queue(max(1, results_depth))
+        self.metrics = metrics
+        self.poll = poll                                   # Как часто стадии проверяют остановку / Stop check period
+        self._stop = threading.Event()
+        self._max_depth = {"decoded": 0, "results": 0}
+        self._reader: Optional[threading.Thread] = None
+        self._publisher: Optional[threading.Thread] = None
+
+    # --- Управление / Control ---
+    def start(self) -> "DetectorPipeline":
+        self._reader = threading.Thread(target=self._run_reader, name="detector-reader", daemon=True)
+        self._publisher = threading.Thread(target=self._run_publisher, name="detector-publisher", daemon=True)
+        self._reader.start()
+        self._publisher.start()
+        return self
+
+    @property
+    def stopping(self) -> bool:
+        return self._stop.is_set()
+
+    def stop(self) -> None:
+        """Попросить цикл инференса завершиться (безопасно из обработчика сигнала).
+        Ask the inference loop to finish (safe from a signal handler)."""
+        self._stop.set()
+
+    def close(self, timeout: float = 2.0) -> None:
+        """Остановить чтение, допубликовать готовые результаты, выбросить непрочитанные кадры.
+        Stop reading, publish the results already produced, drop the frames not yet inferred."""
+        self._stop.set()
+        if self._reader is not None:
+            self._reader.join(timeout)
+        if self._publisher is not None:
+            try:
+                self.results.put(_DONE, timeout=timeout)
+            except queue.Full:
+                pass  # Публикатор завис — не ждём его / Publisher hung — don't wait for it
+            self._publisher.join(timeout)
+        for item in self._drain(self.decoded):
+            self._safe_cleanup(item)
+
+    # --- Стадия инференса / Inference stage ---
+    def get(self, timeout: float) -> Optional[Any]:
+        """Следующий подготовленный кадр или None за timeout / Next prepared frame, or None within timeout."""
+        try:
+            item = self.decoded.get(timeout=max(0.0, timeout))
+        except queue.Empty:
+            return None
+        self._depth("decoded", self.decoded)
+        return item
+
+    def put_results(self, items: Iterable[Any], results: Iterable[Any]) -> None:
+        """Передать результаты публикатору по порядку; ждёт, если очередь полна (обратное давление).
+        Hand results to the publisher in order; waits while the queue is full (backpressure)."""
+        for pair in zip(items, results):
+            self.results.put(pair)
+            self._depth("results", self.results)
+
+    # --- Потоки / Threads ---
+    def _run_reader(self) -> None:
+        while not self._stop.is_set():
+            try:
+                item = self._read(self.poll)
+            except Exception:
+                self._count("pipeline_read_errors")
+                self._stop.wait(self.poll)  # Не крутиться на повторяющейся ошибке / Don't spin on a repeating error
+                continue
+            if item is None:
+                continue
+            while True:
+                try:
+                    self.decoded.put(item, timeout=self.poll)
+                    break
+                except queue.Full:
+                    if self._stop.is_set():
+                        self._safe_cleanup(item)  # Кадр так и не попал в модель / The frame never reached the model
+                        return
+            self._depth("decoded", self.decoded)
+
+    def _run_publisher(self) -> None:
+        while True:
+            try:
+                entry = self.results.get(timeout=self.poll)
+            except queue.Empty:
+                entry = None
+            self._safe_idle()
+            if entry is None:
+                continue
+            if entry is _DONE:
+                return
+            self._depth("results", self.results)
+            item, result = entry
+            try:
+                self._publish(item, result)
+            except Exception:
+                self._count("pipeline_publish_errors")
+            finally:
+                self._safe_cleanup(item)
+
+    # --- Помощники / Helpers ---
+    def _safe_cleanup(self, item: Any) -> None:
+        try:
+            self._cleanup(item)
+        except Exception:
+            self._count("pipeline_cleanup_errors")
+
+    def _safe_idle(self) -> None:
+        try:
+            self._idle()
+        except Exception:
+            self._count("pipeline_idle_errors")
+
+    def _depth(self, name: str, q: "queue.Queue") -> None:
+        """Глубина очереди стадии и её максимум / Stage queue depth and its peak."""
+        if self.metrics is None:
+            return
+        depth = q.qsize()
+        self._max_depth[name] = max(self._max_depth[name], depth)
+        self.metrics.set(f"pipeline_{name}_queue", depth)
+        self.metrics.set(f"pipeline_{name}_queue_max", self._max_depth[name])
+
+    def _count(self, name: str) -> None:
+        if self.metrics is not None:
+            self.metrics.inc(name)
+
+    @staticmethod
+    def _drain(q: "queue.Queue") -> List[Any]:
+        out = []
+        while True:
+            try:
+                out.append(q.get_nowait())
+            except queue.Empty:
+                return out
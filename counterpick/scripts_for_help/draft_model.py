@@ -0,0 +1,63 @@
+import time  # Метки времени пиков / Pick timestamps
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple  # Типы для аннотаций / Type hints
+
+
+class HeroPick(NamedTuple):
+    """Герой драфта: класс модели, имя, бокс первого появления, контрпики и время.
+    Draft hero: model class id, name, first-seen box, counters and timestamps."""
+    hero_id: int
+    hero: str
+    box: List[int]
+    counters: Tuple[str, ...]
+    first_seen: float
+    last_seen: float
+
+
+class DraftModel:
+    """Авторитетное состояние драфта в памяти детектора; overlay_data.json — только вывод.
+    Героев не переписываем: бокс и контрпики — с первого появления, как и раньше.
+    Authoritative draft state in detector memory; overlay_data.json is output only.
+    Heroes are never rewritten: box and counters come from the first sighting, as before."""
+
+    def __init__(self, names: Dict[int, str]):
+        self.names = names                      # class_id -> имя героя / class_id -> hero name
+        self._picks: Dict[int, HeroPick] = {}   # Порядок вставки = порядок появления / Insertion order = pick order
+        self.version = 0                        # Растёт при каждом изменении / Bumped on every change
+
+    @property
+    def hero_ids(self) -> Set[int]:
+        return set(self._picks)
+
+    def __len__(self) -> int:
+        return len(self._picks)
+
+    def merge(self, class_ids: Sequence[int], counters: Iterable[Tuple[str, ...]],
+              boxes: Iterable[List[int]], now: Optional[float] = None) -> List[int]:
+        """Влить героев кадра; вернуть id новых (в порядке кадра).
+        Merge a frame's heroes; return the ids of new ones (in frame order)."""
+        now = time.time() if now is None else now
+        new_ids = set(class_ids) - self._picks.keys()  # Новые герои — разность множеств / New heroes — set difference
+        seen_ids = set(class_ids) & self._picks.keys()
+        for hero_id in seen_ids:
+            self._picks[hero_id] = self._picks[hero_id]._replace(last_seen=now)
+        added = []
+        for hero_id, cs, box in zip(class_ids, counters, boxes):
+            if hero_id in new_ids:
+                self._picks[hero_id] = HeroPick(hero_id, self.names[hero_id], list(box), tuple(cs), now, now)
+                added.append(hero_id)
+        if added:
+            self.version += 1
+        return added
+
+    def picks(self) -> List[HeroPick]:
+        return list(self._picks.values())
+
+    def to_overlay(self) -> List[Dict]:
+        """Формат overlay_data.json: [{hero, counters, box}] / overlay_data.json format."""
+        return [{"hero": p.hero, "counters": list(p.counters), "box": list(p.box)} for p in self._picks.values()]
+
+    def clear(self) -> None:
+        """Новый драфт / New draft."""
+        if self._picks:
+            self._picks.clear()
+            self.version += 1
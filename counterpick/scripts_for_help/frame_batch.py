@@ -0,0 +1,24 @@
+import time  # Дедлайн добора батча / Batch fill deadline
+from typing import Callable, List, Optional, TypeVar  # Типы для аннотаций / Type hints
+
+T = TypeVar("T")
+
+
+def collect_batch(first: T, next_item: Callable[[float], Optional[T]], size: int,
+                  deadline: float, clock: Callable[[], float] = time.monotonic) -> List[T]:
+    """Добрать к первому кадру до size-1 следующих, но не дольше deadline секунд.
+    next_item(timeout) ждёт кадр не дольше timeout и возвращает None, если его нет.
+    Порядок кадров сохраняется — публикация идёт в порядке захвата.
+    Top up the first frame with up to size-1 more, waiting no longer than deadline seconds.
+    next_item(timeout) waits at most timeout for a frame and returns None if there is none.
+    Frame order is preserved — results are published in capture order."""
+    batch = [first]
+    end = clock() + deadline
+    while len(batch) < size:
+        remaining = end - clock()
+        if remaining <= 0:
+            break
+        item = next_item(remaining)
+        if item is not None:
+            batch.append(item)
+    return batch
@@ -0,0 +1,122 @@
+import mmap    # Чтение без копии файла / Read without copying the file
+import struct  # Заголовок raw-кадра / Raw frame header
+from typing import NamedTuple, Tuple  # Типы для аннотаций / Type hints
+
+import numpy as np  # Кадры как массивы / Frames as arrays
+
+# cv2 импортируется только для PNG / cv2 is imported for PNG only
+
+# === Форматы кадров в tmp_screenshots / Frame formats in tmp_screenshots ===
+# png      — как раньше, zlib уровень 6 / as before, zlib level 6
+# png-fast — PNG с уровнем 1: в разы быстрее, файл немного больше / level 1: several times faster, slightly bigger
+# npy      — BGRA-массив NumPy без сжатия, детектор читает через mmap / uncompressed NumPy BGRA, mmap-read
+# raw      — BGRA с заголовком 32 Б (размер, начало области, размер полного кадра) /
+#            BGRA with a 32 B header (size, region origin, full frame size)
+FORMATS = ("png", "png-fast", "npy", "raw")
+EXTENSIONS = {"png": ".png", "png-fast": ".png", "npy": ".npy", "raw": ".raw"}
+PNG_LEVELS = {"png": 6, "png-fast": 1}
+
+RAW_MAGIC = b"CPRW"
+RAW_VERSION = 1
+# magic, version, channels, height, width, origin_x, origin_y, full_width, full_height
+_RAW_HEADER = struct.Struct("<4sHHIIiiII")
+RAW_HEADER_SIZE = 32
+
+
+class DecodedFrame(NamedTuple):
+    """Кадр детектора: BGR-изображение, его начало и размер полного рабочего кадра.
+    Для областей (raw) image — только область, координаты переводятся через origin.
+    Detector frame: BGR image, its origin and the full working frame size.
+    For regions (raw) image is the region only, coordinates are mapped via origin."""
+    image: np.ndarray
+    origin: Tuple[int, int]
+    full_size: Tuple[int, int]  # (w, h)
+
+
+def resolve_format(fmt: str) -> str:
+    """Известный формат или png (опечатка в настройке не ломает захват) / Known format or png (a typo doesn't break capture)."""
+    return fmt if fmt in FORMATS else "png"
+
+
+def extension(fmt: str) -> str:
+    """Расширение файла формата / File extension of a format."""
+    return EXTENSIONS[fmt]
+
+
+def format_for_path(path: str) -> str:
+    """Формат по расширению (png и png-fast читаются одинаково) / Format by extension (png and png-fast read alike)."""
+    low = path.lower()
+    for fmt in ("npy", "raw"):
+        if low.endswith(EXTENSIONS[fmt]):
+            return fmt
+    return "png"
+
+
+def write_frame(path: str, frame: np.ndarray, fmt: str, origin: Tuple[int, int] = (0, 0),
+                full_size: Tuple[int, int] = None) -> int:
+    """Записать BGRA-кадр (или область) в path; вернуть размер в байтах.
+    Write a BGRA frame (or region) to path; return the size in bytes."""
+    h, w, c = frame.shape
+    if fmt in PNG_LEVELS:
+        import cv2
+        ok, buf = cv2.imencode(".png", frame[:, :, :3], [cv2.IMWRITE_PNG_COMPRESSION, PNG_LEVELS[fmt]])
+        if not ok:
+            raise ValueError("PNG encoding failed")
+        data = buf.tobytes()
+        with open(path, "wb") as f:
+            f.write(data)
+        return len(data)
+    if fmt == "npy":
+        with open(path, "wb") as f:  # Файловый объект: np.save не добавит .npy к .tmp / File object: np.save won't append .npy
+            np.save(f, np.ascontiguousarray(frame), allow_pickle=False)
+            return f.tell()
+    if fmt == "raw":
+        fw, fh = full_size if full_size is not None else (w, h)
+        header = _RAW_HEADER.pack(RAW_MAGIC, RAW_VERSION, c, h, w, origin[0], origin[1], fw, fh)
+        with open(path, "wb") as f:
+            f.write(header.ljust(RAW_HEADER_SIZE, b"\0"))
+            f.write(np.ascontiguousarray(frame).data)
+            return f.tell()
+    raise ValueError(f"unknown frame format: {fmt!r}")
+
+
+def _to_bgr(view: np.ndarray) -> np.ndarray:
+    """Единственная копия: view файла -> BGR для модели / The only copy: file view -> BGR for the model."""
+    if view.ndim == 3 and view.shape[2] == 4:
+        import cv2
+        return cv2.cvtColor(view, cv2.COLOR_BGRA2BGR)
+    return np.array(view)
+
+
+def read_frame(path: str) -> DecodedFrame:
+    """Прочитать кадр любого формата. npy/raw отображаются в память, копия — только BGR.
+    mmap закрывается до возврата, поэтому файл сразу можно удалить (важно для Windows).
+    Read a frame of any format. npy/raw are memory-mapped, the only copy is the BGR one.
+    The mapping is closed before returning, so the file can be deleted right away (matters on Windows)."""
+    fmt = format_for_path(path)
+    if fmt == "png":
+        import cv2
+        img = cv2.imread(path)
+        if img is None or img.size == 0:
+            raise ValueError(f"cannot decode {path}")
+        return DecodedFrame(img, (0, 0), (img.shape[1], img.shape[0]))
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if fmt == "raw":
+            magic, version, c, h, w, ox, oy, fw, fh = _RAW_HEADER.unpack_from(mm, 0)
+            if magic != RAW_MAGIC or version != RAW_VERSION:
+                raise ValueError(f"not a raw frame: {path}")
+            view = np.frombuffer(mm, dtype=np.uint8, count=h * w * c, offset=RAW_HEADER_SIZE).reshape(h, w, c)
+            origin, full = (ox, oy), (fw, fh)
+        else:
+            version = np.lib.format.read_magic(f)
+            read_header = (np.lib.format.read_array_header_1_0 if version == (1, 0)
+                           else np.lib.format.read_array_header_2_0)
+            shape, fortran, dtype = read_header(f)
+            if fortran or dtype != np.uint8 or len(shape) != 3:
+                raise ValueError(f"unexpected npy frame layout in {path}")
+            view = np.frombuffer(mm, dtype=np.uint8, count=int(np.prod(shape)), offset=f.tell()).reshape(shape)
+            origin, full = (0, 0), (shape[1], shape[0])
+        img = _to_bgr(view)
+        del view  # Отпустить буфер до закрытия mmap / Release the buffer before mmap closes
+    return DecodedFrame(img, origin, full)
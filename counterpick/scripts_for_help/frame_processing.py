@@ -0,0 +1,44 @@
+from typing import List, Sequence, Tuple  # Типы для аннотаций / Type hints
+
+import numpy as np  # Кадры и боксы как массивы / Frames and boxes as arrays
+
+from frame_codec import DecodedFrame  # Кадр с началом области / Frame with its region origin
+from pick_zones import Rect, layout_for, pick_rois  # Таблица раскладки зон / Zone layout table
+from roi_crop import Placement, boxes_to_screen, stack_rois  # Кропы ROI / ROI crops
+
+# Обработка одного кадра без процесса детектора: общая для детектора и офлайн-бенчмарков /
+# Per-frame processing without the detector process: shared by the detector and offline benchmarks
+
+
+def prepare_frame(frame: DecodedFrame, infer_mode: str = "roi") -> Tuple[np.ndarray, List[Placement]]:
+    """Вход модели для кадра: склеенные полосы пиков ("roi") или весь кадр ("full").
+    Кадр уже в рабочем разрешении; раскладка кэшируется по размеру полного кадра,
+    для области (raw) зоны сдвигаются на её начало.
+    Model input for a frame: stacked pick strips ("roi") or the whole frame ("full").
+    The frame is already at working resolution; the layout is cached per full-frame size,
+    for a region (raw) the zones are shifted by its origin."""
+    if infer_mode != "roi":
+        return frame.image, []
+    return prepare_rois(frame, pick_rois(layout_for(*frame.full_size)))
+
+
+def prepare_rois(frame: DecodedFrame, rois: Sequence[Rect]) -> Tuple[np.ndarray, List[Placement]]:
+    """Склеить ROI (в координатах полного рабочего кадра) в вход модели.
+    Stack ROIs (in full working-frame coordinates) into the model input."""
+    img = frame.image
+    ox, oy = frame.origin
+    canvas, placements = stack_rois(img, [(x1 - ox, y1 - oy, x2 - ox, y2 - oy) for x1, y1, x2, y2 in rois])
+    if not placements:
+        return img, []  # Зоны вне кадра — модель видит весь кадр / Zones off-frame — the model sees the whole frame
+    return canvas, placements
+
+
+def detections_to_screen(xyxy: np.ndarray, placements: Sequence[Placement],
+                         origin: Tuple[int, int] = (0, 0)) -> np.ndarray:
+    """Боксы входа модели -> координаты полного рабочего кадра.
+    Model-input boxes -> full working-frame coordinates."""
+    out = boxes_to_screen(xyxy, placements) if placements else np.asarray(xyxy, dtype=np.float32).reshape(-1, 4)
+    if tuple(origin) != (0, 0):
+        # Кадр-область (raw): сдвиг на её начало / Region frame (raw): shift by its origin
+        out = out + np.array(tuple(origin) * 2, dtype=np.float32)
+    return out
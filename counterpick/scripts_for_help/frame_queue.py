@@ -0,0 +1,204 @@
+import heapq      # Очередь имён по порядку / Ordered queue of names
+import os         # Работа с файловой системой / File system operations
+import select     # Ожидание событий inotify / Waiting for inotify events
+import struct     # Разбор inotify_event / Parse inotify_event
+import sys        # Определение платформы / Platform detection
+import threading  # Поток наблюдателя / Watcher thread
+import time       # Метка сессии и таймауты / Session stamp and timeouts
+from typing import List, Optional, Set  # Типы для аннотаций / Type hints
+
+# === Протокол имён кадров / Frame naming protocol ===
+# <сессия мс>_<номер>.png: лексикографический порядок = порядок захвата, без stat() /
+# <session ms>_<seq>.png: lexicographic order = capture order, no stat() needed
+# Захват пишет в <имя>.tmp и переименовывает — событие rename = кадр готов /
+# Capture writes <name>.tmp and renames it — the rename event means the frame is complete
+TMP_SUFFIX = ".tmp"
+
+
+def new_session_id() -> int:
+    """Метка сессии захвата (мс с эпохи) / Capture session stamp (ms since epoch)."""
+    return time.time_ns() // 1_000_000
+
+
+def frame_filename(session: int, seq: int, ext: str = ".png") -> str:
+    """Имя кадра с монотонным номером / Frame name with a monotonic sequence number."""
+    return f"{session:013d}_{seq:08d}{ext}"
+
+
+def is_sequenced(name: str) -> bool:
+    """Имя соответствует протоколу (значит, файл уже дописан).
+    Name follows the protocol (so the file is already complete)."""
+    stem = os.path.splitext(name)[0]
+    parts = stem.split("_")
+    return len(parts) == 2 and all(p.isdigit() for p in parts)
+
+
+def count_ready(directory: str, ext: str = ".png") -> int:
+    """Сколько готовых кадров лежит в папке (listdir без stat()).
+    How many ready frames are in the folder (listdir without stat())."""
+    return sum(1 for n in os.listdir(directory) if n.endswith(ext) and is_sequenced(n))
+
+
+def publish_frame(tmp_path: str) -> str:
+    """Переименовать дописанный .tmp в итоговое имя / Rename a finished .tmp to its final name."""
+    final = tmp_path[:-len(TMP_SUFFIX)]
+    os.replace(tmp_path, final)
+    return final
+
+
+class FrameDirWatcher:
+    """Очередь готовых кадров в папке по событиям ФС вместо опроса scandir.
+    Linux — inotify, Windows — ReadDirectoryChangesW, иначе редкий listdir без stat().
+    Queue of ready frames in a folder driven by FS events instead of scandir polling.
+    Linux — inotify, Windows — ReadDirectoryChangesW, otherwise a cheap listdir without stat()."""
+
+    def __init__(self, directory: str, suffix: str = ".png"):
+        self.directory = directory
+        self.suffix = suffix.lower()
+        self._heap: list = []          # Имена по порядку / Names in order
+        self._known: Set[str] = set()   # В очереди или в работе — защита от дублей / Queued or in flight — dedup guard
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.mode = "poll"
+
+    # --- Очередь / Queue ---
+    def _accept(self, name: str) -> bool:
+        low = name.lower()
+        return low.endswith(self.suffix) and not low.endswith(TMP_SUFFIX)
+
+    def push(self, name: str) -> None:
+        """Добавить готовый кадр (из события или явного сигнала).
+        Enqueue a ready frame (from an event or an explicit signal)."""
+        if not self._accept(name):
+            return
+        with self._cond:
+            if name in self._known:
+                return
+            self._known.add(name)
+            heapq.heappush(self._heap, name)
+            self._cond.notify()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[str]:
+        """Самый ранний готовый кадр (полный путь) или None по таймауту.
+        Кадр остаётся «в работе», пока не вызван done().
+        Earliest ready frame (full path) or None on timeout.
+        The frame stays "in flight" until done() is called."""
+        with self._cond:
+            if not self._heap:
+                self._cond.wait(timeout)
+            if not self._heap:
+                return None
+            name = heapq.heappop(self._heap)
+        return os.path.join(self.directory, name)
+
+    def done(self, path: str) -> None:
+        """Кадр обработан и удалён — имя можно принять снова.
+        Frame processed and removed — the name may be accepted again."""
+        with self._cond:
+            self._known.discard(os.path.basename(path))
+
+    def trim(self, depth: int) -> List[str]:
+        """Оставить в очереди только depth самых свежих кадров; вернуть выброшенные пути.
+        Keep only the depth newest frames queued; return the dropped paths."""
+        dropped = []
+        with self._cond:
+            if len(self._heap) > depth:
+                ordered = sorted(self._heap)
+                dropped, self._heap = ordered[:-depth], ordered[-depth:]  # Отсортированный список — куча / A sorted list is a heap
+        return [os.path.join(self.directory, n) for n in dropped]
+
+    def pending(self) -> int:
+        """Сколько кадров ждёт / How many frames are waiting."""
+        with self._cond:
+            return len(self._heap)
+
+    # --- Наблюдатель / Watcher ---
+    def start(self) -> "FrameDirWatcher":
+        """Подобрать уже лежащие кадры и запустить поток событий.
+        Pick up frames already present and start the event thread."""
+        for name in os.listdir(self.directory):
+            self.push(name)
+        if sys.platform.startswith("linux"):
+            target, self.mode = self._run_inotify, "inotify"
+        elif sys.platform.startswith("win"):
+            target, self.mode = self._run_windows, "ReadDirectoryChangesW"
+        else:
+            target = self._run_poll
+        self._thread = threading.Thread(target=self._guarded(target), name="frame-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+
+    def _guarded(self, target):
+        def run():
+            try:
+                target()
+            except Exception:
+                # Нет API событий (нет pywin32 и т.п.) — деградируем до опроса /
+                # No event API (no pywin32 etc.) — degrade to polling
+                self.mode = "poll"
+                self._run_poll()
+        return run
+
+    def _run_poll(self, interval: float = 0.2) -> None:
+        # listdir без stat(): порядок задают имена / listdir without stat(): names define the order
+        while not self._stop.wait(interval):
+            for name in os.listdir(self.directory):
+                self.push(name)
+
+    def _run_inotify(self) -> None:
+        import ctypes
+        libc = ctypes.CDLL(None, use_errno=True)
+        IN_CLOSE_WRITE, IN_MOVED_TO = 0x00000008, 0x00000080
+        fd = libc.inotify_init()
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init failed")
+        try:
+            wd = libc.inotify_add_watch(fd, os.fsencode(self.directory), IN_CLOSE_WRITE | IN_MOVED_TO)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), "inotify_add_watch failed")
+            for name in os.listdir(self.directory):
+                self.push(name)  # Кадры между start() и add_watch / Frames between start() and add_watch
+            header = struct.Struct("iIII")
+            while not self._stop.is_set():
+                ready, _, _ = select.select([fd], [], [], 0.5)
+                if not ready:
+                    continue
+                buf = os.read(fd, 64 * 1024)
+                pos = 0
+                while pos + header.size <= len(buf):
+                    _, _, _, length = header.unpack_from(buf, pos)
+                    raw = buf[pos + header.size:pos + header.size + length]
+                    pos += header.size + length
+                    self.push(os.fsdecode(raw.rstrip(b"\0")))
+        finally:
+            os.close(fd)
+
+    def _run_windows(self) -> None:
+        import win32con
+        import win32file
+        FILE_LIST_DIRECTORY = 0x0001
+        FILE_ACTION_ADDED, FILE_ACTION_RENAMED_NEW_NAME = 1, 5
+        handle = win32file.CreateFile(
+            self.directory, FILE_LIST_DIRECTORY,
+            win32con.FILE_SHARE_READ | win32con.FILE_SHARE_WRITE | win32con.FILE_SHARE_DELETE,
+            None, win32con.OPEN_EXISTING, win32con.FILE_FLAG_BACKUP_SEMANTICS, None,
+        )
+        try:
+            for name in os.listdir(self.directory):
+                self.push(name)  # Кадры до подписки / Frames before subscribing
+            while not self._stop.is_set():
+                # Блокирующий вызов: поток daemon, выход процесса его прерывает /
+                # Blocking call: the thread is a daemon, process exit interrupts it
+                changes = win32file.ReadDirectoryChangesW(
+                    handle, 64 * 1024, False, win32con.FILE_NOTIFY_CHANGE_FILE_NAME, None, None)
+                for action, name in changes:
+                    if action in (FILE_ACTION_ADDED, FILE_ACTION_RENAMED_NEW_NAME):
+                        self.push(name)
+        finally:
+            win32file.CloseHandle(handle)
@@ -0,0 +1,225 @@
+import os      # Случайный id сессии писателя / Random writer session id
+import struct  # Упаковка заголовков / Header packing
+import time    # Метки времени кадров / Frame timestamps
+from multiprocessing import shared_memory  # Общая память между процессами / Cross-process shared memory
+from typing import NamedTuple, Optional    # Типы для аннотаций / Type hints
+
+import numpy as np  # Представление слотов как массивов / Slots as NumPy views
+
+# === Раскладка общей памяти / Shared memory layout ===
+# [глобальный заголовок 64 Б][слот 0: заголовок 64 Б + кадр]...[слот N-1]
+# [global header 64 B][slot 0: 64 B header + frame]...[slot N-1]
+MAGIC = b"CPFR"    # Сигнатура кольца / Ring signature
+VERSION = 2        # Версия формата / Layout version
+
+# magic, version, slots, height, width, channels, head_seq, read_seq
+_GLOBAL = struct.Struct("<4sHHIIIQQ")
+GLOBAL_SIZE = 64
+_HEAD_OFFSET = _GLOBAL.size - 16  # Последний записанный кадр / Last written frame
+_READ_OFFSET = _GLOBAL.size - 8   # Последний взятый читателем / Last frame taken by the reader
+# Сессия писателя: новая при каждом create — перезапущенный захват виден читателю /
+# Writer session: new on every create — a restarted capture is visible to the reader
+_SESSION_OFFSET = 40
+
+# seq, timestamp, height, width
+_SLOT = struct.Struct("<QdII")
+SLOT_HEADER_SIZE = 64
+
+_U64 = struct.Struct("<Q")  # Одиночный счётчик / Single counter
+
+
+class RingFrame(NamedTuple):
+    """Кадр из кольца: номер, время захвата и view на данные слота.
+    Ring frame: sequence number, capture time and a view of the slot data."""
+    seq: int
+    timestamp: float
+    image: np.ndarray
+
+
+def _open_existing(name: str) -> shared_memory.SharedMemory:
+    """Подключиться к чужому сегменту, не отдавая его resource_tracker.
+    Attach to a foreign segment without handing it to the resource tracker."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        # Иначе трекер удалит сегмент при выходе читателя (POSIX) — не регистрируемся /
+        # Otherwise the tracker unlinks the segment when the reader exits (POSIX) — skip registration
+        from multiprocessing import resource_tracker
+        register = resource_tracker.register
+        resource_tracker.register = lambda *args, **kwargs: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+class _RingBase:
+    """Общая логика разметки слотов / Shared slot layout logic."""
+
+    def __init__(self, shm: shared_memory.SharedMemory, slots: int, height: int, width: int, channels: int):
+        self._shm = shm
+        self.slots = slots
+        self.height = height
+        self.width = width
+        self.channels = channels
+        self.frame_bytes = height * width * channels                 # Размер кадра / Frame size
+        self.slot_stride = SLOT_HEADER_SIZE + self.frame_bytes       # Шаг слота / Slot stride
+        self._buf = np.ndarray((shm.size,), dtype=np.uint8, buffer=shm.buf)  # Весь сегмент / Whole segment
+
+    def _slot_offset(self, seq: int) -> int:
+        return GLOBAL_SIZE + ((seq - 1) % self.slots) * self.slot_stride
+
+    def _slot_view(self, seq: int, height: int, width: int) -> np.ndarray:
+        start = self._slot_offset(seq) + SLOT_HEADER_SIZE
+        flat = self._buf[start:start + self.frame_bytes]
+        return flat.reshape(self.height, self.width, self.channels)[:height, :width]
+
+    def _read_slot_header(self, seq: int):
+        return _SLOT.unpack_from(self._shm.buf, self._slot_offset(seq))
+
+    @property
+    def head_seq(self) -> int:
+        """Номер последнего опубликованного кадра / Last published sequence number."""
+        return _U64.unpack_from(self._shm.buf, _HEAD_OFFSET)[0]
+
+    @property
+    def read_seq(self) -> int:
+        """Номер последнего кадра, взятого читателем / Last sequence number taken by the reader."""
+        return _U64.unpack_from(self._shm.buf, _READ_OFFSET)[0]
+
+    @property
+    def session(self) -> int:
+        """Сессия писателя, создавшего кольцо / Session of the writer that created the ring."""
+        return _U64.unpack_from(self._shm.buf, _SESSION_OFFSET)[0]
+
+    @property
+    def pending(self) -> int:
+        """Кадры, которые читатель ещё не взял / Frames the reader has not taken yet."""
+        return max(0, self.head_seq - self.read_seq)
+
+    def close(self) -> None:
+        """Освободить view и закрыть сегмент / Drop views and close the segment."""
+        self._buf = None
+        try:
+            self._shm.close()
+        except BufferError:
+            pass  # Кто-то ещё держит view — закроется сборщиком / Someone holds a view — GC will close it
+
+
+class FrameRingWriter(_RingBase):
+    """Писатель кольца (процесс захвата). Создаёт и удаляет сегмент.
+    Ring writer (capture process). Creates and unlinks the segment."""
+
+    @classmethod
+    def create(cls, name: str, slots: int, height: int, width: int, channels: int = 4) -> "FrameRingWriter":
+        size = GLOBAL_SIZE + slots * (SLOT_HEADER_SIZE + height * width * channels)
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # Остаток после падения или прошлого запуска — пересоздаём / Leftover of a crash or a previous run — recreate
+            stale = _open_existing(name)
+            try:
+                stale.unlink()
+            except FileNotFoundError:
+                pass
+            try:
+                shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+                stale.close()
+            except FileExistsError:
+                # Windows: имя живёт, пока читатель держит старый сегмент — берём его, если влезаем /
+                # Windows: the name lives while a reader holds the old segment — reuse it if we fit
+                if stale.size < size:
+                    stale.close()
+                    raise
+                shm = stale
+        _GLOBAL.pack_into(shm.buf, 0, MAGIC, VERSION, slots, height, width, channels, 0, 0)
+        _U64.pack_into(shm.buf, _SESSION_OFFSET, int.from_bytes(os.urandom(8), "little") | 1)  # Не 0 / Never 0
+        return cls(shm, slots, height, width, channels)
+
+    def write(self, frame: np.ndarray, timestamp: Optional[float] = None) -> int:
+        """Скопировать кадр в следующий слот и опубликовать его номер.
+        Copy the frame into the next slot and publish its sequence number."""
+        h, w = frame.shape[:2]
+        if h > self.height or w > self.width or frame.shape[2] != self.channels:
+            raise ValueError(f"frame {frame.shape} does not fit ring slot {self.height}x{self.width}x{self.channels}")
+        seq = self.head_seq + 1
+        off = self._slot_offset(seq)
+        _U64.pack_into(self._shm.buf, off, 0)                  # 0 = слот пишется / 0 = slot being written
+        np.copyto(self._slot_view(seq, h, w), frame)            # Копия кадра / Frame copy
+        ts = time.time() if timestamp is None else timestamp
+        _SLOT.pack_into(self._shm.buf, off, seq, ts, h, w)     # Публикуем слот / Publish slot
+        _U64.pack_into(self._shm.buf, _HEAD_OFFSET, seq)       # Публикуем голову / Publish head
+        return seq
+
+    def unlink(self) -> None:
+        """Удалить сегмент из системы / Remove the segment from the system."""
+        try:
+            self._shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class FrameRingReader(_RingBase):
+    """Читатель кольца (детектор). Отдаёт кадры как view без копирования.
+    Ring reader (detector). Hands out frames as zero-copy views."""
+
+    name = ""              # Имя кольца для проверки перезапуска / Ring name for the restart check
+    attached_session = 0   # Сессия на момент подключения / Session at attach time
+
+    @classmethod
+    def attach(cls, name: str) -> Optional["FrameRingReader"]:
+        """Подключиться к кольцу; None, если писатель ещё не создал его.
+        Attach to the ring; None if the writer has not created it yet."""
+        try:
+            shm = _open_existing(name)
+        except FileNotFoundError:
+            return None
+        magic, version, slots, height, width, channels, _, _ = _GLOBAL.unpack_from(shm.buf, 0)
+        if magic != MAGIC or version != VERSION or slots == 0:
+            shm.close()
+            return None
+        reader = cls(shm, slots, height, width, channels)
+        reader.name = name
+        reader.attached_session = reader.session
+        return reader
+
+    def replaced(self) -> bool:
+        """Перезапущен ли писатель: сессия в нашем сегменте сменилась (Windows — сегмент взят заново)
+        или имя ведёт к сегменту другой сессии (POSIX — наш сегмент удалён и создан новый).
+        Whether the writer restarted: the session in our segment changed (Windows — the segment was reused)
+        or the name leads to a segment of another session (POSIX — ours was unlinked and a new one created)."""
+        if self.session != self.attached_session:
+            return True
+        try:
+            probe = _open_existing(self.name)
+        except FileNotFoundError:
+            return False  # Захват не запущен — ждём на старом / Capture is down — keep waiting on the old one
+        try:
+            magic = bytes(probe.buf[:4])
+            return magic == MAGIC and _U64.unpack_from(probe.buf, _SESSION_OFFSET)[0] != self.attached_session
+        finally:
+            probe.close()
+
+    def read_next(self, last_seq: int, depth: Optional[int] = None) -> Optional[RingFrame]:
+        """Следующий кадр после last_seq (или самый старый из живых), иначе None.
+        depth — оставить только depth последних кадров (keep-latest), старые пропустить.
+        Next frame after last_seq (or the oldest still alive), else None.
+        depth — keep only the depth most recent frames (keep-latest), skip older ones."""
+        head = self.head_seq
+        if head <= last_seq:
+            return None  # Новых кадров нет / No new frames
+        window = self.slots if depth is None else min(depth, self.slots)
+        seq = max(last_seq + 1, head - window + 1)  # Перезаписанные/устаревшие пропускаем / Skip overwritten/stale
+        slot_seq, ts, h, w = self._read_slot_header(seq)
+        if slot_seq != seq:
+            return None  # Слот сейчас пишется / Slot is being written
+        return RingFrame(seq, ts, self._slot_view(seq, h, w))
+
+    def ack(self, seq: int) -> None:
+        """Сообщить писателю, что кадр взят (для обратного давления).
+        Tell the writer the frame was taken (for backpressure)."""
+        _U64.pack_into(self._shm.buf, _READ_OFFSET, seq)
+
+    def is_current(self, frame: RingFrame) -> bool:
+        """Не перезаписан ли слот, пока мы его читали / Whether the slot survived our read."""
+        return self._read_slot_header(frame.seq)[0] == frame.seq
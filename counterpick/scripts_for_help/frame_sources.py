@@ -0,0 +1,170 @@
+import os    # Удаление кадров / Frame removal
+import time  # Ожидание кадров / Waiting for frames
+from typing import Optional, Tuple  # Типы для аннотаций / Type hints
+
+import cv2  # BGRA -> BGR для модели / BGRA -> BGR for the model
+
+from frame_codec import DecodedFrame, read_frame  # Форматы файлов кадров / Frame file formats
+from frame_queue import FrameDirWatcher, is_sequenced  # Очередь кадров по событиям ФС / FS-event frame queue
+from frame_ring import FrameRingReader  # Кольцевой буфер кадров / Frame ring buffer
+from latency_trace import TraceWriter, trace_id_for, trace_id_from_path  # Трасса задержки / Latency trace
+
+
+class FrameSource:
+    """Кадры детектора: кольцо в общей памяти ("shm") с запасным режимом через папку, либо папка ("png").
+    Держит не больше keep свежих кадров, старые выбрасывает (frames_dropped).
+    Detector frames: the shared-memory ring ("shm") with a folder fallback, or the folder ("png").
+    Keeps at most keep fresh frames and drops stale ones (frames_dropped)."""
+
+    def __init__(self, transport: str, ring_name: str, save_dir: str, ext: str, keep: int,
+                 metrics=None, tracer: Optional[TraceWriter] = None, reattach_after: float = 1.0):
+        self.transport = transport
+        self.ring_name = ring_name
+        self.keep = keep
+        self.metrics = metrics
+        self.tracer = tracer or TraceWriter("", enabled=False)
+        self.ring_reader: Optional[FrameRingReader] = None  # Подключение к кольцу / Ring attachment
+        self.last_ring_seq = 0                              # Последний прочитанный кадр / Last consumed frame
+        self.reattach_after = reattach_after                # Тишина до проверки перезапуска захвата, с / Silence before checking for a capture restart, s
+        self._ring_quiet_since = 0.0
+        # Готовые кадры приходят событиями ФС, а не опросом scandir / Ready frames arrive via FS events, not scandir polling
+        self.watcher = FrameDirWatcher(save_dir, ext).start()
+
+    def _inc(self, name: str, n: int = 1) -> None:
+        if self.metrics is not None:
+            self.metrics.inc(name, n)
+
+    def _set(self, name: str, value) -> None:
+        if self.metrics is not None:
+            self.metrics.set(name, value)
+
+    # --- Кольцо / Ring ---
+    def next_ring_frame(self) -> Optional[Tuple[DecodedFrame, str]]:
+        """Следующий кадр из общей памяти как BGR и его id трассы, либо None.
+        Next frame from shared memory as BGR plus its trace id, or None."""
+        if self.ring_reader is None:
+            self.ring_reader = FrameRingReader.attach(self.ring_name)  # Захват ещё мог не стартовать / Capture may not be up yet
+            if self.ring_reader is None:
+                return None
+        reader = self.ring_reader
+        self._set("queue_pending", reader.pending)
+        # Только keep свежих кадров, старые выбрасываем / Only keep latest frames, stale ones dropped
+        frame = reader.read_next(self.last_ring_seq, depth=self.keep)
+        if frame is None:
+            if self._check_ring_restart(reader) and self.ring_reader is not None:
+                return self.next_ring_frame()  # Сразу из нового кольца / Straight from the new ring
+            return None
+        self._ring_quiet_since = 0.0
+        if self.last_ring_seq:
+            self._inc("frames_dropped", frame.seq - self.last_ring_seq - 1)
+        self.last_ring_seq = frame.seq
+        # id как у захвата: время кадра из заголовка слота + номер / Same id as capture: slot header time + seq
+        trace_id = trace_id_for(int(frame.timestamp * 1000), frame.seq)
+        with self.tracer.span(trace_id, "decode"):
+            # Единственная копия: BGRA view -> BGR для модели / The only copy: BGRA view -> BGR for the model
+            img = cv2.cvtColor(frame.image, cv2.COLOR_BGRA2BGR)
+        current = reader.is_current(frame)
+        # ack только после проверки: до копии слот ещё наш / ack only after the check: until the copy the slot is ours
+        reader.ack(frame.seq)  # Захват видит, что очередь освободилась / Capture sees the queue drained
+        if not current:
+            self._inc("frames_dropped")  # Слот перезаписан во время чтения / Slot overwritten while reading
+            return None
+        return DecodedFrame(img, (0, 0), (img.shape[1], img.shape[0])), trace_id
+
+    def _check_ring_restart(self, reader: FrameRingReader) -> bool:
+        """Голова ниже прочитанного сразу, а тишина дольше reattach_after — раз в этот интервал — ведут к
+        проверке сессии писателя; перезапущенный захват — переподключиться с начала.
+        A head below what we read at once, and silence longer than reattach_after — once per that interval —
+        lead to a writer session check; a restarted capture — reattach from the start. True — reattached."""
+        now = time.monotonic()
+        if reader.head_seq >= self.last_ring_seq:
+            if not self._ring_quiet_since:
+                self._ring_quiet_since = now
+                return False
+            if now - self._ring_quiet_since < self.reattach_after:
+                return False
+            self._ring_quiet_since = now  # Следующая проверка — через интервал / Next check — after an interval
+        if not reader.replaced():
+            return False
+        reader.close()
+        self.ring_reader = FrameRingReader.attach(self.ring_name)
+        self.last_ring_seq = 0
+        self._ring_quiet_since = 0.0
+        self._inc("ring_reattached")
+        return True
+
+    # --- Папка / Folder ---
+    def discard(self, filepath: str) -> None:
+        """Удалить кадр и отпустить его имя в очереди / Delete a frame and release its name in the queue."""
+        try:
+            os.remove(filepath)
+        except Exception:
+            pass
+        self.watcher.done(filepath)
+
+    def next_file_frame(self, timeout: float) -> Tuple[Optional[DecodedFrame], Optional[str]]:
+        """Самый ранний готовый кадр из папки: (frame, path), или (None, None) по таймауту.
+        Earliest ready frame from the folder: (frame, path), or (None, None) on timeout."""
+        # Держим не больше keep кадров: старые выбрасываем, берём свежие /
+        # Keep at most keep frames: drop stale ones, keep the latest
+        for stale in self.watcher.trim(self.keep):
+            self.discard(stale)
+            self._inc("frames_dropped")
+        self._set("queue_pending", self.watcher.pending())
+
+        filepath = self.watcher.get(timeout)
+        if filepath is None:
+            return None, None
+
+        # Кадры по протоколу появляются переименованием — уже дописаны. Чужие файлы
+        # (скопированные вручную) проверяем по размеру, чтобы не ловить «сырой» PNG /
+        # Protocol frames appear by rename — already complete. Foreign files
+        # (copied by hand) get the size check so we don't catch a half-written PNG
+        if not is_sequenced(os.path.basename(filepath)):
+            for _ in range(10):  # до ~1 сек ожидания
+                try:
+                    size = os.path.getsize(filepath)
+                except FileNotFoundError:
+                    size = 0
+                if size >= 5000:
+                    break
+                time.sleep(0.1)
+            else:
+                # Если после всех попыток файл всё ещё маленький — удаляем и пропускаем
+                self.discard(filepath)
+                return None, None
+
+        # Читаем кадр ОДИН раз (npy/raw — через mmap, без декодирования) /
+        # Read the frame ONCE (npy/raw via mmap, no decoding)
+        try:
+            with self.tracer.span(trace_id_from_path(filepath), "decode"):
+                frame = read_frame(filepath)
+        except (OSError, ValueError):
+            self.discard(filepath)  # удалить битый
+            return None, None
+        return frame, filepath
+
+    # --- Общий вход / Common entry ---
+    def next(self, timeout: float) -> Optional[Tuple[DecodedFrame, Optional[str], str]]:
+        """Следующий кадр из активного источника: (frame, path или None, id трассы), либо None за timeout.
+        Next frame from the active source: (frame, path or None, trace id), or None within timeout."""
+        if self.transport == "shm":
+            deadline = time.monotonic() + timeout
+            while True:
+                got = self.next_ring_frame()  # Кадр из общей памяти / Frame from shared memory
+                if got is not None:
+                    return got[0], None, got[1]
+                if self.ring_reader is None:
+                    break  # Кольца ещё нет — запасной режим через папку / No ring yet — folder fallback
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                time.sleep(min(0.01, remaining))  # Чтение заголовка дешёвое / Header read is cheap
+        # Папка: ждём события, а не спим / Folder: wait for an event instead of sleeping
+        frame, filepath = self.next_file_frame(timeout)
+        return None if frame is None else (frame, filepath, trace_id_from_path(filepath))
+
+    def close(self) -> None:
+        if self.ring_reader is not None:
+            self.ring_reader.close()  # Отключиться от общей памяти / Detach from shared memory
+        self.watcher.close()          # Остановить наблюдатель папки / Stop the folder watcher
@@ -1,7 +1,6 @@
 import sys  # системные параметры и путь к exe / system parameters and path to exe
 import os  # работа с файлами и путями / file and path operations
 import subprocess  # запуск внешних процессов / run external processes
-import psutil  # контроль и завершение процессов / control and terminate processes
 import ctypes  # доступ к WinAPI / access to WinAPI
 from ctypes import wintypes  # типы данных WinAPI / WinAPI data types
 import shutil  # копирование и удаление папок / copy and remove directories
@@ -16,6 +15,8 @@ from PyQt5.QtGui import (  # графические классы Qt / Qt graphic
     QMouseEvent, QFont, QIcon, QPainter, QColor, QPen
 )
 from PyQt5.QtCore import Qt  # базовые константы Qt / basic Qt constants
+from runtime_config import REPORT_MEMORY  # общие настройки / shared settings
+from memory_report import MemoryReport  # RSS процесса / process RSS
 
 # Функции WinAPI для фокусировки уже запущенного процесса / WinAPI functions to focus an already running process
 user32 = ctypes.WinDLL('user32', use_last_error=True)  # загрузка user32.dll с прокидыванием последней ошибки / load user32.dll with last-error propagation
@@ -38,6 +39,11 @@ detector_exe = os.path.join(BASE_DIR, 'screenshot_detector.exe')  # exe для 
 overlay_exe = os.path.join(BASE_DIR, 'overlay_window.exe')  # exe для оверлея контрпиков / exe for overlay display
 icon_path = os.path.join(BASE_DIR, 'launcher_icon.ico')  # иконка лаунчера / launcher window icon
 
+# --report-memory: отчёт о RSS лаунчера, флаг передаётся детектору и оверлею /
+# --report-memory: launcher RSS report, the flag is passed on to the detector and the overlay
+report_memory = REPORT_MEMORY or "--report-memory" in sys.argv
+child_args = ["--report-memory"] if report_memory else []  # аргументы детектора и оверлея / detector and overlay args
+
 
 def _on_rm_error(func, path, exc_info):  # обработчик ошибок при удалении / error handler for deletion
     """
@@ -306,11 +312,11 @@ class MainWindow(QMainWindow):  # главное окно лаунчера / mai
                 # отдельная группа процессов / separate process group
             )
             self.detector_proc = subprocess.Popen(  # запускаем детектор / start detector
-                [detector_exe], creationflags=subprocess.CREATE_NEW_PROCESS_GROUP
+                [detector_exe, *child_args], creationflags=subprocess.CREATE_NEW_PROCESS_GROUP
                 # отдельная группа процессов / separate process group
             )
             self.overlay_proc = subprocess.Popen(  # запускаем оверлей / start overlay
-                [overlay_exe], creationflags=subprocess.CREATE_NEW_PROCESS_GROUP
+                [overlay_exe, *child_args], creationflags=subprocess.CREATE_NEW_PROCESS_GROUP
                 # отдельная группа процессов / separate process group
             )
         except Exception as e:
@@ -322,6 +328,7 @@ class MainWindow(QMainWindow):  # главное окно лаунчера / mai
         self.stop_button.setEnabled(True)  # разрешаем STOP / enable STOP
 
     def stop_processes(self):  # остановить все процессы и сбросить состояние / stop all processes and reset state
+        import psutil  # нужен только при остановке — не держим в памяти лаунчера заранее / only needed on stop — not loaded upfront
         # Остановить процессы (+дети) / Terminate processes (+children)
         for proc in (self.screenshot_proc, self.detector_proc,
                      self.overlay_proc):  # обходим три процесса / iterate three processes
@@ -403,4 +410,14 @@ if __name__ == "__main__":  # точка входа при прямом запу
 
     server.newConnection.connect(handle_new_connection)  # подписка на новые подключения / connect new-connection signal
 
-    sys.exit(app.exec_())  # запускаем цикл обработки событий / start Qt event loop
+    memory = MemoryReport("launcher", os.path.join(BASE_DIR, "memory_launcher.json"), enabled=report_memory)
+    if memory.enabled:
+        from PyQt5.QtCore import QTimer  # таймер замеров только для отчёта / sampling timer only for the report
+        QTimer.singleShot(0, memory.mark_ready)  # окно показано — пик старта / window shown — startup peak
+        memory_timer = QTimer()
+        memory_timer.timeout.connect(memory.maybe_sample)
+        memory_timer.start(int(memory.interval * 1000))
+
+    code = app.exec_()  # запускаем цикл обработки событий / start Qt event loop
+    memory.report("exit")  # итог по памяти / memory summary
+    sys.exit(code)
@@ -0,0 +1,115 @@
+import os  # Список иконок / Icon listing
+from collections import OrderedDict  # LRU масштабированных вариантов / LRU of scaled variants
+from typing import Dict, Iterable, List, Optional, Sequence  # Типы для аннотаций / Type hints
+
+# Qt импортируется внутри IconAtlas: помощники ниже работают без PyQt5 (тесты) /
+# Qt is imported inside IconAtlas: the helpers below work without PyQt5 (tests)
+
+# Высоты иконок квантуются в корзины: живая высота бокса не плодит варианты /
+# Icon heights are quantized into buckets: live box height does not breed variants
+ICON_HEIGHT_BUCKETS = (16, 20, 24, 28, 32, 38, 44, 52, 60)
+MAX_VARIANTS = 128  # Предел масштабированных вариантов в памяти / Cap on scaled variants in memory
+ICON_EXTENSIONS = (".jpg",)
+
+
+def quantize_height(h: int, buckets: Sequence[int] = ICON_HEIGHT_BUCKETS) -> int:
+    """Ближайшая корзина высоты (при равенстве — бóльшая) / Nearest height bucket (larger on ties)."""
+    return min(buckets, key=lambda b: (abs(b - h), -b))
+
+
+def scan_icons(folder: str, extensions: Iterable[str] = ICON_EXTENSIONS) -> Dict[str, str]:
+    """Имя героя -> путь иконки; один listdir на старте / Hero name -> icon path; one listdir at startup."""
+    exts = tuple(e.lower() for e in extensions)
+    try:
+        names = sorted(os.listdir(folder))
+    except OSError:
+        return {}
+    return {os.path.splitext(n)[0]: os.path.join(folder, n) for n in names if n.lower().endswith(exts)}
+
+
+class LRUCache:
+    """Ограниченный кэш: при переполнении вытесняется давно не использованный.
+    Bounded cache: the least recently used entry is evicted on overflow."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = max(1, maxsize)
+        self._items: OrderedDict = OrderedDict()
+
+    def get(self, key):
+        item = self._items.get(key)
+        if item is not None:
+            self._items.move_to_end(key)
+        return item
+
+    def put(self, key, value) -> None:
+        self._items[key] = value
+        self._items.move_to_end(key)
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class IconAtlas:
+    """Все иконки героев, декодированные один раз в одну текстуру (сетка ячеек icon_w × max корзины).
+    Варианты под корзину высоты вырезаются из атласа и держатся в LRU.
+    All hero icons decoded once into one texture (a grid of icon_w × largest-bucket cells).
+    Per-bucket variants are cut from the atlas and kept in an LRU."""
+
+    def __init__(self, folder: str, icon_w: int, buckets: Sequence[int] = ICON_HEIGHT_BUCKETS,
+                 max_variants: int = MAX_VARIANTS, columns: int = 16):
+        from PyQt5.QtCore import QRect, Qt
+        from PyQt5.QtGui import QImage, QPainter, QPixmap
+
+        self.icon_w = icon_w
+        self.buckets = tuple(sorted(buckets))
+        self.cell_h = self.buckets[-1]                 # Ячейка — под самую большую корзину / Cell fits the largest bucket
+        self.variants = LRUCache(max_variants)
+        self.broken: List[str] = []                    # Файлы, которые не декодировались / Files that failed to decode
+        self._qt_rect, self._qt = QRect, Qt
+
+        paths = scan_icons(folder)
+        rows = max(1, -(-len(paths) // columns))
+        self.atlas = QPixmap(columns * icon_w, rows * self.cell_h)
+        self.atlas.fill(Qt.transparent)
+        self._cells: Dict[str, "QRect"] = {}
+        painter = QPainter(self.atlas)
+        for i, (name, path) in enumerate(paths.items()):
+            img = QImage(path)
+            if img.isNull():
+                self.broken.append(name)
+                continue
+            row, col = divmod(i, columns)
+            cell = QRect(col * icon_w, row * self.cell_h, icon_w, self.cell_h)
+            painter.drawImage(cell, img.scaled(icon_w, self.cell_h, Qt.IgnoreAspectRatio, Qt.SmoothTransformation))
+            self._cells[name] = cell
+        painter.end()
+
+    @property
+    def names(self):
+        return self._cells.keys()
+
+    def has(self, name: str) -> bool:
+        """Есть ли иконка (без обращения к диску) / Whether an icon exists (no disk access)."""
+        return name in self._cells
+
+    def missing(self, names: Iterable[str]) -> List[str]:
+        """Герои без иконки — для одного предупреждения на старте / Heroes without an icon — for one startup warning."""
+        return sorted({n for n in names if n not in self._cells})
+
+    def icon(self, name: str, height: int) -> Optional["QPixmap"]:
+        """Иконка icon_w × корзина(height) или None, если иконки нет.
+        Icon of icon_w × bucket(height), or None if there is no icon."""
+        cell = self._cells.get(name)
+        if cell is None:
+            return None
+        h = quantize_height(height, self.buckets)
+        key = (name, h)
+        pm = self.variants.get(key)
+        if pm is None:
+            pm = self.atlas.copy(cell)
+            if h != self.cell_h:
+                pm = pm.scaled(self.icon_w, h, self._qt.IgnoreAspectRatio, self._qt.SmoothTransformation)
+            self.variants.put(key, pm)
+        return pm
@@ -0,0 +1,366 @@
+import ast   # Разбор метаданных ONNX (names) / Parse ONNX metadata (names)
+import os    # Пути к экспортированным моделям / Exported model paths
+import sys   # Имя библиотеки драйвера CUDA / CUDA driver library name
+from typing import Dict, List, NamedTuple, Sequence, Tuple  # Типы для аннотаций / Type hints
+
+import numpy as np  # Массивы боксов / Box arrays
+
+from model_cache import artifact_path, store, weights_hash  # Кэш экспортов по хэшу весов / Export cache keyed by the weights hash
+
+# Тяжёлые зависимости (torch, ultralytics, onnxruntime) импортируются внутри бэкендов /
+# Heavy dependencies (torch, ultralytics, onnxruntime) are imported inside backends
+
+
+class Detections(NamedTuple):
+    """Результат одного кадра в общем формате для всех бэкендов.
+    One frame result in a backend-neutral format."""
+    xyxy: np.ndarray  # (N, 4) float32, координаты источника / source coordinates
+    conf: np.ndarray  # (N,) float32
+    cls: np.ndarray   # (N,) int64
+
+
+def empty_detections() -> Detections:
+    """Пустой результат / Empty result."""
+    return Detections(np.zeros((0, 4), np.float32), np.zeros((0,), np.float32), np.zeros((0,), np.int64))
+
+
+class BackendUnavailable(RuntimeError):
+    """Бэкенд не может работать на этой машине / Backend cannot run on this machine."""
+
+
+# === Ultralytics (CUDA или CPU) / Ultralytics (CUDA or CPU) ===
+class UltralyticsBackend:
+    """Исходный путь: YOLO из best.pt, на CUDA (FP16) или на CPU.
+    Original path: YOLO from best.pt, on CUDA (FP16) or on CPU."""
+
+    def __init__(self, model_path: str, imgsz: int, conf: float, iou: float, device: str = "cuda"):
+        import torch
+        from ultralytics import YOLO
+
+        self._torch = torch
+        self.imgsz, self.conf, self.iou = imgsz, conf, iou
+        self.cuda = device == "cuda"
+        if self.cuda:
+            check_cuda()  # Бросит BackendUnavailable / Raises BackendUnavailable
+        self.name = "cuda" if self.cuda else "torch-cpu"
+
+        self.model = YOLO(model_path)  # Загрузить YOLO веса / Load YOLO weights
+        self.model.to("cuda" if self.cuda else "cpu")
+        torch.set_grad_enabled(False)  # Отключаем градиенты / Disable gradients for speed & memory
+        self.names: Dict[int, str] = dict(self.model.names)
+
+    def describe(self) -> str:
+        """Строка для лога о железе / Hardware line for the log."""
+        torch = self._torch
+        if self.cuda:
+            return f"cuda:{torch.cuda.current_device()} {torch.cuda.get_device_name(0)} torch {torch.__version__}"
+        return f"cpu torch {torch.__version__}"
+
+    def predict(self, img: np.ndarray) -> Detections:
+        return self.predict_batch([img])[0]
+
+    def predict_batch(self, imgs: Sequence[np.ndarray]) -> List[Detections]:
+        """Несколько кадров за один проход модели, результаты в том же порядке.
+        Several frames in one forward pass, results in the same order."""
+        with self._torch.inference_mode():  # Без построения графа / No graph building
+            results = self.model.predict(
+                source=list(imgs),                # Кадры как numpy-массивы / Frames as numpy arrays
+                imgsz=self.imgsz,                 # Размер входа / Input size
+                conf=self.conf,                   # Порог уверенности / Confidence threshold
+                iou=self.iou,                     # Порог NMS IoU / NMS IoU
+                device=0 if self.cuda else "cpu",
+                half=self.cuda,                   # FP16 только на GPU / FP16 on GPU only
+                batch=len(imgs),                  # Один батч на все кадры / One batch for all frames
+                verbose=False,                    # Без лишнего лога / No console logs
+            )
+        return [_boxes_to_detections(r.boxes) for r in results]
+
+
+def _boxes_to_detections(boxes) -> Detections:
+    """Boxes Ultralytics -> Detections / Ultralytics Boxes -> Detections."""
+    if boxes is None or len(boxes) == 0:
+        return empty_detections()
+    return Detections(
+        boxes.xyxy.cpu().numpy().astype(np.float32),
+        boxes.conf.cpu().numpy().astype(np.float32),
+        boxes.cls.cpu().numpy().astype(np.int64),
+    )
+
+
+def cuda_devices() -> int:
+    """Число CUDA-устройств по драйверу (nvcuda.dll / libcuda) через ctypes, без torch; 0 — драйвера или устройств нет.
+    CUDA device count from the driver (nvcuda.dll / libcuda) via ctypes, without torch; 0 — no driver or devices."""
+    import ctypes
+    win = sys.platform.startswith("win")
+    for lib_name in (("nvcuda.dll",) if win else ("libcuda.so.1", "libcuda.so")):
+        try:
+            lib = ctypes.WinDLL(lib_name) if win else ctypes.CDLL(lib_name)
+        except OSError:
+            continue
+        count = ctypes.c_int(0)
+        try:
+            # 0 — CUDA_SUCCESS; CUDA_VISIBLE_DEVICES учитывается драйвером / CUDA_VISIBLE_DEVICES is honoured by the driver
+            if lib.cuInit(0) != 0 or lib.cuDeviceGetCount(ctypes.byref(count)) != 0:
+                return 0
+        except AttributeError:
+            return 0
+        return count.value
+    return 0
+
+
+def check_cuda() -> None:
+    """Проверка CUDA с пробной аллокацией / CUDA check with a test allocation."""
+    try:
+        import torch
+        # Базовая проверка доступности CUDA / Basic CUDA availability
+        if not torch.cuda.is_available() or torch.cuda.device_count() == 0:
+            raise RuntimeError("CUDA not available (no device)")
+        # Доп. проверка аллокации на GPU / Extra safety: try to allocate on GPU
+        torch.zeros(1, device="cuda")
+    except Exception as e:
+        raise BackendUnavailable(str(e)) from e
+
+
+# === Экспорт в кэш / Export into the cache ===
+def export_torchscript(model_path: str, imgsz: int, cache_dir: str = "") -> str:
+    """TorchScript FP16 для CUDA, один раз на хэш весов и imgsz / TorchScript FP16 for CUDA, once per weights hash and imgsz."""
+    target = artifact_path(model_path, f"{imgsz}.fp16.torchscript", cache_dir)
+    if not os.path.exists(target):
+        from ultralytics import YOLO
+        exported = YOLO(model_path).export(format="torchscript", imgsz=imgsz, half=True, device=0, verbose=False)
+        store(exported, target)
+    return target
+
+
+def export_onnx(model_path: str, imgsz: int, int8: bool = False, cache_dir: str = "") -> str:
+    """Экспортировать best.pt в ONNX (и INT8) один раз на хэш весов и imgsz; готовый экспорт берётся из кэша.
+    Export best.pt to ONNX (and INT8) once per weights hash and imgsz; a finished export comes from the cache."""
+    digest = weights_hash(model_path)  # Один раз на оба артефакта / Once for both artifacts
+    fp32_path = artifact_path(model_path, f"{imgsz}.onnx", cache_dir, digest)
+    target = artifact_path(model_path, f"{imgsz}.int8.onnx", cache_dir, digest) if int8 else fp32_path
+
+    if not os.path.exists(fp32_path):
+        from ultralytics import YOLO
+        exported = YOLO(model_path).export(format="onnx", imgsz=imgsz, dynamic=False, verbose=False)
+        store(exported, fp32_path)
+
+    if int8 and not os.path.exists(target):
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        tmp = target + ".tmp"
+        quantize_dynamic(fp32_path, tmp, weight_type=QuantType.QUInt8)  # Веса в INT8 / INT8 weights
+        store(tmp, target)
+    return target
+
+
+# === ONNX Runtime (CPU) ===
+def letterbox(img: np.ndarray, size: int) -> Tuple[np.ndarray, float, Tuple[float, float]]:
+    """Вписать кадр в квадрат size×size с серыми полями, как в Ultralytics.
+    Fit the frame into a size×size square with gray padding, as Ultralytics does."""
+    import cv2
+    h, w = img.shape[:2]
+    gain = min(size / h, size / w)
+    nh, nw = int(round(h * gain)), int(round(w * gain))
+    pad_y, pad_x = (size - nh) / 2, (size - nw) / 2
+    resized = cv2.resize(img, (nw, nh), interpolation=cv2.INTER_LINEAR) if (nh, nw) != (h, w) else img
+    top, left = int(round(pad_y - 0.1)), int(round(pad_x - 0.1))
+    out = cv2.copyMakeBorder(resized, top, size - nh - top, left, size - nw - left,
+                             cv2.BORDER_CONSTANT, value=(114, 114, 114))
+    return out, gain, (left, top)
+
+
+def decode_yolo_output(out: np.ndarray, conf: float, iou: float) -> Detections:
+    """Разобрать выход YOLOv8 (1, 4+nc, N) одного кадра: фильтр по уверенности и NMS по классам.
+    Decode one frame of YOLOv8 output (1, 4+nc, N): confidence filter and per-class NMS."""
+    import cv2
+    pred = out[0].T                                   # (N, 4+nc)
+    scores = pred[:, 4:]
+    cls = scores.argmax(axis=1)
+    best = scores[np.arange(len(cls)), cls]
+    keep = best >= conf
+    if not keep.any():
+        return empty_detections()
+    pred, cls, best = pred[keep], cls[keep], best[keep]
+
+    cx, cy, w, h = pred[:, 0], pred[:, 1], pred[:, 2], pred[:, 3]
+    xywh = np.stack([cx - w / 2, cy - h / 2, w, h], axis=1)
+    idx = cv2.dnn.NMSBoxesBatched(xywh.tolist(), best.tolist(), cls.tolist(), conf, iou)
+    idx = np.asarray(idx, dtype=np.int64).reshape(-1)
+
+    xyxy = np.stack([xywh[:, 0], xywh[:, 1], xywh[:, 0] + xywh[:, 2], xywh[:, 1] + xywh[:, 3]], axis=1)
+    return Detections(xyxy[idx].astype(np.float32), best[idx].astype(np.float32), cls[idx].astype(np.int64))
+
+
+class OnnxBackend:
+    """ONNX Runtime на CPU, модель экспортируется из best.pt один раз.
+    ONNX Runtime on CPU, the model is exported from best.pt once."""
+
+    def __init__(self, onnx_path: str, imgsz: int, conf: float, iou: float, threads: int = 0):
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise BackendUnavailable("onnxruntime is not installed") from e
+
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads > 0:
+            opts.intra_op_num_threads = threads  # 0 = решает ORT / 0 = ORT decides
+        self.session = ort.InferenceSession(onnx_path, opts, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+        batch_dim = self.session.get_inputs()[0].shape[0]
+        self.max_batch = batch_dim if isinstance(batch_dim, int) else None  # None = динамический / None = dynamic
+        self.imgsz = int(self.session.get_inputs()[0].shape[-1] or imgsz)  # Экспорт фиксирует размер / Export fixes the size
+        self.conf, self.iou = conf, iou
+        self.name = "onnx-int8" if onnx_path.endswith(".int8.onnx") else "onnx"
+        self.artifact = onnx_path
+        self._ort_version = ort.__version__
+
+        meta = self.session.get_modelmeta().custom_metadata_map  # Ultralytics кладёт names сюда / Ultralytics stores names here
+        self.names: Dict[int, str] = ast.literal_eval(meta["names"]) if "names" in meta else {}
+
+    def describe(self) -> str:
+        return f"cpu onnxruntime {self._ort_version} ({self.name}, imgsz={self.imgsz})"
+
+    def predict(self, img: np.ndarray) -> Detections:
+        return self.predict_batch([img])[0]
+
+    def predict_batch(self, imgs: Sequence[np.ndarray]) -> List[Detections]:
+        """Несколько кадров одним run(), если вход модели допускает батч; иначе по одному.
+        Several frames in one run() if the model input allows a batch; otherwise one by one."""
+        boxed = [letterbox(img, self.imgsz) for img in imgs]
+        blob = np.stack([b[0] for b in boxed])[..., ::-1].transpose(0, 3, 1, 2)  # BGR->RGB, NHWC->NCHW
+        blob = np.ascontiguousarray(blob, dtype=np.float32) / 255.0
+        if self.max_batch is None or len(imgs) <= self.max_batch:
+            out = self.session.run(None, {self.input_name: blob})[0]
+        else:
+            # Экспорт с фиксированным batch=1 — отдельный run() на кадр /
+            # Export with a fixed batch=1 — one run() per frame
+            out = np.concatenate([self.session.run(None, {self.input_name: blob[i:i + 1]})[0]
+                                  for i in range(len(imgs))])
+        results = []
+        for i, (_, gain, (left, top)) in enumerate(boxed):
+            det = decode_yolo_output(out[i:i + 1], self.conf, self.iou)
+            if len(det.cls):
+                # Снять letterbox: обратно в координаты источника / Undo letterbox: back to source coords
+                det.xyxy[:, [0, 2]] -= left
+                det.xyxy[:, [1, 3]] -= top
+                det.xyxy[:] /= gain
+            results.append(det)
+        return results
+
+
+# === TorchScript FP16 (CUDA) ===
+class TorchScriptBackend:
+    """Закэшированный TorchScript FP16 на CUDA: только torch, без ultralytics (и его matplotlib/pandas).
+    Предобработка и NMS — те же, что у ONNX. Экспорт с batch=1, поэтому батч идёт по кадру.
+    Cached TorchScript FP16 on CUDA: torch only, no ultralytics (nor its matplotlib/pandas).
+    Pre-processing and NMS are the ONNX ones. The export has batch=1, so a batch runs frame by frame."""
+
+    def __init__(self, ts_path: str, imgsz: int, conf: float, iou: float):
+        import json
+        import torch
+
+        check_cuda()  # Бросит BackendUnavailable / Raises BackendUnavailable
+        self._torch = torch
+        extra = {"config.txt": ""}  # Ultralytics кладёт метаданные (names) сюда / Ultralytics stores metadata (names) here
+        self.model = torch.jit.load(ts_path, map_location="cuda", _extra_files=extra).eval()
+        meta = json.loads(extra["config.txt"] or "{}")
+        self.names: Dict[int, str] = {int(k): v for k, v in meta.get("names", {}).items()}
+        self.imgsz = int((meta.get("imgsz") or [imgsz])[0])  # Экспорт фиксирует размер / The export fixes the size
+        self.conf, self.iou = conf, iou
+        self.name = "cuda"
+        self.artifact = ts_path
+        torch.set_grad_enabled(False)
+
+    def describe(self) -> str:
+        torch = self._torch
+        return (f"cuda:{torch.cuda.current_device()} {torch.cuda.get_device_name(0)} torch {torch.__version__} "
+                f"(torchscript fp16, imgsz={self.imgsz})")
+
+    def predict(self, img: np.ndarray) -> Detections:
+        return self.predict_batch([img])[0]
+
+    def predict_batch(self, imgs: Sequence[np.ndarray]) -> List[Detections]:
+        torch = self._torch
+        results = []
+        with torch.inference_mode():
+            for img in imgs:
+                boxed, gain, (left, top) = letterbox(img, self.imgsz)
+                x = torch.from_numpy(np.ascontiguousarray(boxed[..., ::-1].transpose(2, 0, 1)))  # BGR->RGB, HWC->CHW
+                x = x.to("cuda", non_blocking=True).half().div_(255.0).unsqueeze(0)
+                out = self.model(x)
+                out = out[0] if isinstance(out, (list, tuple)) else out
+                det = decode_yolo_output(out.float().cpu().numpy(), self.conf, self.iou)
+                if len(det.cls):
+                    # Снять letterbox / Undo letterbox
+                    det.xyxy[:, [0, 2]] -= left
+                    det.xyxy[:, [1, 3]] -= top
+                    det.xyxy[:] /= gain
+                results.append(det)
+        return results
+
+
+# === Выбор бэкенда / Backend selection ===
+def probe_backend() -> str:
+    """Лучший доступный бэкенд: cuda → onnx → torch-cpu. Сначала драйвер без torch: torch, однажды
+    импортированный, остаётся в памяти и тогда, когда выбран onnx.
+    Best available backend: cuda → onnx → torch-cpu. The driver is asked first, without torch: torch,
+    once imported, stays in memory even when onnx is chosen."""
+    if cuda_devices() > 0:
+        try:
+            check_cuda()  # Пробная аллокация через torch / Test allocation through torch
+            return "cuda"
+        except BackendUnavailable:
+            pass
+    try:
+        import onnxruntime  # noqa: F401
+        return "onnx"
+    except ImportError:
+        return "torch-cpu"
+
+
+def import_backend(name: str, export: str = "none") -> str:
+    """Разрешить "auto" и импортировать библиотеки бэкенда; вернуть имя бэкенда.
+    Отдельно от create_backend, чтобы профиль старта делил импорт и загрузку модели.
+    CUDA с TorchScript обходится без ultralytics (нужен только для первого экспорта).
+    Resolve "auto" and import the backend libraries; return the backend name.
+    Separate from create_backend so the startup profile splits imports from model loading.
+    CUDA with TorchScript needs no ultralytics (only for the first export)."""
+    if name == "auto":
+        name = probe_backend()
+    if name == "cuda" and export == "torchscript":
+        import torch  # noqa: F401
+    elif name in ("cuda", "torch-cpu"):
+        import torch  # noqa: F401
+        from ultralytics import YOLO  # noqa: F401
+    elif name == "onnx":
+        try:
+            import onnxruntime  # noqa: F401
+        except ImportError as e:
+            raise BackendUnavailable("onnxruntime is not installed") from e
+    return name
+
+
+def create_backend(name: str, model_path: str, imgsz: int, conf: float, iou: float,
+                   int8: bool = False, threads: int = 0, export: str = "none", cache_dir: str = ""):
+    """Создать бэкенд по имени ("auto", "cuda", "onnx", "torch-cpu"); export и cache_dir — кэш экспортов.
+    Create a backend by name ("auto", "cuda", "onnx", "torch-cpu"); export and cache_dir — the export cache."""
+    if name == "auto":
+        name = probe_backend()
+    if name == "cuda" and export == "torchscript":
+        check_cuda()  # До экспорта: без CUDA экспорт FP16 невозможен / Before exporting: FP16 export needs CUDA
+        try:
+            return TorchScriptBackend(export_torchscript(model_path, imgsz, cache_dir), imgsz, conf, iou)
+        except Exception as e:  # Экспорт — ускорение, не условие работы / The export is a speed-up, not a requirement
+            print("TorchScript backend failed, using the weights:", e)
+    if name == "cuda":
+        return UltralyticsBackend(model_path, imgsz, conf, iou, device="cuda")
+    if name == "onnx":
+        try:
+            import onnxruntime  # noqa: F401  Проверить до экспорта / Check before exporting
+        except ImportError as e:
+            raise BackendUnavailable("onnxruntime is not installed") from e
+        onnx_path = export_onnx(model_path, imgsz, int8=int8, cache_dir=cache_dir)
+        return OnnxBackend(onnx_path, imgsz, conf, iou, threads=threads)
+    if name == "torch-cpu":
+        return UltralyticsBackend(model_path, imgsz, conf, iou, device="cpu")
+    raise ValueError(f"unknown inference backend: {name!r}")
@@ -0,0 +1,159 @@
+import json       # Строки трассы в JSONL / Trace lines as JSONL
+import os         # Имя кадра -> id трассы / Frame name -> trace id
+import threading  # Запись из нескольких потоков / Writes from several threads
+import time       # Метки времени / Timestamps
+from contextlib import contextmanager  # span() как with-блок / span() as a with block
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence  # Типы для аннотаций / Type hints
+
+# === Сквозная трассировка задержки / End-to-end latency tracing ===
+# id трассы ставится на захвате (<мс сессии/кадра>_<номер>, как имя файла кадра) и идёт через детектор
+# в оверлей. Каждый процесс пишет свои стадии в trace_<proc>.jsonl: {"id", "stage", "t", "ms"}, где t —
+# время начала стадии (time.time(), общее для процессов), ms — длительность.
+# The trace id is stamped at capture (<session/frame ms>_<seq>, like the frame file name) and travels
+# through the detector into the overlay. Each process writes its stages to trace_<proc>.jsonl:
+# {"id", "stage", "t", "ms"}, where t is the stage start (time.time(), shared across processes), ms its duration.
+
+# Стадии по порядку пути кадра; queue_wait и end_to_end вычисляются при сводке /
+# Stages in frame path order; queue_wait and end_to_end are derived when summarizing
+STAGES = ("capture", "queue_wait", "decode", "roi", "infer", "postprocess", "publish",
+          "receive", "layout", "paint", "end_to_end")
+PERCENTILES = (50, 95, 99)
+
+
+def trace_id_for(stamp_ms: int, seq: int) -> str:
+    """id трассы в формате имени кадра / Trace id in the frame file name format."""
+    return f"{stamp_ms:013d}_{seq:08d}"
+
+
+def trace_id_from_path(path: str) -> str:
+    """id трассы кадра-файла — его имя без расширения / Trace id of a frame file — its name without extension."""
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+class TraceWriter:
+    """Дописывает стадии в JSONL через буфер; выключенный писатель ничего не делает и не открывает файл.
+    Appends stages to JSONL through a buffer; a disabled writer does nothing and never opens the file."""
+
+    def __init__(self, path: str, enabled: bool = True, flush_interval: float = 5.0):
+        self.path = path
+        self.enabled = enabled
+        self.flush_interval = flush_interval  # Сброс буфера не реже / Buffer flush period, s
+        self._f = None
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def record(self, trace_id: Optional[str], stage: str, start: float, ms: float) -> None:
+        """Записать стадию: start — time.time() начала, ms — длительность.
+        Record a stage: start — time.time() at its start, ms — duration."""
+        if not self.enabled or not trace_id:
+            return
+        line = json.dumps({"id": trace_id, "stage": stage, "t": round(start, 6), "ms": round(ms, 3)},
+                          separators=(",", ":"))
+        with self._lock:
+            try:
+                if self._f is None:
+                    self._f = open(self.path, "a", encoding="utf-8", buffering=1 << 16)
+                self._f.write(line + "\n")
+                now = time.monotonic()
+                if now - self._last_flush >= self.flush_interval:
+                    self._last_flush = now
+                    self._f.flush()
+            except OSError:
+                self.enabled = False  # Трасса не должна ронять процесс / Tracing must never crash the process
+
+    @contextmanager
+    def span(self, trace_id: Optional[str], stage: str) -> Iterator[None]:
+        """with-блок как стадия / A with block as a stage."""
+        if not self.enabled or not trace_id:
+            yield
+            return
+        start, t0 = time.time(), time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(trace_id, stage, start, (time.perf_counter() - t0) * 1000.0)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._f is not None:
+                try:
+                    self._f.close()
+                except OSError:
+                    pass
+                self._f = None
+
+
+# === Сводка / Summary ===
+def load_records(paths: Iterable[str]) -> List[Dict]:
+    """Строки всех файлов трассы; битые строки (оборванная запись) пропускаются.
+    Lines of all trace files; broken lines (a cut-off write) are skipped."""
+    out = []
+    for path in paths:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue
+                    if isinstance(rec, dict) and {"id", "stage", "t", "ms"} <= rec.keys():
+                        out.append(rec)
+        except OSError:
+            continue
+    return out
+
+
+def derive(records: Sequence[Dict]) -> List[Dict]:
+    """Добавить queue_wait (конец capture -> начало decode) и end_to_end (начало capture -> конец paint).
+    Add queue_wait (capture end -> decode start) and end_to_end (capture start -> paint end)."""
+    by_id: Dict[str, Dict[str, Dict]] = {}
+    for rec in records:
+        stages = by_id.setdefault(rec["id"], {})
+        if rec["stage"] not in stages:  # Первая запись стадии — первая отрисовка / First record — first paint
+            stages[rec["stage"]] = rec
+    out = list(records)
+    for trace_id, stages in by_id.items():
+        cap = stages.get("capture")
+        if cap is None:
+            continue
+        cap_end = cap["t"] + cap["ms"] / 1000.0
+        if "decode" in stages:
+            out.append({"id": trace_id, "stage": "queue_wait", "t": cap_end,
+                        "ms": max(0.0, (stages["decode"]["t"] - cap_end) * 1000.0)})
+        if "paint" in stages:
+            paint = stages["paint"]
+            out.append({"id": trace_id, "stage": "end_to_end", "t": cap["t"],
+                        "ms": (paint["t"] - cap["t"]) * 1000.0 + paint["ms"]})
+    return out
+
+
+def percentile(sorted_values: Sequence[float], p: float) -> float:
+    """Перцентиль с линейной интерполяцией по отсортированному списку / Linearly interpolated percentile of a sorted list."""
+    if not sorted_values:
+        return float("nan")
+    k = (len(sorted_values) - 1) * p / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def summarize(records: Sequence[Dict]) -> Dict[str, Dict[str, float]]:
+    """Стадия -> {count, p50, p95, p99} в мс, стадии в порядке пути кадра.
+    Stage -> {count, p50, p95, p99} in ms, stages in frame path order."""
+    values: Dict[str, List[float]] = {}
+    for rec in derive(records):
+        values.setdefault(rec["stage"], []).append(float(rec["ms"]))
+    order = [s for s in STAGES if s in values] + sorted(s for s in values if s not in STAGES)
+    summary = {}
+    for stage in order:
+        vals = sorted(values[stage])
+        summary[stage] = {"count": len(vals), **{f"p{p}": round(percentile(vals, p), 2) for p in PERCENTILES}}
+    return summary
+
+
+def format_summary(summary: Dict[str, Dict[str, float]]) -> str:
+    """Таблица для консоли / Console table."""
+    lines = [f"{'stage':<12} {'count':>7} " + " ".join(f"{'p' + str(p):>9}" for p in PERCENTILES)]
+    for stage, row in summary.items():
+        lines.append(f"{stage:<12} {row['count']:>7} " + " ".join(f"{row['p' + str(p)]:>9.2f}" for p in PERCENTILES))
+    return "\n".join(lines)
@@ -0,0 +1,144 @@
+import json  # Снимок отчёта в JSON / Report snapshot as JSON
+import os    # Атомарная замена файла / Atomic file replace
+import sys   # Определение платформы, загруженные модули / Platform detection, loaded modules
+import time  # Интервал замеров / Sampling interval
+from typing import Dict, List, Optional, Tuple  # Типы для аннотаций / Type hints
+
+# === Память процесса (RSS) / Process memory (RSS) ===
+# Три долгоживущих процесса работают рядом с игрой, поэтому их объём в памяти — бюджет: пик на старте,
+# объём в работе и тяжёлые модули, которые попали в процесс.
+# Three long-lived processes run next to the game, so their footprint is a budget: the startup peak,
+# the steady-state size and the heavy modules that ended up in the process.
+
+# Модули, которых не должно быть на пути только инференса / Modules that must stay off the inference-only path
+HEAVY_MODULES = ("torch", "ultralytics", "matplotlib", "pandas", "PyQt5")
+
+MB = 1024 * 1024
+
+
+def rss() -> Tuple[int, int]:
+    """(текущий RSS, пиковый RSS) процесса в байтах; (0, 0), если ОС не отвечает.
+    (current RSS, peak RSS) of the process in bytes; (0, 0) if the OS does not tell."""
+    if sys.platform.startswith("win"):
+        try:
+            import ctypes
+            from ctypes import wintypes
+
+            class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+                _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                            ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                            ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+            kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+            kernel32.GetCurrentProcess.restype = wintypes.HANDLE  # Псевдо-дескриптор -1 целиком / The whole -1 pseudo handle
+            kernel32.K32GetProcessMemoryInfo.argtypes = [wintypes.HANDLE, ctypes.POINTER(PROCESS_MEMORY_COUNTERS),
+                                                        wintypes.DWORD]
+            counters = PROCESS_MEMORY_COUNTERS()
+            counters.cb = ctypes.sizeof(counters)
+            if kernel32.K32GetProcessMemoryInfo(kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+                return int(counters.WorkingSetSize), int(counters.PeakWorkingSetSize)
+        except Exception:
+            pass
+        return 0, 0
+    try:
+        # Linux: VmRSS — сейчас, VmHWM — пик / Linux: VmRSS — now, VmHWM — peak
+        fields: Dict[str, int] = {}
+        with open("/proc/self/status", "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith(("VmRSS:", "VmHWM:")):
+                    key, value = line.split(":", 1)
+                    fields[key] = int(value.split()[0]) * 1024
+        return fields.get("VmRSS", 0), fields.get("VmHWM", 0)
+    except (OSError, ValueError):
+        pass
+    try:
+        import resource  # macOS и прочие: только пик / macOS and others: peak only
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak = peak if sys.platform == "darwin" else peak * 1024  # darwin — байты, остальные — КБ / darwin — bytes, others — KB
+        return peak, peak
+    except (ImportError, OSError):
+        return 0, 0
+
+
+def loaded_heavy(modules=None) -> List[str]:
+    """Тяжёлые модули, уже загруженные в процесс / Heavy modules already loaded into the process."""
+    modules = sys.modules if modules is None else modules
+    return [name for name in HEAVY_MODULES if name in modules]
+
+
+class MemoryReport:
+    """Пик на старте (к моменту готовности), RSS в работе и общий пик; с enabled — в консоль и memory_<proc>.json.
+    Startup peak (by the time the process is ready), steady-state RSS and the overall peak;
+    with enabled — to the console and memory_<proc>.json."""
+
+    def __init__(self, process: str, path: str = "", enabled: bool = False, interval: float = 10.0):
+        self.process = process
+        self.path = path              # Пусто — без файла / Empty — no file
+        self.enabled = enabled
+        self.interval = interval      # Период замеров в работе, с / Steady-state sampling period, s
+        self.ready_rss = 0
+        self.startup_peak = 0
+        self.steady_rss = 0           # Последний замер после готовности / Last sample after ready
+        self.steady_max = 0           # Максимум замеров после готовности / Max sample after ready
+        self._last_sample = 0.0
+
+    def mark_ready(self) -> None:
+        """Процесс готов: всё, что было до сих пор, — пик старта / The process is ready: everything so far is the startup peak."""
+        self.ready_rss, self.startup_peak = rss()
+        self.steady_rss = self.steady_max = self.ready_rss
+        self._last_sample = time.monotonic()
+        self.report("ready")
+
+    def maybe_sample(self, now: Optional[float] = None) -> bool:
+        """Замер RSS в работе раз в interval / Steady-state RSS sample once per interval."""
+        now = time.monotonic() if now is None else now
+        if not self.ready_rss or now - self._last_sample < self.interval:
+            return False
+        self._last_sample = now
+        self.steady_rss = rss()[0]
+        self.steady_max = max(self.steady_max, self.steady_rss)
+        return True
+
+    def snapshot(self) -> Dict:
+        current, peak = rss()
+        return {
+            "process": self.process,
+            "pid": os.getpid(),
+            "rss_mb": round(current / MB, 1),
+            "peak_rss_mb": round(peak / MB, 1),
+            "ready_rss_mb": round(self.ready_rss / MB, 1),
+            "startup_peak_mb": round(self.startup_peak / MB, 1),
+            "steady_rss_mb": round(self.steady_rss / MB, 1),
+            "steady_max_mb": round(self.steady_max / MB, 1),
+            "heavy_modules": loaded_heavy(),
+        }
+
+    def publish(self, metrics) -> None:
+        """RSS в метрики процесса / RSS into the process metrics."""
+        snap = self.snapshot()
+        for key in ("rss_mb", "peak_rss_mb", "startup_peak_mb", "steady_max_mb"):
+            metrics.set(key, snap[key])
+
+    def format(self, snap: Dict) -> str:
+        return (f"[memory] {snap['process']}: rss {snap['rss_mb']:.1f} MB, peak {snap['peak_rss_mb']:.1f} MB, "
+                f"startup peak {snap['startup_peak_mb']:.1f} MB, steady {snap['steady_rss_mb']:.1f} MB "
+                f"(max {snap['steady_max_mb']:.1f} MB), heavy: {', '.join(snap['heavy_modules']) or '-'}")
+
+    def report(self, when: str) -> None:
+        """С enabled — строка в консоль и снимок в файл / With enabled — a console line and a file snapshot."""
+        if not self.enabled:
+            return
+        snap = self.snapshot()
+        snap["when"] = when
+        print(self.format(snap) + f" [{when}]", flush=True)
+        if not self.path:
+            return
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(snap, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass  # Отчёт не должен ронять процесс / The report must never crash the process
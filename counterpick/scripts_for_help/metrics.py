@@ -0,0 +1,58 @@
+import json       # Снимок метрик в JSON / Metrics snapshot as JSON
+import os         # Атомарная замена файла / Atomic file replace
+import threading  # Счётчики из нескольких потоков / Counters from several threads
+import time       # Аптайм и интервал сброса / Uptime and flush interval
+from typing import Dict, Optional  # Типы для аннотаций / Type hints
+
+
+class Metrics:
+    """Счётчики и текущие значения процесса, периодически сбрасываются в metrics_<proc>.json.
+    Process counters and gauges, periodically dumped to metrics_<proc>.json."""
+
+    def __init__(self, path: str, interval: float = 10.0):
+        self.path = path            # Куда писать снимок / Snapshot file
+        self.interval = interval    # Период сброса, с / Flush period, s
+        self.counters: Dict[str, int] = {}
+        self.gauges: Dict[str, float] = {}
+        self._started = time.time()
+        self._last_flush = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, n: int = 1) -> None:
+        """Увеличить счётчик / Increment a counter."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def set(self, name: str, value: float) -> None:
+        """Записать текущее значение / Set a gauge."""
+        with self._lock:
+            self.gauges[name] = value
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "uptime_s": round(time.time() - self._started, 1),
+                "counters": dict(self.counters),
+                "gauges": dict(self.gauges),
+            }
+
+    def maybe_flush(self, now: Optional[float] = None) -> bool:
+        """Сбросить снимок, если прошёл интервал / Flush the snapshot if the interval elapsed."""
+        now = time.time() if now is None else now
+        if now - self._last_flush < self.interval:
+            return False
+        self._last_flush = now
+        self.flush()
+        return True
+
+    def flush(self) -> None:
+        """Записать снимок без fsync: это диагностика, не данные.
+        Write the snapshot without fsync: diagnostics, not data."""
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.snapshot(), f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass  # Метрики не должны ронять процесс / Metrics must never crash the process
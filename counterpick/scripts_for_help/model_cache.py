@@ -0,0 +1,68 @@
+import glob     # Поиск устаревших артефактов / Finding stale artifacts
+import hashlib  # Хэш весов / Weights hash
+import os       # Пути и атомарная замена / Paths and atomic replace
+import re       # Разбор имени артефакта / Artifact name parsing
+from typing import List  # Типы для аннотаций / Type hints
+
+# === Кэш экспортированных моделей / Exported model cache ===
+# Артефакты (ONNX, INT8, TorchScript FP16) лежат в <кэш>/<имя весов>-<хэш>.<тег>: другой best.pt даёт
+# другое имя, поэтому старый экспорт не подхватится даже с более новой датой файла.
+# Artifacts (ONNX, INT8, TorchScript FP16) live in <cache>/<weights stem>-<hash>.<tag>: a different best.pt
+# gives a different name, so a stale export is never picked up even with a newer file date.
+
+HASH_LENGTH = 12  # Символов sha256 в имени / sha256 characters in the name
+
+
+def weights_hash(path: str, length: int = HASH_LENGTH) -> str:
+    """sha256 файла весов (первые length символов) / sha256 of the weights file (first length chars)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):  # Блоками по 1 МБ / 1 MB blocks
+            digest.update(chunk)
+    return digest.hexdigest()[:length]
+
+
+def cache_dir_for(model_path: str, cache_dir: str = "") -> str:
+    """Папка кэша: заданная или model_cache рядом с весами / Cache folder: the given one or model_cache next to the weights."""
+    return cache_dir or os.path.join(os.path.dirname(os.path.abspath(model_path)), "model_cache")
+
+
+def artifact_path(model_path: str, tag: str, cache_dir: str = "", digest: str = "") -> str:
+    """Путь артефакта для этих весов, например tag="640.onnx" -> model_cache/best-<хэш>.640.onnx.
+    digest — уже посчитанный хэш, чтобы не читать веса повторно.
+    Artifact path for these weights, e.g. tag="640.onnx" -> model_cache/best-<hash>.640.onnx.
+    digest — an already computed hash, so the weights are not read again."""
+    stem = os.path.splitext(os.path.basename(model_path))[0]
+    digest = digest or weights_hash(model_path)
+    return os.path.join(cache_dir_for(model_path, cache_dir), f"{stem}-{digest}.{tag}")
+
+
+def store(produced: str, target: str) -> str:
+    """Перенести готовый экспорт в кэш атомарно и убрать экспорты прежних весов.
+    Move a finished export into the cache atomically and remove exports of previous weights."""
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    if os.path.abspath(produced) != os.path.abspath(target):
+        os.replace(produced, target)
+    prune(target)
+    return target
+
+
+def prune(current: str) -> List[str]:
+    """Удалить артефакты того же тега от других весов; вернуть удалённые пути.
+    Remove same-tag artifacts of other weights; return the removed paths."""
+    folder, name = os.path.split(current)
+    m = re.match(r"^(.*)-([0-9a-f]+)\.(.+)$", name)  # <имя>-<хэш>.<тег> / <stem>-<hash>.<tag>
+    if m is None:
+        return []
+    stem, digest, tag = m.groups()
+    pattern = f"{glob.escape(stem)}-{'?' * len(digest)}.{glob.escape(tag)}"  # Ровно длина хэша / Exactly the hash length
+    removed = []
+    for path in glob.glob(os.path.join(glob.escape(folder), pattern)):
+        if os.path.abspath(path) == os.path.abspath(current):
+            continue
+        try:
+            os.remove(path)
+            removed.append(path)
+        except OSError:
+            pass  # Занят другим процессом — уберём в следующий раз / In use by another process — next time
+    return removed
@@ -0,0 +1,229 @@
+import json      # Полезная нагрузка сообщений / Message payloads
+import os        # Пути сокета / Socket paths
+import socket    # Unix-сокет (не Windows) / Unix socket (non-Windows)
+import struct    # Заголовок сообщения / Message header
+import sys       # Определение платформы / Platform detection
+import tempfile  # Папка сокетов QLocalServer / QLocalServer socket folder
+import threading  # Поток записи / Writer thread
+import time      # Пауза между попытками подключения / Reconnect throttling
+from typing import Any, Dict, List, Optional, Tuple  # Типы для аннотаций / Type hints
+
+# === Push-канал детектор -> оверлей / Detector -> overlay push channel ===
+# Оверлей слушает QLocalServer (Windows — именованный канал, иначе Unix-сокет), детектор
+# подключается обычным файлом/сокетом без Qt. Сообщение: заголовок + компактный JSON.
+# The overlay listens on a QLocalServer (named pipe on Windows, Unix socket elsewhere), the
+# detector connects with a plain file/socket, no Qt. Message: header + compact JSON.
+CHANNEL_NAME = "counterpick_overlay"
+PROTOCOL_VERSION = 1
+
+KIND_SNAPSHOT = 1  # Список героев [{hero, counters, box}] / Hero list
+KIND_STATE = 2     # {"enabled", "detected"}
+KIND_TRACE = 3     # {"id", "t"} — id трассы следующего снапшота (COUNTERPICK_TRACE=1) / trace id of the next snapshot
+
+# version, kind, seq, payload length
+_HEADER = struct.Struct("<BBII")
+MAX_PAYLOAD = 1 << 20  # Защита от мусора в потоке / Guard against a garbage stream
+
+
+def channel_path(name: str = CHANNEL_NAME) -> str:
+    """Адрес сервера так же, как его строит QLocalServer / Server address the way QLocalServer builds it."""
+    if sys.platform.startswith("win"):
+        return r"\\.\pipe" + "\\" + name
+    return os.path.join(tempfile.gettempdir(), name)
+
+
+def encode_message(kind: int, seq: int, payload: Any) -> bytes:
+    """Сообщение в байты / Message to bytes."""
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return _HEADER.pack(PROTOCOL_VERSION, kind, seq & 0xFFFFFFFF, len(body)) + body
+
+
+class MessageDecoder:
+    """Сборка сообщений из потока кусками; чужие версии пропускаются.
+    Reassembles messages from a chunked stream; other versions are skipped."""
+
+    def __init__(self):
+        self._buf = bytearray()
+        self.skipped = 0  # Сообщения неизвестной версии / Messages of an unknown version
+
+    def feed(self, data: bytes) -> List[Tuple[int, int, Any]]:
+        """Добавить байты; вернуть готовые (kind, seq, payload).
+        Add bytes; return complete (kind, seq, payload) messages."""
+        self._buf += data
+        out = []
+        while len(self._buf) >= _HEADER.size:
+            version, kind, seq, length = _HEADER.unpack_from(self._buf, 0)
+            if length > MAX_PAYLOAD:
+                self._buf.clear()  # Поток испорчен — ждём переподключения / Stream corrupt — wait for reconnect
+                break
+            end = _HEADER.size + length
+            if len(self._buf) < end:
+                break
+            body = bytes(self._buf[_HEADER.size:end])
+            del self._buf[:end]
+            if version != PROTOCOL_VERSION:
+                self.skipped += 1
+                continue
+            try:
+                out.append((kind, seq, json.loads(body.decode("utf-8"))))
+            except ValueError:
+                self.skipped += 1
+        return out
+
+
+class OverlayChannelClient:
+    """Сторона детектора: шлёт изменения, молча живёт без оверлея.
+    Запись идёт в своём потоке: send только кладёт сообщение и возвращается, поэтому зависший
+    оверлей (клиент именованного канала на Windows пишет без таймаута) не останавливает детектор.
+    Пока запись стоит, ждёт только последнее сообщение каждого вида — более старые выбрасываются.
+    При (пере)подключении досылается последнее сообщение каждого вида, чтобы оверлей,
+    запущенный позже, сразу получил актуальный драфт и состояние.
+    Detector side: sends changes, silently works without an overlay.
+    Writes run on their own thread: send only queues the message and returns, so a hung overlay
+    (the named pipe client on Windows writes without a timeout) never stops the detector.
+    While a write is stuck only the latest message of each kind waits — older ones are dropped.
+    On (re)connect it resends the latest message of each kind, so an overlay started
+    later gets the current draft and state right away."""
+
+    def __init__(self, name: str = CHANNEL_NAME, retry_interval: float = 1.0, timeout: float = 0.05):
+        self.path = channel_path(name)
+        self.retry_interval = retry_interval  # Пауза между попытками подключения / Delay between connect attempts
+        self.timeout = timeout                # Запись дольше — оверлей завис, рвём (Unix-сокет) / Slower write — overlay hung, drop it (Unix socket)
+        self.sent = 0
+        self.failures = 0
+        self.dropped = 0                      # Вытеснены более новыми до записи / Superseded before being written
+        self._conn = None
+        self._seq = 0
+        self._last: Dict[int, bytes] = {}     # kind -> последнее сообщение (кроме трассы) / kind -> latest message (not traces)
+        self._outbox: Dict[int, bytes] = {}   # kind -> ждёт записи, в порядке отправки / kind -> waiting, in send order
+        self._next_attempt = 0.0
+        self._cond = threading.Condition()
+        self._stop = False
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def connected(self) -> bool:
+        return self._conn is not None
+
+    def send(self, kind: int, payload: Any) -> bool:
+        """Поставить сообщение в очередь записи, не дожидаясь оверлея; True, если канал подключён.
+        Queue a message for writing without waiting for the overlay; True if the channel is connected."""
+        with self._cond:
+            self._seq += 1
+            msg = encode_message(kind, self._seq, payload)
+            if kind != KIND_TRACE:
+                # Трасса относится к одному снапшоту: досланная после него, она прилипла бы к следующему /
+                # A trace belongs to one snapshot: resent after it, it would stick to the next one
+                self._last[kind] = msg
+            if self._outbox.pop(kind, None) is not None:
+                self.dropped += 1
+            self._outbox[kind] = msg  # В конец: порядок отправки сохраняется / To the end: send order is kept
+            self._start()
+            self._cond.notify()
+        return self.connected
+
+    def poll(self) -> bool:
+        """Подключён ли канал; поток записи сам переподключается раз в retry_interval.
+        Whether the channel is connected; the writer thread reconnects once per retry_interval itself."""
+        with self._cond:
+            self._start()
+        return self.connected
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Дождаться, пока очередь записи опустеет (тесты, выход) / Wait until the write queue is empty (tests, exit)."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._outbox or self._conn is None, timeout)
+
+    def close(self, timeout: float = 0.2) -> None:
+        """Дописать ждущие сообщения (не дольше timeout) и закрыть канал.
+        Write the waiting messages (for at most timeout) and close the channel."""
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)  # Зависшая запись остаётся в фоновом потоке / A hung write stays on the daemon thread
+
+    def _start(self) -> None:
+        if self._thread is None and not self._stop:
+            self._thread = threading.Thread(target=self._run, name="overlay-channel", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        try:
+            while True:
+                with self._cond:
+                    if self._conn is None:
+                        # Без подключения ждём следующей попытки / Without a connection wait for the next attempt
+                        self._cond.wait_for(lambda: self._stop, max(0.01, self._next_attempt - time.monotonic()))
+                    else:
+                        self._cond.wait_for(lambda: self._outbox or self._stop)
+                    if self._stop and (self._conn is None or not self._outbox):
+                        return
+                    batch = list(self._outbox.values())
+                    self._outbox.clear()
+                if self._conn is None:
+                    self._reconnect()
+                    continue
+                for msg in batch:
+                    if not self._write(msg):
+                        break
+                with self._cond:
+                    self._cond.notify_all()  # Для flush / For flush
+        finally:
+            self._drop()
+
+    def _reconnect(self) -> None:
+        """Попытка подключения (не чаще retry_interval) и досылка последних сообщений.
+        A connect attempt (at most once per retry_interval) and a resend of the latest messages."""
+        now = time.monotonic()
+        if now < self._next_attempt:
+            return
+        self._next_attempt = now + self.retry_interval
+        try:
+            conn = self._connect()
+        except OSError:
+            return
+        with self._cond:
+            self._conn = conn
+            replay = [self._last[kind] for kind in sorted(self._last)]
+            self._outbox.clear()  # Досылка покрывает очередь / The resend covers the queue
+        for msg in replay:
+            if not self._write(msg):
+                return
+        with self._cond:
+            self._cond.notify_all()
+
+    def _drop(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            try:
+                conn.close()
+            except OSError:
+                pass
+
+    def _connect(self):
+        if sys.platform.startswith("win"):
+            return open(self.path, "wb", buffering=0)  # Клиент именованного канала / Named pipe client
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.path)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def _write(self, msg: bytes) -> bool:
+        try:
+            if isinstance(self._conn, socket.socket):
+                self._conn.sendall(msg)
+            else:
+                self._conn.write(msg)
+        except OSError:
+            # Оверлей закрылся или завис — JSON-файлы остаются источником /
+            # The overlay closed or hung — the JSON files remain the source
+            self.failures += 1
+            self._drop()
+            return False
+        self.sent += 1
+        return True
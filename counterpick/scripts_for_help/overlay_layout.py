@@ -0,0 +1,150 @@
+from typing import Any, Callable, Dict, List, NamedTuple, Sequence, Tuple  # Типы для аннотаций / Type hints
+
+import numpy as np  # Векторная раскладка / Vectorized layout
+
+from pick_zones import Rect  # Прямоугольник экрана / Screen rect
+
+SLOTS_PER_SIDE = 5  # Пиков на сторону / Picks per side
+
+SIDE_LEFT, SIDE_RIGHT = 0, 1
+
+
+class LayoutTable(NamedTuple):
+    """Раскладка оверлея: по строке на героя, считается только при смене данных.
+    Overlay layout: one row per hero, computed only when the data changes."""
+    side: np.ndarray    # (N,) int8: SIDE_LEFT / SIDE_RIGHT
+    slot: np.ndarray    # (N,) int8: слот 0..4, -1 — вне зоны (без привязки) / slot 0..4, -1 — outside the zone (unsnapped)
+    x: np.ndarray       # (N,) int32: левый край сетки 2×2 / 2×2 grid left edge
+    y: np.ndarray       # (N,) int32: верх сетки / grid top
+    icon_h: np.ndarray  # (N,) int32: высота иконки (корзина) / icon height (bucket)
+
+
+def zone_iou(boxes: np.ndarray, zone: Rect) -> np.ndarray:
+    """Перекрытие боксов с зоной относительно площади бокса, для всех боксов сразу.
+    Box/zone overlap relative to the box area, for all boxes at once."""
+    zx1, zy1, zx2, zy2 = zone
+    iw = np.clip(np.minimum(boxes[:, 2], zx2) - np.maximum(boxes[:, 0], zx1), 0, None)
+    ih = np.clip(np.minimum(boxes[:, 3], zy2) - np.maximum(boxes[:, 1], zy1), 0, None)
+    area = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    return np.divide(iw * ih, area, out=np.zeros(len(boxes), np.float64), where=area > 0)
+
+
+def quantize_heights(h: np.ndarray, buckets: Sequence[int]) -> np.ndarray:
+    """Ближайшая корзина для каждой высоты (при равенстве — бóльшая) / Nearest bucket per height (larger on ties)."""
+    desc = np.sort(np.asarray(buckets))[::-1]  # По убыванию: argmin берёт бóльшую при равенстве / Descending: argmin takes the larger on ties
+    return desc[np.abs(desc[None, :] - h[:, None]).argmin(axis=1)].astype(np.int32)
+
+
+def compute_layout(boxes: np.ndarray, prev_side: np.ndarray, zones: Tuple[Rect, Rect],
+                   columns: Tuple[int, int], icon_w: int, pad: int, height_ratio: float,
+                   buckets: Sequence[int], slots: int = SLOTS_PER_SIDE) -> LayoutTable:
+    """Сторона по IoU с зонами (при нуле — прошлая сторона), привязка к одному из slots
+    канонических слотов стороны по центру бокса, позиция и высота иконок.
+    Side by IoU with the zones (previous side when both are zero), snapping to one of the
+    side's canonical slots by box centre, icon position and height.
+    boxes — (N, 4) xyxy; prev_side — (N,) прошлая сторона или -1 / previous side or -1."""
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    prev_side = np.asarray(prev_side, dtype=np.int8).reshape(-1)
+    iou = np.stack([zone_iou(boxes, zones[0]), zone_iou(boxes, zones[1])], axis=1)  # (N, 2)
+
+    side = np.where(iou[:, 0] > iou[:, 1], SIDE_LEFT, SIDE_RIGHT).astype(np.int8)
+    keep_prev = (iou.max(axis=1) == 0) & (prev_side >= 0)
+    side[keep_prev] = prev_side[keep_prev]  # Вне обеих зон — прежняя сторона / Outside both zones — previous side
+
+    # Слот: центр бокса в вертикальной полосе зоны стороны / Slot: box centre within the side zone's vertical span
+    zone_arr = np.asarray(zones, dtype=np.float64)[side]          # (N, 4) зона своей стороны / own side zone
+    slot_h = (zone_arr[:, 3] - zone_arr[:, 1]) / slots
+    cy = (boxes[:, 1] + boxes[:, 3]) / 2
+    inside = (cy >= zone_arr[:, 1]) & (cy < zone_arr[:, 3])
+    slot = np.where(inside, np.floor((cy - zone_arr[:, 1]) / slot_h), -1).astype(np.int8)
+
+    # Привязанные герои берут геометрию слота, остальные — свой бокс /
+    # Snapped heroes take the slot geometry, the rest keep their own box
+    top = np.where(inside, zone_arr[:, 1] + slot * slot_h, boxes[:, 1])
+    height = np.where(inside, slot_h, boxes[:, 3] - boxes[:, 1])
+
+    x = np.asarray(columns, dtype=np.int32)[side] - icon_w - pad // 2
+    icon_h = quantize_heights(np.maximum(1, (height * height_ratio).astype(np.int32)), buckets)
+    return LayoutTable(side, slot, x.astype(np.int32), top.astype(np.int32), icon_h)
+
+
+# === Удерживаемые блоки (без Qt) / Retained blocks (Qt-free) ===
+BlockRect = Tuple[int, int, int, int]  # (x, y, w, h) в экранных пикселях / screen pixels
+
+
+class Block(NamedTuple):
+    """Готовый блок 2×2 героя: где он лежит, из чего собран и сама картинка (QPixmap у оверлея).
+    A hero's ready 2×2 block: where it sits, what it is made of and the image itself (a QPixmap in the overlay)."""
+    rect: BlockRect
+    key: Tuple    # (ширина иконки, высота иконки, контрпики) / (icon width, icon height, counters)
+    image: Any
+
+
+class RetainedBlocks:
+    """Разница между прошлыми блоками и новыми данными: какие картинки переиспользовать и какие области
+    перерисовать. Сборка и размер картинки — колбэки, поэтому здесь нет Qt.
+    The difference between the previous blocks and new data: which images to reuse and which areas to
+    repaint. Composing and sizing an image are callbacks, so there is no Qt here."""
+
+    def __init__(self, compose: Callable[..., Any], size_of: Callable[[Any], Tuple[int, int]], min_box_h: int = 0):
+        self.compose = compose        # compose(icon_w, icon_h, counters) -> картинка / image
+        self.size_of = size_of        # size_of(картинка) -> (w, h) / size_of(image) -> (w, h)
+        self.min_box_h = min_box_h    # Ниже — бокс заменяется последним удачным / Below — the box is replaced by the last good one
+        self.data: List = []          # list[{hero,counters,box}] — текущие данные / current overlay list
+        self.last_draw: Dict[str, Dict] = {}  # hero -> {"box", "side"} — последняя удачная раскладка / last good layout
+        self.blocks: Dict[str, Block] = {}
+
+    def set_data(self, data, layout: Callable[[List[List[int]], List[int]], LayoutTable],
+                 icon_w: int) -> List[BlockRect]:
+        """Принять данные; вернуть области для перерисовки (пусто — ничего не изменилось).
+        layout(boxes, prev_side) — раскладка в экранных пикселях.
+        Accept data; return the areas to repaint (empty — nothing changed).
+        layout(boxes, prev_side) — the layout in screen pixels."""
+        if not isinstance(data, list):
+            data = []                                     # Гарантируем список / Ensure list
+        if data == self.data:
+            return []                                     # Ничего не изменилось / Nothing changed
+        self.data = data
+
+        # Валидные записи; низкий/битый бокс заменяется последним удачным, чтобы не мигало /
+        # Valid items; a short/broken box is replaced by the last good one to avoid flicker
+        heroes, counters_list, boxes, prev_side = [], [], [], []
+        for item in data:
+            if not isinstance(item, dict):
+                continue
+            hero = item.get("hero")
+            box = item.get("box", [0, 0, 0, 0])
+            if not hero or not (isinstance(box, list) and len(box) == 4):
+                continue                                  # Пропустить некорректные записи / Skip invalid items
+            x1, y1, x2, y2 = map(int, box)
+            last = self.last_draw.get(hero)
+            if (x2 <= x1 or y2 - y1 < self.min_box_h) and last is not None:
+                x1, y1, x2, y2 = last["box"]
+            if x2 <= x1 or y2 <= y1:
+                continue                                  # Некорректный бокс / Invalid box
+            heroes.append(hero)
+            counters_list.append(item.get("counters", []))
+            boxes.append([x1, y1, x2, y2])
+            prev_side.append(-1 if last is None else last["side"])
+
+        table = layout(boxes, prev_side)  # Один векторный проход / One vectorized pass
+
+        blocks: Dict[str, Block] = {}
+        dirty: List[BlockRect] = []
+        for i, hero in enumerate(heroes):
+            self.last_draw[hero] = {"box": boxes[i], "side": int(table.side[i])}
+            key = (icon_w, int(table.icon_h[i]), tuple(str(c) for c in counters_list[i][:4]))  # Содержимое блока / Block contents
+            old = self.blocks.get(hero)
+            image = old.image if old is not None and old.key == key else self.compose(*key)  # Тот же блок — переиспользуем / Same block — reuse
+            w, h = self.size_of(image)
+            rect = (int(table.x[i]), int(table.y[i]), w, h)
+            blocks[hero] = Block(rect, key, image)
+            if old is None or old.rect != rect or old.image is not image:
+                dirty.append(rect)
+                if old is not None:
+                    dirty.append(old.rect)
+        for hero, old in self.blocks.items():
+            if hero not in blocks:
+                dirty.append(old.rect)                    # Герой исчез — стереть его блок / Hero gone — erase its block
+        self.blocks = blocks
+        return dirty
@@ -0,0 +1,160 @@
+import json       # Сериализация снапшота / Snapshot serialization
+import os         # Атомарная замена файла / Atomic file replace
+import stat       # Снять read-only с целевого файла / Clear read-only on the target
+import threading  # Фоновый поток записи / Background writer thread
+import time       # Паузы ретраев и задержка публикации / Retry pauses and publish latency
+from typing import Any, Optional  # Типы для аннотаций / Type hints
+
+
+def robust_replace(src: str, dst: str, retries: int = 5, delay: float = 0.1) -> int:
+    """
+    Надёжная замена файла с коротким ретраем.
+    Пытается os.replace(src, dst) несколько раз, снимая read-only и выдерживая паузу.
+    :param src: временный файл (.tmp), который хотим переименовать
+    :param dst: целевой файл, который нужно атомарно заменить
+    :param retries: кол-во дополнительных попыток после первой
+    :param delay: задержка между попытками в секундах
+    :return: сколько повторных попыток понадобилось (0 — с первого раза)
+    """
+    last_err = None  # <- инициализация переменной заранее
+    # Первая попытка — самая быстрая
+    try:
+        os.replace(src, dst)  # Атомарная замена на Windows / Atomic replace
+        return 0              # Успех — выходим
+    except PermissionError:
+        # Падать не спешим — пойдём в цикл ретраев
+        pass
+    except OSError as e:
+        # Иногда это может быть sharing violation как OSError — тоже ретраим
+        last_err = e
+
+    # Ретраи: короткие и безопасные
+    for attempt in range(1, retries + 1):
+        # Снимаем возможный read-only с целевого файла (если он существует)
+        try:
+            if os.path.exists(dst):
+                os.chmod(dst, stat.S_IWRITE | stat.S_IREAD)  # rw- для owner
+        except Exception:
+            # Игнорируем сбои chmod — всё равно попробуем replace
+            pass
+
+        try:
+            os.replace(src, dst)  # Повторная попытка замены
+            return attempt        # Успех
+        except PermissionError as e:
+            last_err = e          # Сохраняем последнюю ошибку
+        except OSError as e:
+            last_err = e          # Любая OSError — тоже пробуем ещё
+        time.sleep(delay)         # Короткая пауза, чтобы читатель отпустил файл
+
+    # Если все попытки исчерпаны — аккуратно удалить src, чтобы не висел .tmp, и пробросить ошибку
+    try:
+        if os.path.exists(src):
+            os.remove(src)  # Чистим временный файл, чтобы не накапливались .tmp
+    except Exception:
+        pass
+    # Финально пробрасываем последнюю ошибку — пусть упадёт явно, если совсем плохо
+    if last_err:
+        raise last_err
+    else:
+        # Теоретически сюда не попадём, но на всякий случай
+        raise PermissionError("Failed to replace file after retries")
+
+
+class OverlayPublisher:
+    """Фоновая запись overlay_data.json: цикл инференса только кладёт снапшот и идёт дальше.
+    Пачка снапшотов, пришедших за время одной записи, схлопывается — пишется последний.
+    Background writer for overlay_data.json: the inference loop only hands over a snapshot.
+    Snapshots arriving during one write are coalesced — only the latest is written."""
+
+    def __init__(self, path: str, metrics=None, retries: int = 5, delay: float = 0.1, backoff: float = 0.5):
+        self.path = path
+        self.metrics = metrics              # Счётчики процесса (необязательно) / Process counters (optional)
+        self.retries, self.delay = retries, delay
+        self.backoff = backoff              # Пауза перед повтором неудавшегося снапшота, с / Pause before retrying a failed snapshot, s
+        self._submitted = 0                 # Отданных снапшотов всего / Snapshots handed over in total
+        self._pending: Optional[Any] = None
+        self._pending_since = 0.0
+        self._has_pending = False
+        self._busy = False
+        self._cond = threading.Condition()
+        self._stop = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "OverlayPublisher":
+        self._thread = threading.Thread(target=self._run, name="overlay-publisher", daemon=True)
+        self._thread.start()
+        return self
+
+    def submit(self, data: Any) -> None:
+        """Отдать снапшот на запись, не дожидаясь диска / Hand a snapshot over without waiting for disk."""
+        with self._cond:
+            if self._has_pending:
+                self._count("overlay_coalesced")  # Предыдущий так и не записан / The previous one was never written
+            else:
+                self._pending_since = time.perf_counter()  # Задержка — от самого раннего ждущего / Latency from the oldest waiting one
+            self._pending, self._has_pending = data, True
+            self._submitted += 1
+            self._cond.notify()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Дождаться записи всего отданного (тесты, выход) / Wait until everything handed over is written (tests, exit)."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._has_pending and not self._busy, timeout)
+
+    def close(self, timeout: float = 2.0) -> None:
+        """Дописать последний снапшот и остановить поток / Write the last snapshot and stop the thread."""
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _count(self, name: str, n: int = 1) -> None:
+        if self.metrics is not None:
+            self.metrics.inc(name, n)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._has_pending or self._stop)
+                if not self._has_pending:
+                    return  # Остановка и писать нечего / Stopping and nothing to write
+                data, since, generation = self._pending, self._pending_since, self._submitted
+                self._pending, self._has_pending, self._busy = None, False, True
+            ok = False
+            try:
+                ok = self._write(data, since)
+            finally:
+                with self._cond:
+                    self._busy = False
+                    if not ok and not self._stop and self._submitted == generation:
+                        # Оверлей держал файл все ретраи, а новее ничего нет: иначе файл устарел бы до
+                        # следующего героя — повторить после паузы / The overlay held the file through all
+                        # retries and nothing newer came: otherwise the file would stay stale until the
+                        # next hero — retry after a pause
+                        self._pending, self._pending_since, self._has_pending = data, since, True
+                    self._cond.notify_all()
+            if not ok:
+                with self._cond:
+                    # Новый снапшот или остановка прерывают паузу / A new snapshot or stopping cuts the pause short
+                    self._cond.wait_for(lambda: self._stop or self._submitted != generation, self.backoff)
+
+    def _write(self, data: Any, since: float) -> bool:
+        tmp = self.path + ".tmp"  # Временный файл / Temp file
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)  # Запись JSON / Write JSON
+                f.flush()
+                os.fsync(f.fileno())
+            retries = robust_replace(tmp, self.path, self.retries, self.delay)  # Атомарная замена / Atomic replace
+        except OSError:
+            # Оверлей держал файл все ретраи — снапшот вернётся в очередь (см. _run) /
+            # The overlay held the file through all retries — the snapshot goes back to the queue (see _run)
+            self._count("overlay_publish_failures")
+            return False
+        self._count("overlay_writes")
+        self._count("overlay_replace_retries", retries)
+        if self.metrics is not None:
+            self.metrics.set("overlay_publish_latency_ms", round((time.perf_counter() - since) * 1000.0, 2))
+        return True
@@ -1,9 +1,11 @@
 import sys   # Доступ к системным параметрам / Access to system parameters
 import os    # Работа с путями и файлами / Path and file operations
 import json  # Чтение/запись JSON / Read/write JSON
+import time  # Метки трассы / Trace timestamps
 from PyQt5.QtWidgets import QApplication, QWidget  # Приложение и окно / App and window
-from PyQt5.QtGui import QFont, QColor, QPainter, QPen, QPixmap  # Шрифт, цвета, рисование / Font, colors, drawing
+from PyQt5.QtGui import QFont, QFontMetrics, QColor, QPainter, QPen, QPixmap  # Шрифт, цвета, рисование / Font, colors, drawing
 from PyQt5.QtCore import Qt, QTimer, QRect  # Флаги окна, таймеры, прямоугольник / Window flags, timers, rect
+from PyQt5.QtNetwork import QLocalServer  # Push-канал от детектора / Push channel from the detector
 import signal  # Обработка сигналов ОС / OS signal handling
 # === WinAPI named mutex (single instance) / Именованный мьютекс (единственный экземпляр) ===
 import ctypes, atexit  # Импорты для работы с WinAPI и финализации / WinAPI + finalizer
@@ -37,32 +39,28 @@ BASE_DIR = os.path.dirname(sys.executable)   # Папка, где лежит с
 OVERLAY_DATA_PATH = os.path.join(BASE_DIR, 'overlay_data.json')  # Данные о героях / Heroes overlay data
 STATE_PATH = os.path.join(BASE_DIR, 'overlay_state.json')        # Состояние оверлея / Overlay state
 ICON_FOLDER = os.path.join(BASE_DIR, 'hero_icons')         # Папка иконок героев / Hero icons folder
-
-# === Зоны пиков / Pick zones ===
-RADIANT_ZONE = (1465, 215, 1540, 715)  # Прямоугольник зоны Radiant / Radiant zone rect
-DIRE_ZONE    = (1575, 215, 1650, 715)  # Прямоугольник зоны Dire / Dire zone rect
+COUNTERS_PATH = os.path.join(BASE_DIR, 'counters.json')     # Контрпики (проверка иконок) / Counters (icon check)
+TRACE_PATH = os.path.join(BASE_DIR, 'trace_overlay.jsonl')  # Трасса receive/layout/paint / receive/layout/paint trace
+
+# === Зоны пиков (общие с детектором) / Pick zones (shared with detector) ===
+from pick_zones import layout_for, scale_rect
+from overlay_channel import CHANNEL_NAME, KIND_SNAPSHOT, KIND_STATE, KIND_TRACE, MessageDecoder  # Протокол канала / Channel protocol
+from runtime_config import TRACE_ENABLED, REPORT_MEMORY  # Общие настройки / Shared settings
+from memory_report import MemoryReport  # RSS процесса / Process RSS
+from latency_trace import TraceWriter  # Трасса задержки / Latency trace
+from icon_atlas import IconAtlas, ICON_HEIGHT_BUCKETS  # Атлас иконок / Icon atlas
+from overlay_layout import RetainedBlocks, compute_layout  # Векторная раскладка и блоки / Vectorized layout and blocks
 
 # === Настройки иконок / Icons settings ===
-ICON_WIDTH = 46                 # Ширина иконки / Icon width
+ICON_WIDTH = 46                 # Ширина иконки (рабочие пиксели) / Icon width (working pixels)
 ICON_HEIGHT_RATIO = 0.45        # Высота иконки как доля высоты бокса героя / Icon height ratio of hero box
-LEFT_COLUMN_X = 1343            # X-координата левой колонки / Left column X
-RIGHT_COLUMN_X = 1720           # X-координата правой колонки / Right column X
+# Колонки иконок — в таблице раскладки pick_zones / Icon columns live in the pick_zones layout table
+ICON_PAD = 5                    # Отступ между иконками / Padding between icons
 
 # Минимальная высота бокса героя для перерисовки (иначе держим старое) /
 # Minimal hero box height to redraw (otherwise keep the last one)
 MIN_BOX_H_FOR_DRAW = 40  # Под твой UI / Tuned for your UI
 
-# === IOU / Перекрытие прямоугольников ===
-def intersection_over_union(boxA, boxB):
-    # Расчёт пересечения / Compute intersection
-    xA = max(boxA[0], boxB[0]); yA = max(boxA[1], boxB[1])
-    xB = min(boxA[2], boxB[2]); yB = min(boxA[3], boxB[3])
-    interW = max(0, xB - xA); interH = max(0, yB - yA)
-    interA = interW * interH  # Площадь пересечения / Intersection area
-    if interA == 0: return 0.0  # Нет пересечения / No overlap
-    boxAA = (boxA[2] - boxA[0]) * (boxA[3] - boxA[1])  # Площадь boxA / boxA area
-    return interA / float(boxAA)  # IOU относительно boxA / IOU w.r.t. boxA
-
 # === Фокус окна: активно ли «Dota 2»? (без pywin32) /
 # === Foreground check: is "Dota 2" active? (no pywin32) ===
 user32 = ctypes.windll.user32                           # Доступ к User32 / Access User32
@@ -100,7 +98,17 @@ class Overlay(QWidget):
 
         # Окно / Window
         self.setWindowTitle("Overlay")                                        # Заголовок окна / Window title
-        self.setGeometry(0, 0, 1920, 1080)                                    # Размер во весь экран / Full HD geometry
+        # Раскладка по реальному монитору: боксы приходят в рабочих пикселях, рисуем в экранных /
+        # Layout for the actual monitor: boxes arrive in working pixels, we draw in screen pixels
+        screen = QApplication.primaryScreen().geometry()
+        self.layout_table = layout_for(screen.width(), screen.height())
+        s = self.layout_table.scale
+        self.zones_px = tuple(scale_rect(z, s) for z in self.layout_table.zones)
+        self.columns_px = (int(round(self.layout_table.left_column_x * s)), int(round(self.layout_table.right_column_x * s)))
+        self.icon_w_px = int(round(ICON_WIDTH * s))
+        self.pad_px = int(round(ICON_PAD * s))  # Отступ в том же масштабе, что и иконки / Padding at the same scale as icons
+        self.buckets_px = tuple(int(round(b * s)) for b in ICON_HEIGHT_BUCKETS)
+        self.setGeometry(0, 0, screen.width(), screen.height())               # Размер во весь экран / Full screen geometry
         self.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint | Qt.Tool)
         # Без рамки, поверх всех, как туловое окно / Frameless, always-on-top, tool window
         self.setAttribute(Qt.WA_TranslucentBackground)                        # Прозрачный фон / Transparent background
@@ -111,13 +119,17 @@ class Overlay(QWidget):
         self.pen = QPen(QColor("yellow")); self.pen.setWidth(2)               # Жёлтая обводка / Yellow pen
 
         # Данные / Data
-        self.data = []                 # list[{hero,counters,box}] — текущие данные / current overlay list
-        self.icon_cache = {}           # Кэш QPixmap для иконок / QPixmap cache for icons
+        # Все иконки декодируются один раз на старте; отсутствующие видны сразу /
+        # All icons are decoded once at startup; missing ones are known right away
+        self.atlas = IconAtlas(ICON_FOLDER, self.icon_w_px, self.buckets_px)
+        self._report_missing_icons()
         self.last_mtime = None         # Последний mtime overlay_data.json / Last mtime of data file
 
-        # Кэш последней удачной отрисовки: hero -> {"box":[...], "side":"L"/"R"} /
-        # Cache of last successful draw per hero
-        self.last_draw = {}
+        # Retained mode: hero -> Block(rect, key, QPixmap) — блок 2×2 собирается один раз при изменении
+        # данных, paintEvent только копирует готовые pixmap; разница блоков — без Qt, в overlay_layout /
+        # Retained mode: the 2×2 block is composed once when data changes, paintEvent only blits pixmaps;
+        # the block diff is Qt-free, in overlay_layout
+        self.retained = RetainedBlocks(self._compose_block, lambda pm: (pm.width(), pm.height()), MIN_BOX_H_FOR_DRAW)
 
         # Таймеры / Timers
         self.timer_data = QTimer(self)                        # Таймер загрузки данных / Data poll timer
@@ -127,14 +139,101 @@ class Overlay(QWidget):
         self.timer_vis  = QTimer(self)                        # Таймер видимости / Visibility timer
         self.timer_vis.timeout.connect(self.update_visibility)# Колбэк / Callback
         self.timer_vis.start(300)                             # Период 300 мс / 300 ms period
+        # Таймер нужен для фокуса Dota 2; флаги при подключённом детекторе берутся из памяти /
+        # The timer is kept for the Dota 2 focus check; with a connected detector the flags come from memory
+
+        # Push-канал: пока детектор подключён, данные приходят сообщениями, а опрос файла стоит /
+        # Push channel: while the detector is connected data arrives as messages and file polling stops
+        self.client = None             # Сокет детектора / Detector socket
+        self.decoder = MessageDecoder()
+        self.pushed_state = None       # (enabled, detected) из канала / from the channel
+        self.server = QLocalServer(self)
+        QLocalServer.removeServer(CHANNEL_NAME)  # Остаток после падения / Leftover after a crash
+        if self.server.listen(CHANNEL_NAME):
+            self.server.newConnection.connect(self.on_connection)
+
+        # Трасса: id приходит перед снапшотом, первая отрисовка после него закрывает путь кадра /
+        # Trace: the id arrives before the snapshot, the first paint after it closes the frame's path
+        self.tracer = TraceWriter(TRACE_PATH, enabled=TRACE_ENABLED)
+        self.trace_id = None           # id следующего снапшота / id of the next snapshot
+        self.paint_trace_id = None     # id, ждущий отрисовки / id waiting for a paint
 
         self.update_visibility()  # Установить начальную видимость / Initial visibility
         self.show()               # Показать окно / Show window
 
+    def _report_missing_icons(self):
+        """Одно предупреждение на старте о героях без иконки (дальше — текстовый фолбэк) /
+        One startup warning about heroes without an icon (text fallback afterwards)."""
+        try:
+            with open(COUNTERS_PATH, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+            heroes = set()
+            for e in entries:
+                heroes.add(e.get("hero"))
+                heroes.update(c if isinstance(c, str) else c.get("counter") for c in e.get("counters", []))
+            heroes.discard(None)
+        except Exception:
+            heroes = set()
+        # Битые файлы уже среди missing (в атлас не попали); отдельной строкой — какие файлы чинить /
+        # Broken files are already among missing (never made it into the atlas); a separate line — which files to fix
+        missing = self.atlas.missing(heroes)
+        if missing:
+            print(f"Overlay: no icon for {len(missing)} heroes: {', '.join(missing)}")
+        if self.atlas.broken:
+            print(f"Overlay: {len(self.atlas.broken)} icon files failed to decode: {', '.join(sorted(self.atlas.broken))}")
+
+    def on_connection(self):
+        """Детектор подключился — переходим с опроса файлов на сообщения /
+        Detector connected — switch from file polling to messages."""
+        sock = self.server.nextPendingConnection()
+        if sock is None:
+            return
+        if self.client is not None:
+            self.client.disconnected.disconnect(self.on_disconnected)
+            self.client.abort()                   # Новый детектор вытесняет старый / A new detector replaces the old one
+        self.client = sock
+        self.decoder = MessageDecoder()
+        sock.readyRead.connect(self.on_ready_read)     # Уведомление сокета вместо таймера / Socket notifier instead of a timer
+        sock.disconnected.connect(self.on_disconnected)
+        self.timer_data.stop()
+
+    def on_ready_read(self):
+        """Применить пришедшие сообщения / Apply received messages."""
+        if self.client is None:
+            return
+        for kind, _seq, payload in self.decoder.feed(bytes(self.client.readAll())):
+            if kind == KIND_TRACE and isinstance(payload, dict):
+                self.trace_id = payload.get("id")
+                sent = payload.get("t")
+                if isinstance(sent, (int, float)):
+                    self.tracer.record(self.trace_id, "receive", sent, (time.time() - sent) * 1000.0)
+            elif kind == KIND_SNAPSHOT:
+                trace_id, self.trace_id = self.trace_id, None
+                with self.tracer.span(trace_id, "layout"):
+                    repaint = self.set_data(payload)
+                if repaint and trace_id:
+                    self.paint_trace_id = trace_id
+            elif kind == KIND_STATE and isinstance(payload, dict):
+                self.pushed_state = (bool(payload.get("enabled", True)), bool(payload.get("detected", False)))
+                self.update_visibility()
+
+    def on_disconnected(self):
+        """Детектор ушёл — снова читаем JSON-файлы (их пишет лаунчер при остановке) /
+        Detector gone — read the JSON files again (the launcher writes them on stop)."""
+        if self.client is not None:
+            self.client.deleteLater()
+        self.client = None
+        self.pushed_state = None
+        self.last_mtime = None
+        self.timer_data.start(500)
+        self.load_data()
+
     def update_visibility(self):
         """Показ/скрытие окна по флагам enabled/detected и фокусу Dota 2 /
         Show/hide window based on enabled/detected and Dota 2 focus."""
-        enabled, detected = read_state()          # Прочитать флаги / Read flags
+        # Флаги из канала, если детектор подключён, иначе из файла /
+        # Flags from the channel when the detector is connected, otherwise from the file
+        enabled, detected = self.pushed_state if self.pushed_state is not None else read_state()
         in_focus = is_dota_foreground()           # Проверить фокус / Foreground check
         should_show = enabled and detected and in_focus  # Логика видимости / Visibility logic
         if should_show and not self.isVisible():
@@ -147,8 +246,7 @@ class Overlay(QWidget):
         Load overlay_data.json when mtime changes."""
         try:
             if not os.path.exists(OVERLAY_DATA_PATH):
-                self.data = []    # Нет файла — нет данных / No file -> no data
-                self.update()     # Перерисовка / Repaint
+                self.set_data([])  # Нет файла — нет данных / No file -> no data
                 return
             mtime = os.path.getmtime(OVERLAY_DATA_PATH)  # Время изменения / mtime
             if self.last_mtime is not None and mtime == self.last_mtime:
@@ -156,92 +254,83 @@ class Overlay(QWidget):
             self.last_mtime = mtime
             with open(OVERLAY_DATA_PATH, "r", encoding="utf-8") as f:
                 txt = f.read().strip()                    # Прочитать текст / Read text
-            self.data = json.loads(txt) if txt else []    # Парсинг / Parse or empty
-            if not isinstance(self.data, list):
-                self.data = []                            # Гарантируем список / Ensure list
+            self.set_data(json.loads(txt) if txt else [])  # Парсинг / Parse or empty
         except Exception:
-            self.data = []                                # На ошибке — пусто / On error -> empty
-        self.update()                                     # Запрос перерисовки / Request repaint
-
-    def _draw_counters(self, painter, hero, box, counters):
-        """Отрисовать 2×2 иконки контрпиков возле бокса героя /
-        Draw 2×2 counter icons near hero box."""
-        x1, y1, x2, y2 = map(int, box)    # Координаты бокса / Box coords
-        w = x2 - x1; h = y2 - y1          # Размеры бокса / Box size
-        if w <= 0 or h <= 0:
-            return False                  # Некорректный бокс / Invalid box
-
-        # Если бокс низкий — используем сохранённый, чтобы не мигало /
-        # If box too short — use cached one to avoid flicker
-        if h < MIN_BOX_H_FOR_DRAW and hero in self.last_draw:
-            box = self.last_draw[hero]["box"]
-            x1, y1, x2, y2 = map(int, box)
-            w = x2 - x1; h = y2 - y1
-            if w <= 0 or h <= 0:
-                return False
-
-        # Выбор стороны по IoU; при 0/равенстве — берем прошлую сторону /
-        # Choose side via IoU; if 0/tie — use last side
-        iou_r = intersection_over_union([x1, y1, x2, y2], RADIANT_ZONE)
-        iou_d = intersection_over_union([x1, y1, x2, y2], DIRE_ZONE)
-        if iou_r == 0 and iou_d == 0 and hero in self.last_draw:
-            draw_left = (self.last_draw[hero]["side"] == "L")  # Предыдущая сторона / Last side
-        else:
-            draw_left = iou_r > iou_d                           # Влево, если ближе к Radiant / Left if nearer Radiant
-
-        icon_h = max(1, int(h * ICON_HEIGHT_RATIO))  # Высота иконки / Icon height
-        icon_w = ICON_WIDTH                           # Ширина иконки / Icon width
-        pad = 5                                       # Отступ между иконками / Padding
-        center_x = LEFT_COLUMN_X if draw_left else RIGHT_COLUMN_X  # Колонка / Column X
-        base_y = y1                                   # Верхняя привязка / Top Y
-
-        # Рисуем сетку 2×2 / Draw 2×2 grid
-        for i, name in enumerate(counters[:4]):
+            self.set_data([])                             # На ошибке — пусто / On error -> empty
+
+    def set_data(self, data):
+        """Принять новые данные, пересчитать раскладку и перерисовать только изменившиеся блоки.
+        Одинаковые данные не вызывают ни раскладки, ни перерисовки. True, если что-то перерисуется.
+        Accept new data, recompute the layout and repaint only the blocks that changed.
+        Identical data triggers neither layout nor repaint. True if anything will be repainted."""
+        dirty = self.retained.set_data(data, self._layout, self.icon_w_px)
+        for x, y, w, h in dirty:
+            self.update(QRect(x, y, w, h))                # Только затронутые области / Affected areas only
+        return bool(dirty)
+
+    def _layout(self, boxes, prev_side):
+        """Раскладка в экранных пикселях / Layout in screen pixels."""
+        boxes_px = [scale_rect(b, self.layout_table.scale) for b in boxes]
+        return compute_layout(boxes_px, prev_side, self.zones_px, self.columns_px,
+                              self.icon_w_px, self.pad_px, ICON_HEIGHT_RATIO, self.buckets_px)
+
+    def _compose_block(self, icon_w, icon_h, counters):
+        """Собрать 2×2 иконки контрпиков в один прозрачный QPixmap /
+        Compose the 2×2 counter icons into one transparent QPixmap."""
+        metrics = QFontMetrics(self.font)
+        cells = []
+        width, height = 2 * icon_w + self.pad_px, 2 * icon_h + self.pad_px
+        for i, name in enumerate(counters):
             row, col = divmod(i, 2)                                     # Ряд и колонка / Row and column
-            base_x = center_x - icon_w - pad // 2                       # Базовый X / Base X
-            cx = base_x + col * (icon_w + pad)                          # X иконки / Icon X
-            cy = base_y + row * (icon_h + pad)                          # Y иконки / Icon Y
-            icon_path = os.path.join(ICON_FOLDER, f"{name}.jpg")        # Путь иконки / Icon path
-            if os.path.exists(icon_path):
-                key = (name, icon_w, icon_h)                            # Ключ кэша / Cache key
-                pm = self.icon_cache.get(key)                           # Попытка из кэша / Try cache
-                if pm is None:
-                    pm = QPixmap(icon_path).scaled(
-                        icon_w, icon_h, Qt.IgnoreAspectRatio, Qt.SmoothTransformation
-                    )                                                   # Масштабирование / Scale
-                    self.icon_cache[key] = pm                           # Сохранить в кэш / Store in cache
+            cx = col * (icon_w + self.pad_px)                           # X иконки / Icon X
+            cy = row * (icon_h + self.pad_px)                           # Y иконки / Icon Y
+            pm = self.atlas.icon(name, icon_h)                          # Без обращения к диску / No disk access
+            if pm is None:
+                # Текст может выйти за ячейку — расширяем блок / Text may overflow the cell — grow the block
+                width = max(width, cx + metrics.horizontalAdvance(name))
+                height = max(height, cy + 20 + metrics.descent())
+            cells.append((cx, cy, name, pm))
+
+        block = QPixmap(width, height)
+        block.fill(Qt.transparent)
+        painter = QPainter(block)
+        painter.setFont(self.font)            # Настроить шрифт / Set font
+        painter.setPen(self.pen)              # Настроить перо / Set pen
+        for cx, cy, name, pm in cells:
+            if pm is not None:
                 painter.drawPixmap(QRect(cx, cy, icon_w, icon_h), pm)   # Рисуем иконку / Draw icon
             else:
                 painter.drawText(cx, cy + 20, name)                     # Фолбэк: текст / Fallback: text
-
-        # Сохранить успешную отрисовку (бокс и сторона) /
-        # Remember last successful draw (box and side)
-        self.last_draw[hero] = {"box": [x1, y1, x2, y2], "side": "L" if draw_left else "R"}
-        return True
+        painter.end()
+        return block
 
     def paintEvent(self, event):
-        """Основная отрисовка на прозрачном окне / Main painting on transparent window."""
-        if not self.data:
-            return                            # Нет данных — ничего не рисуем / No data -> nothing to draw
-        painter = QPainter(self)              # Создать рисовальщика / Create painter
-        painter.setFont(self.font)            # Настроить шрифт / Set font
-        painter.setPen(self.pen)              # Настроить перо / Set pen
-
-        for item in self.data:                # Пройти по героям / Iterate heroes
-            hero = item.get("hero")           # Имя героя / Hero name
-            box = item.get("box", [0, 0, 0, 0])       # Бокс / Box
-            counters = item.get("counters", [])       # Контрпики / Counters
-            if not hero or not (isinstance(box, list) and len(box) == 4):
-                continue                      # Пропустить некорректные записи / Skip invalid items
-
-            ok = self._draw_counters(painter, hero, box, counters)  # Попытка отрисовки / Try draw
-            if not ok and hero in self.last_draw:
-                # Если не удалось — рисуем по кэшу, чтобы не мигало /
-                # If failed — draw from cache to avoid flicker
-                cached = self.last_draw[hero]
-                self._draw_counters(painter, hero, cached["box"], counters)
+        """Копирование готовых блоков в грязную область / Blit the ready blocks into the dirty area."""
+        trace_id, self.paint_trace_id = self.paint_trace_id, None
+        with self.tracer.span(trace_id, "paint"):
+            if not self.retained.blocks:
+                return                        # Нет данных — ничего не рисуем / No data -> nothing to draw
+            area = event.rect()
+            painter = QPainter(self)          # Создать рисовальщика / Create painter
+            for block in self.retained.blocks.values():
+                if QRect(*block.rect).intersects(area):
+                    painter.drawPixmap(block.rect[0], block.rect[1], block.image)
+            painter.end()                     # Конец рисования — в пределах стадии / End painting within the stage
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)  # Создать приложение Qt / Create Qt application
     overlay = Overlay()           # Создать и показать оверлей / Create and show overlay
-    sys.exit(app.exec_())         # Запуск цикла событий / Run event loop
+
+    # --report-memory: пик к первому циклу событий и RSS в работе / peak by the first event loop pass and steady RSS
+    memory = MemoryReport("overlay", os.path.join(BASE_DIR, "memory_overlay.json"),
+                          enabled=REPORT_MEMORY or "--report-memory" in sys.argv)
+    if memory.enabled:
+        QTimer.singleShot(0, memory.mark_ready)
+        memory_timer = QTimer()
+        memory_timer.timeout.connect(memory.maybe_sample)
+        memory_timer.start(int(memory.interval * 1000))
+
+    code = app.exec_()            # Запуск цикла событий / Run event loop
+    overlay.tracer.close()        # Дописать буфер трассы / Flush the trace buffer
+    memory.report("exit")         # Итог по памяти / Memory summary
+    sys.exit(code)
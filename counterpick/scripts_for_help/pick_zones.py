@@ -0,0 +1,167 @@
+from functools import lru_cache  # Раскладка считается один раз на размер / Layout computed once per size
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple  # Типы для аннотаций / Type hints
+
+Rect = Tuple[int, int, int, int]  # (x1, y1, x2, y2) в пикселях экрана / screen pixels
+
+# === Зоны пиков (1920x1080) / Pick zones (1920x1080) ===
+# Общая геометрия для оверлея и детектора / Shared geometry for overlay and detector
+RADIANT_ZONE: Rect = (1465, 215, 1540, 715)  # Прямоугольник зоны Radiant / Radiant zone rect
+DIRE_ZONE: Rect = (1575, 215, 1650, 715)     # Прямоугольник зоны Dire / Dire zone rect
+LEFT_COLUMN_X = 1343                         # Колонка иконок Radiant / Radiant icon column
+RIGHT_COLUMN_X = 1720                        # Колонка иконок Dire / Dire icon column
+
+# Запас вокруг зон для ROI: боксы героев выходят за края колонок /
+# ROI margin around zones: hero boxes stick out of the columns
+ROI_MARGIN_X = 20
+ROI_MARGIN_Y = 15
+
+SLOTS_PER_ZONE = 5  # Слотов пиков в колонке стороны / Pick slots in a side's column
+
+# === Рабочее разрешение / Working resolution ===
+# Захват уменьшает кадр до этой высоты (с сохранением пропорций); боксы детектора и
+# overlay_data.json — в рабочих пикселях, оверлей переводит их в экранные /
+# Capture downscales frames to this height (keeping the aspect); detector boxes and
+# overlay_data.json are in working pixels, the overlay converts them to screen pixels
+REFERENCE_HEIGHT = 1080
+WORK_HEIGHT = 1080
+
+
+class AspectGeometry(NamedTuple):
+    """Эталонная геометрия интерфейса при высоте REFERENCE_HEIGHT / Reference UI geometry at REFERENCE_HEIGHT."""
+    width: int
+    radiant_zone: Rect
+    dire_zone: Rect
+    left_column_x: int
+    right_column_x: int
+
+
+def _center_anchored(width: int) -> AspectGeometry:
+    """Геометрия 16:9, перенесённая на другую ширину: интерфейс привязан к центру экрана.
+    16:9 geometry moved to another width: the UI is anchored to the screen centre."""
+    dx = (width - 1920) // 2
+    return AspectGeometry(
+        width,
+        (RADIANT_ZONE[0] + dx, RADIANT_ZONE[1], RADIANT_ZONE[2] + dx, RADIANT_ZONE[3]),
+        (DIRE_ZONE[0] + dx, DIRE_ZONE[1], DIRE_ZONE[2] + dx, DIRE_ZONE[3]),
+        LEFT_COLUMN_X + dx, RIGHT_COLUMN_X + dx,
+    )
+
+
+# Таблица по соотношению сторон; запись можно заменить откалиброванной /
+# Table by aspect ratio; an entry can be replaced with a calibrated one
+ASPECT_GEOMETRY: Dict[str, AspectGeometry] = {
+    "16:9": AspectGeometry(1920, RADIANT_ZONE, DIRE_ZONE, LEFT_COLUMN_X, RIGHT_COLUMN_X),
+    "16:10": _center_anchored(1728),
+    "21:9": _center_anchored(2560),
+}
+_ASPECT_RATIOS = {"16:9": 16 / 9, "16:10": 16 / 10, "21:9": 64 / 27}
+
+
+class ScreenLayout(NamedTuple):
+    """Общая раскладка для захвата, детектора и оверлея.
+    Зоны и колонки — в рабочих пикселях; scale — экранных пикселей на рабочий.
+    Shared layout for capture, detector and overlay.
+    Zones and columns are in working pixels; scale — screen pixels per working pixel."""
+    aspect: str
+    screen: Tuple[int, int]  # (w, h) монитора / monitor
+    work: Tuple[int, int]    # (w, h) рабочего кадра / working frame
+    scale: float
+    radiant_zone: Rect
+    dire_zone: Rect
+    left_column_x: int
+    right_column_x: int
+    roi_margin: Tuple[int, int]
+
+    @property
+    def zones(self) -> Tuple[Rect, Rect]:
+        return self.radiant_zone, self.dire_zone
+
+
+def aspect_name(width: int, height: int) -> str:
+    """Ближайшее из поддерживаемых соотношений / Nearest supported aspect ratio."""
+    ratio = width / float(height)
+    return min(_ASPECT_RATIOS, key=lambda k: abs(_ASPECT_RATIOS[k] - ratio))
+
+
+def work_size(width: int, height: int, work_height: int = WORK_HEIGHT) -> Tuple[int, int]:
+    """Рабочий размер кадра: только уменьшение до work_height / Working frame size: downscale to work_height only."""
+    if height <= work_height:
+        return width, height
+    return int(round(width * work_height / float(height))), work_height
+
+
+@lru_cache(maxsize=8)
+def layout_for(width: int, height: int, work_height: int = WORK_HEIGHT) -> ScreenLayout:
+    """Раскладка для монитора width×height (считается один раз на размер).
+    Layout for a width×height monitor (computed once per size)."""
+    aspect = aspect_name(width, height)
+    ref = ASPECT_GEOMETRY[aspect]
+    ww, wh = work_size(width, height, work_height)
+    g = wh / float(REFERENCE_HEIGHT)  # Эталон -> рабочие пиксели / Reference -> working pixels
+
+    def fx(x: int) -> int:
+        # От центра: точная ширина монитора может отличаться от эталона аспекта /
+        # From the centre: the exact monitor width may differ from the aspect reference
+        return int(round(ww / 2.0 + (x - ref.width / 2.0) * g))
+
+    def fr(r: Rect) -> Rect:
+        return fx(r[0]), int(round(r[1] * g)), fx(r[2]), int(round(r[3] * g))
+
+    return ScreenLayout(
+        aspect, (width, height), (ww, wh), height / float(wh),
+        fr(ref.radiant_zone), fr(ref.dire_zone), fx(ref.left_column_x), fx(ref.right_column_x),
+        (int(round(ROI_MARGIN_X * g)), int(round(ROI_MARGIN_Y * g))),
+    )
+
+
+def expand(rect: Rect, dx: int, dy: int) -> Rect:
+    """Расширить прямоугольник на dx/dy с каждой стороны / Grow rect by dx/dy on each side."""
+    x1, y1, x2, y2 = rect
+    return (x1 - dx, y1 - dy, x2 + dx, y2 + dy)
+
+
+def pick_rois(layout: Optional[ScreenLayout] = None) -> List[Rect]:
+    """ROI для инференса: полосы пиков Radiant и Dire с запасом (по умолчанию — 1920x1080).
+    Inference ROIs: Radiant and Dire pick strips with margin (1920x1080 by default)."""
+    if layout is None:
+        layout = layout_for(1920, 1080)
+    mx, my = layout.roi_margin
+    return [expand(layout.radiant_zone, mx, my), expand(layout.dire_zone, mx, my)]
+
+
+def pick_slots(layout: Optional[ScreenLayout] = None) -> List[Rect]:
+    """10 слотов пиков без запаса: 5 строк Radiant сверху вниз, затем 5 строк Dire.
+    The 10 pick slots without margin: 5 Radiant rows top to bottom, then 5 Dire rows."""
+    if layout is None:
+        layout = layout_for(1920, 1080)
+    slots = []
+    for x1, y1, x2, y2 in layout.zones:
+        for i in range(SLOTS_PER_ZONE):
+            # Границы строк округляются отдельно — слоты стыкуются без щелей /
+            # Row edges are rounded separately — slots meet without gaps
+            top = y1 + int(round((y2 - y1) * i / float(SLOTS_PER_ZONE)))
+            bottom = y1 + int(round((y2 - y1) * (i + 1) / float(SLOTS_PER_ZONE)))
+            slots.append((x1, top, x2, bottom))
+    return slots
+
+
+def slot_strips(slots: Sequence[Rect], indices: Sequence[int], margin: Tuple[int, int] = (0, 0)) -> List[Rect]:
+    """ROI для выбранных слотов: соседние слоты одной колонки сливаются в одну полосу, затем запас.
+    ROIs for the chosen slots: adjacent slots of one column merge into one strip, then the margin."""
+    strips: List[Rect] = []
+    prev = -2
+    for i in sorted(indices):
+        x1, y1, x2, y2 = slots[i]
+        if i == prev + 1 and i % SLOTS_PER_ZONE:  # Продолжение полосы той же колонки / Same column strip continues
+            sx1, sy1, _, _ = strips[-1]
+            strips[-1] = (sx1, sy1, x2, y2)
+        else:
+            strips.append((x1, y1, x2, y2))
+        prev = i
+    mx, my = margin
+    return [expand(r, mx, my) for r in strips]
+
+
+def scale_rect(rect: Rect, scale: float) -> Rect:
+    """Рабочие пиксели -> экранные / Working pixels -> screen pixels."""
+    return tuple(int(round(v * scale)) for v in rect)
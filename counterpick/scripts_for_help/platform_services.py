@@ -0,0 +1,114 @@
+import os   # Пути рядом с исполняемым файлом / Paths next to the executable
+import sys  # Определение платформы, stderr / Platform detection, stderr
+from typing import Callable, NamedTuple, Tuple  # Типы для аннотаций / Type hints
+
+# === Платформенные службы процесса детектора / Detector process platform services ===
+# Всё, что завязано на WinAPI и расположение .exe, — здесь, чтобы ядро детектора импортировалось
+# и работало на любой ОС (бенчмарки, тесты). На Windows поведение прежнее.
+# Everything tied to WinAPI and the .exe location lives here, so the detector core imports and runs
+# on any OS (benchmarks, tests). On Windows the behaviour is unchanged.
+
+ERROR_ALREADY_EXISTS = 183  # Код: мьютекс уже существует / Mutex already exists
+
+
+class DetectorPaths(NamedTuple):
+    """Файлы процесса детектора / Detector process files."""
+    base_dir: str
+    save_dir: str      # tmp_screenshots
+    model: str         # best.pt
+    counters: str      # counters.json
+    overlay_data: str  # overlay_data.json
+    state: str         # overlay_state.json
+    metrics: str       # metrics_detector.json
+    trace: str         # trace_detector.jsonl
+    memory: str        # memory_detector.json
+
+    @classmethod
+    def under(cls, base_dir: str) -> "DetectorPaths":
+        join = lambda name: os.path.join(base_dir, name)  # noqa: E731
+        return cls(base_dir, join("tmp_screenshots"), join("best.pt"), join("counters.json"),
+                   join("overlay_data.json"), join("overlay_state.json"),
+                   join("metrics_detector.json"), join("trace_detector.jsonl"), join("memory_detector.json"))
+
+
+def default_base_dir() -> str:
+    """Для .exe — папка рядом с исполняемым файлом (как и раньше) / For .exe — the folder next to the executable (as before)."""
+    return os.path.dirname(sys.executable)
+
+
+class NullLock:
+    """Без защиты от второго экземпляра (не Windows, тесты) / No single-instance guard (non-Windows, tests)."""
+
+    def acquire(self) -> bool:
+        return True
+
+    def release(self) -> None:
+        pass
+
+
+class WindowsMutexLock:
+    """Именованный мьютекс WinAPI: второй экземпляр видит, что он уже есть.
+    WinAPI named mutex: a second instance sees that it already exists."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._handle = None
+
+    def acquire(self) -> bool:
+        """True — мы единственные; False — уже запущен; OSError — мьютекс не создать.
+        True — we are the only one; False — already running; OSError — the mutex cannot be created."""
+        import ctypes
+        kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)  # kernel32.dll для мьютекса / kernel32 for mutex
+        handle = kernel32.CreateMutexW(None, False, ctypes.c_wchar_p(self.name))
+        if not handle:
+            raise OSError(ctypes.get_last_error(), f"CreateMutexW failed for {self.name}")
+        if ctypes.get_last_error() == ERROR_ALREADY_EXISTS:
+            kernel32.CloseHandle(handle)  # Освобождаем хэндл / Release handle
+            return False
+        self._handle = (kernel32, handle)
+        return True
+
+    def release(self) -> None:
+        if self._handle is not None:
+            kernel32, handle = self._handle
+            kernel32.CloseHandle(handle)
+            self._handle = None
+
+
+def show_error_box(title: str, msg: str) -> None:
+    """Системное окно с ошибкой (Windows), иначе stderr.
+    System error box (Windows), stderr elsewhere."""
+    try:
+        from ctypes import windll, c_wchar_p
+        windll.user32.MessageBoxW(0, c_wchar_p(msg), c_wchar_p(title), 0x10)  # MB_ICONERROR
+    except Exception:
+        print(f"{title}: {msg}", file=sys.stderr)
+
+
+def primary_screen_size() -> Tuple[int, int]:
+    """Размер основного монитора (Windows), иначе 1920×1080. Нужен только прогреву модели.
+    Primary monitor size (Windows), 1920×1080 elsewhere. Only used by the model warmup."""
+    try:
+        from ctypes import windll
+        w, h = windll.user32.GetSystemMetrics(0), windll.user32.GetSystemMetrics(1)  # SM_CXSCREEN, SM_CYSCREEN
+        if w > 0 and h > 0:
+            return w, h
+    except Exception:
+        pass
+    return 1920, 1080
+
+
+class PlatformServices(NamedTuple):
+    """Подменяемые службы: защита от второго экземпляра, окно ошибки, пути, размер экрана.
+    Pluggable services: single-instance lock, error box, paths, screen size."""
+    lock: object                          # acquire() -> bool, release()
+    show_error: Callable[[str, str], None]
+    paths: DetectorPaths
+    screen_size: Callable[[], Tuple[int, int]] = primary_screen_size
+
+
+def default_services(mutex_name: str, base_dir: str = None) -> PlatformServices:
+    """Службы текущей платформы: на Windows мьютекс и MessageBox, иначе без блокировки и stderr.
+    Services of the current platform: mutex and MessageBox on Windows, otherwise no lock and stderr."""
+    lock = WindowsMutexLock(mutex_name) if sys.platform.startswith("win") else NullLock()
+    return PlatformServices(lock, show_error_box, DetectorPaths.under(base_dir or default_base_dir()))
@@ -0,0 +1,44 @@
+from typing import Dict, List, Tuple  # Типы для аннотаций / Type hints
+
+import numpy as np  # Векторная обработка боксов / Vectorized box processing
+
+
+def best_per_class(xyxy: np.ndarray, conf: np.ndarray, cls: np.ndarray, min_height: float) -> np.ndarray:
+    """Индексы боксов: фильтр по высоте и лучший по уверенности на каждый класс.
+    Box indices: height filter and the most confident box per class."""
+    heights = xyxy[:, 3].astype(np.int64) - xyxy[:, 1].astype(np.int64)  # Высота в целых пикселях / Height in whole pixels
+    keep = np.flatnonzero(heights >= min_height)  # Фильтр по высоте / Height filter
+    if not len(keep):
+        return keep
+    # Сортировка: класс по возрастанию, уверенность по убыванию / Sort: class asc, confidence desc
+    order = keep[np.lexsort((-conf[keep], cls[keep]))]
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = cls[order][1:] != cls[order][:-1]  # Первый в группе класса = лучший / First of a class group = best
+    return order[first]
+
+
+def select_heroes(xyxy: np.ndarray, conf: np.ndarray, cls: np.ndarray,
+                  counter_table: np.ndarray, min_height: float) -> Tuple[List[int], List[Tuple[str, ...]], List[List[int]]]:
+    """Герои кадра: (class_ids, контрпики, боксы) — лучший бокс на класс, только герои с контрпиками.
+    counter_table — CounterIndex.class_table(): class_id -> tuple контрпиков.
+    Frame heroes: (class_ids, counters, boxes) — best box per class, heroes with counters only.
+    counter_table — CounterIndex.class_table(): class_id -> tuple of counters."""
+    idx = best_per_class(xyxy, conf, cls, min_height)
+    if not len(idx):
+        return [], [], []
+    counters = counter_table[cls[idx]]                     # Поиск контрпиков одним индексом / One indexed lookup
+    has_counters = np.fromiter((len(c) > 0 for c in counters), dtype=bool, count=len(idx))
+    idx, counters = idx[has_counters], counters[has_counters]
+    boxes = xyxy[idx].astype(int).tolist()                 # Отсечение дробной части, как раньше / Truncate as before
+    return cls[idx].tolist(), list(counters), boxes
+
+
+def build_snapshot(xyxy: np.ndarray, conf: np.ndarray, cls: np.ndarray,
+                   names: Dict[int, str], counter_table: np.ndarray, min_height: float) -> List[Dict]:
+    """Снапшот кадра [{hero, counters, box}] из массивов детекций.
+    Frame snapshot [{hero, counters, box}] from detection arrays."""
+    class_ids, counters, boxes = select_heroes(xyxy, conf, cls, counter_table, min_height)
+    return [
+        {"hero": names[c], "counters": list(cs), "box": box}
+        for c, cs, box in zip(class_ids, counters, boxes)
+    ]
@@ -0,0 +1,70 @@
+from typing import List, NamedTuple, Sequence, Tuple  # Типы для аннотаций / Type hints
+
+import numpy as np  # Склейка кропов и пересчёт боксов / Crop stacking and box mapping
+
+from pick_zones import Rect  # Прямоугольник экрана / Screen rect
+
+STACK_GAP = 16  # Пустая полоса между кропами, чтобы боксы не склеивались / Blank gap so boxes don't merge
+
+
+class Placement(NamedTuple):
+    """Где кроп лежит на холсте и откуда он взят с экрана.
+    Where a crop sits on the canvas and where it came from on screen."""
+    canvas_x: int  # Левый край на холсте / Left edge on canvas
+    src_x: int     # Левый край на экране / Left edge on screen
+    src_y: int     # Верхний край на экране / Top edge on screen
+    width: int
+    height: int
+
+
+def stack_rois(img: np.ndarray, rois: Sequence[Rect], gap: int = STACK_GAP) -> Tuple[np.ndarray, List[Placement]]:
+    """Вырезать ROI и сложить их по горизонтали в один холст.
+    Crop the ROIs and stack them horizontally into one canvas."""
+    H, W = img.shape[:2]
+    crops, placements = [], []
+    x = 0
+    for x1, y1, x2, y2 in rois:
+        # Обрезаем по границам кадра / Clamp to frame bounds
+        x1, x2 = max(0, x1), min(W, x2)
+        y1, y2 = max(0, y1), min(H, y2)
+        if x2 <= x1 or y2 <= y1:
+            continue  # ROI вне кадра / ROI outside frame
+        crops.append(img[y1:y2, x1:x2])
+        placements.append(Placement(x, x1, y1, x2 - x1, y2 - y1))
+        x += (x2 - x1) + gap
+
+    if not crops:
+        return img[:0, :0], []  # Пустой холст / Empty canvas
+
+    canvas_h = max(p.height for p in placements)
+    canvas_w = x - gap
+    canvas = np.zeros((canvas_h, canvas_w) + img.shape[2:], dtype=img.dtype)
+    for crop, p in zip(crops, placements):
+        canvas[:p.height, p.canvas_x:p.canvas_x + p.width] = crop  # Копия пикселей ROI / Copy ROI pixels
+    return canvas, placements
+
+
+def boxes_to_screen(xyxy: np.ndarray, placements: Sequence[Placement]) -> np.ndarray:
+    """Перевести боксы (N, 4) из координат холста в координаты экрана.
+    Бокс относится к кропу, в который попадает его центр.
+    Map (N, 4) boxes from canvas to screen coordinates.
+    A box belongs to the crop containing its center."""
+    out = np.asarray(xyxy, dtype=np.float32).reshape(-1, 4).copy()
+    if not len(out) or not placements:
+        return out
+    cx = (out[:, 0] + out[:, 2]) * 0.5
+    starts = np.array([p.canvas_x for p in placements], dtype=np.float32)
+    idx = np.clip(np.searchsorted(starts, cx, side="right") - 1, 0, len(placements) - 1)
+
+    canvas_x = starts[idx]
+    width = np.array([p.width for p in placements], dtype=np.float32)[idx]
+    height = np.array([p.height for p in placements], dtype=np.float32)[idx]
+    src_x = np.array([p.src_x for p in placements], dtype=np.float32)[idx]
+    src_y = np.array([p.src_y for p in placements], dtype=np.float32)[idx]
+
+    # Обрезаем по своему кропу и сдвигаем на экран / Clip to own crop and shift to screen
+    xs = np.clip(out[:, [0, 2]] - canvas_x[:, None], 0, width[:, None])
+    ys = np.clip(out[:, [1, 3]], 0, height[:, None])
+    out[:, [0, 2]] = xs + src_x[:, None]
+    out[:, [1, 3]] = ys + src_y[:, None]
+    return out
@@ -0,0 +1,109 @@
+import os  # Переменные окружения / Environment variables
+
+# === Общие настройки процессов / Shared process settings ===
+# Значения можно переопределить переменными окружения без пересборки .exe /
+# Values can be overridden via environment variables without rebuilding the .exe
+
+
+def _env_str(name: str, default: str) -> str:
+    """Строковая настройка из окружения / String setting from environment."""
+    value = os.environ.get(name, "").strip()  # Пустое значение = по умолчанию / Empty means default
+    return value.lower() if value else default
+
+
+def _env_int(name: str, default: int) -> int:
+    """Целочисленная настройка из окружения / Integer setting from environment."""
+    try:
+        return int(os.environ.get(name, default))  # Парсим число / Parse number
+    except (TypeError, ValueError):
+        return default  # Битое значение — по умолчанию / Bad value -> default
+
+
+def _env_float(name: str, default: float) -> float:
+    """Дробная настройка из окружения / Float setting from environment."""
+    try:
+        return float(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+# === Транспорт кадров / Frame transport ===
+# "shm" — кольцевой буфер в общей памяти, "png" — старый режим через tmp_screenshots /
+# "shm" — shared-memory ring buffer, "png" — legacy mode via tmp_screenshots
+FRAME_TRANSPORT = _env_str("COUNTERPICK_TRANSPORT", "shm")
+
+RING_NAME = _env_str("COUNTERPICK_RING_NAME", "counterpick_frames")  # Имя общей памяти / Shared memory name
+
+# Формат файлов в режиме "png": png | png-fast | npy | raw (см. frame_codec) /
+# File format in "png" transport mode: png | png-fast | npy | raw (see frame_codec)
+CAPTURE_FORMAT = _env_str("COUNTERPICK_CAPTURE_FORMAT", "png")
+# "full" — весь монитор; "zones" — только область зон пиков (нужен формат raw: он хранит начало области) /
+# "full" — the whole monitor; "zones" — only the pick-zone area (needs the raw format: it stores the origin)
+CAPTURE_REGION = _env_str("COUNTERPICK_CAPTURE_REGION", "full")
+
+# === Очередь кадров / Frame queue ===
+# Глубина очереди между захватом и детектором / Queue depth between capture and detector
+QUEUE_DEPTH = max(1, _env_int("COUNTERPICK_QUEUE_DEPTH", 2))
+# "skip" — захват пропускает кадры, пока очередь полна (обратное давление);
+# "drop_oldest" — захват пишет всегда, детектор выбрасывает старые и берёт свежие /
+# "skip" — capture skips frames while the queue is full (backpressure);
+# "drop_oldest" — capture always writes, the detector drops stale frames and keeps the latest
+QUEUE_POLICY = _env_str("COUNTERPICK_QUEUE_POLICY", "skip")
+
+# Кольцо должно вмещать очередь и кадр, который пишется / Ring must hold the queue plus the frame being written
+RING_SLOTS = max(QUEUE_DEPTH + 1, _env_int("COUNTERPICK_RING_SLOTS", 4))  # Кол-во слотов кольца / Ring slot count
+
+# === Режим инференса / Inference mode ===
+# "roi" — только полосы пиков, склеенные в один кроп; "full" — весь кадр /
+# "roi" — only the pick strips stacked into one crop; "full" — the whole frame
+INFER_MODE = _env_str("COUNTERPICK_INFER_MODE", "roi")
+# Кэш слотов (только "roi"): уверенность, с которой слот пика блокируется и больше не идёт в модель,
+# пока не изменится его отпечаток; 0 — выключено /
+# Slot cache ("roi" only): confidence at which a pick slot is locked and skips the model until
+# its fingerprint changes; 0 disables
+SLOT_LOCK_CONF = _env_float("COUNTERPICK_SLOT_LOCK_CONF", 0.8)
+
+# === Бэкенд инференса / Inference backend ===
+# "auto" — CUDA, если есть, иначе ONNX Runtime на CPU, иначе torch на CPU /
+# "auto" — CUDA if present, else ONNX Runtime on CPU, else torch on CPU
+INFER_BACKEND = _env_str("COUNTERPICK_BACKEND", "auto")            # auto | cuda | onnx | torch-cpu
+ONNX_INT8 = _env_int("COUNTERPICK_ONNX_INT8", 0) == 1               # INT8-квантизация ONNX / INT8 ONNX quantization
+ONNX_THREADS = _env_int("COUNTERPICK_ONNX_THREADS", 0)              # Потоки ORT, 0 = авто / ORT threads, 0 = auto
+
+# === Батчинг инференса / Inference batching ===
+# До BATCH_SIZE кадров из очереди за один проход модели; 1 — по кадру (минимальная задержка) /
+# Up to BATCH_SIZE queued frames per forward pass; 1 — frame by frame (lowest latency)
+BATCH_SIZE = max(1, _env_int("COUNTERPICK_BATCH_SIZE", 1))
+BATCH_DEADLINE_MS = max(0, _env_int("COUNTERPICK_BATCH_DEADLINE_MS", 30))  # Ожидание добора батча / Wait to fill a batch
+
+# === Пропуск неизменных кадров на захвате / Capture-side skipping of unchanged frames ===
+# Средняя разница зон пиков (уровни серого), ниже которой кадр не отправляется; 0 — выключено /
+# Mean pick-zone difference (gray levels) below which a frame is not sent; 0 disables
+CHANGE_THRESHOLD = _env_float("COUNTERPICK_CHANGE_THRESHOLD", 3.0)
+KEYFRAME_INTERVAL = _env_float("COUNTERPICK_KEYFRAME_INTERVAL", 10.0)  # Принудительный кадр, с / Forced frame, s
+
+# === Флаг detected в overlay_state.json / detected flag in overlay_state.json ===
+# Пустых кадров подряд до detected=False (гистерезис против мигания) /
+# Consecutive empty frames before detected=False (hysteresis against flicker)
+STATE_CLEAR_FRAMES = max(1, _env_int("COUNTERPICK_STATE_CLEAR_FRAMES", 3))
+
+# === Трассировка задержки / Latency tracing ===
+# 1 — захват, детектор и оверлей пишут стадии кадров в trace_<proc>.jsonl (см. latency_trace) /
+# 1 — capture, detector and overlay write frame stages to trace_<proc>.jsonl (see latency_trace)
+TRACE_ENABLED = _env_int("COUNTERPICK_TRACE", 0) == 1
+
+# === Старт детектора / Detector startup ===
+# Кэш экспортов модели по хэшу весов; пусто — model_cache рядом с весами (путь без приведения регистра) /
+# Model export cache keyed by the weights hash; empty — model_cache next to the weights (path kept as is)
+MODEL_CACHE_DIR = os.environ.get("COUNTERPICK_MODEL_CACHE", "").strip()
+# "torchscript" — на CUDA грузить закэшированный TorchScript FP16 вместо best.pt; "none" — как раньше /
+# "torchscript" — on CUDA load a cached TorchScript FP16 export instead of best.pt; "none" — as before
+CUDA_EXPORT = _env_str("COUNTERPICK_CUDA_EXPORT", "none")
+# Прогрев на пустом кадре до приёма кадров: выбор ядер не падает на первый кадр драфта /
+# Warmup on a blank frame before taking frames: kernel selection does not land on the first draft frame
+WARMUP = _env_int("COUNTERPICK_WARMUP", 1) == 1
+
+# === Отчёт о памяти / Memory report ===
+# 1 (или --report-memory) — детектор, оверлей и лаунчер пишут RSS в консоль и memory_<proc>.json /
+# 1 (or --report-memory) — the detector, overlay and launcher print RSS and write memory_<proc>.json
+REPORT_MEMORY = _env_int("COUNTERPICK_REPORT_MEMORY", 0) == 1
@@ -1,100 +1,48 @@
-import os  # Работа с файловой системой / File system operations
-import cv2  # OpenCV для чтения изображений / OpenCV for image handling
 import time  # Паузы и таймеры / Delays and timing
+_STARTED = time.perf_counter()  # Отсчёт профиля старта — до остальных импортов / Startup profile origin — before the other imports
+import argparse  # Аргументы CLI / CLI arguments
+import os  # Работа с файловой системой / File system operations
 import json  # Работа с JSON-файлами / JSON file handling
-from ultralytics import YOLO  # Модель YOLO от Ultralytics / Ultralytics YOLO model
 import sys  # Системные функции / System-specific parameters
 import signal  # Обработка системных сигналов / OS signal handling
-from typing import Tuple, List, Dict  # Типы для аннотаций / Type hints
-import torch  # PyTorch для CUDA-проверок и режима инференса / PyTorch for CUDA checks & inference mode
-import stat      # Манипуляция атрибутами файла (снять read-only)
-# === WinAPI named mutex (single instance) / Именованный мьютекс (единственный экземпляр) ===
-import atexit  # Финализатор для закрытия дескриптора / Finalizer to close handle
-import ctypes
-
-kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)  # kernel32.dll для мьютекса / kernel32 for mutex
-CreateMutexW = kernel32.CreateMutexW                      # Создание/открытие мьютекса / Create/Open mutex
-CloseHandle = kernel32.CloseHandle                        # Закрытие дескриптора / Close handle
-ERROR_ALREADY_EXISTS = 183                                # Код: мьютекс уже существует / Mutex already exists
-
-# === Single-instance guard (detector) / Защита от второго экземпляра (детектор) ===
-MUTEX_NAME = r"Global\COUNTERPICK_DETECTOR_MUTEX"  # Уникальное имя для детектора / Unique name for detector
-hMutex = CreateMutexW(None, False, ctypes.c_wchar_p(MUTEX_NAME))
-if not hMutex:
-    sys.exit(1)  # Не получили дескриптор — выходим / Failed to get handle -> exit
-
-if ctypes.get_last_error() == ERROR_ALREADY_EXISTS:
-    # Экземпляр уже запущен — тихо завершаемся / Already running — exit quietly
-    CloseHandle(hMutex)
-    sys.exit(0)
-
-atexit.register(lambda: CloseHandle(hMutex))  # Закрыть мьютекс при выходе / Release on exit
-# === END single-instance guard ===
-
-
-# === GPU required check / Проверка обязательной доступности CUDA ===
-try:
-    # Базовая проверка доступности CUDA / Basic CUDA availability
-    if not torch.cuda.is_available() or torch.cuda.device_count() == 0:
-        raise RuntimeError("CUDA not available (no device)")
-
-    # Доп. проверка аллокации на GPU / Extra safety: try to allocate on GPU
-    torch.zeros(1, device="cuda")
-
-except Exception as e:
-    # Показать системное окно с ошибкой и завершиться кодом 2 / Show MessageBox and exit(2)
-    try:
-        from ctypes import windll, c_wchar_p
-        msg = (
-            "CUDA недоступна или драйвер не разрешает доступ.\n"
-            "Установите драйверы NVIDIA и разрешите приложению доступ в Защитнике Windows.\n"
-            f"(error: {e})"
-        )
-        windll.user32.MessageBoxW(
-            0, c_wchar_p(msg), c_wchar_p("Counterpick — GPU required"), 0x10  # MB_ICONERROR
-        )
-    except Exception:
-        pass
-    sys.exit(2)
-# === END GPU check ===
-
-# === Обработка сигналов завершения / Termination signal handling ===
-def handle_exit(signum, frame):
-    sys.exit(0)  # Корректно завершить процесс / Exit process cleanly
-
-signal.signal(signal.SIGINT, handle_exit)   # Обработчик Ctrl+C / Handle Ctrl+C (SIGINT)
-signal.signal(signal.SIGTERM, handle_exit)  # Обработчик SIGTERM / Handle SIGTERM
-
-# === Пути / Paths ===
-# Для .exe: опираемся на папку рядом с исполняемым файлом / For .exe: base on folder near executable
-BASE_DIR = os.path.dirname(sys.executable)
-
-SAVE_DIR = os.path.join(BASE_DIR, 'tmp_screenshots')          # Папка со скриншотами / Screenshots folder
-MODEL_PATH = os.path.join(BASE_DIR, 'best.pt')                # Путь к весам YOLO / YOLO weights path
-COUNTERS_PATH = os.path.join(BASE_DIR, 'counters.json')       # Контрпики / Counters DB path
-OVERLAY_JSON_PATH = os.path.join(BASE_DIR, 'overlay_data.json')  # Данные для оверлея / Overlay data
-STATE_PATH = os.path.join(BASE_DIR, 'overlay_state.json')        # Состояние оверлея / Overlay state
+from typing import List, NamedTuple, Tuple, Optional  # Типы для аннотаций / Type hints
+import numpy as np  # Кадры как массивы / Frames as arrays
+from runtime_config import (  # Общие настройки / Shared settings
+    FRAME_TRANSPORT, RING_NAME, INFER_MODE, INFER_BACKEND, ONNX_INT8, ONNX_THREADS, QUEUE_DEPTH,
+    BATCH_SIZE, BATCH_DEADLINE_MS, STATE_CLEAR_FRAMES, CAPTURE_FORMAT, TRACE_ENABLED,
+    MODEL_CACHE_DIR, CUDA_EXPORT, WARMUP, REPORT_MEMORY, SLOT_LOCK_CONF,
+)
+from inference_backends import BackendUnavailable, import_backend  # Бэкенды инференса / Inference backends
+from pick_zones import layout_for  # Рабочее разрешение кадров / Working frame resolution
+from detector_core import Detector, Placed, IMGSZ, CONF, IOU, MIN_HEIGHT  # Обработка кадров без ОС / OS-free frame processing
+from platform_services import PlatformServices, default_services  # Мьютекс, окно ошибки, пути / Mutex, error box, paths
+from frame_sources import FrameSource  # Кольцо и папка кадров / Frame ring and folder
+from frame_codec import DecodedFrame, extension, resolve_format  # Форматы файлов кадров / Frame file formats
+from metrics import Metrics  # Счётчики процесса / Process counters
+from frame_batch import collect_batch  # Добор кадров в батч / Batch collection
+from detector_pipeline import DetectorPipeline  # Стадии чтения/инференса/публикации / Read/infer/publish stages
+from detected_state import DetectedState  # Флаг detected с гистерезисом / detected flag with hysteresis
+from overlay_publisher import OverlayPublisher, robust_replace  # Фоновая запись оверлея / Background overlay writer
+from overlay_channel import OverlayChannelClient, KIND_SNAPSHOT, KIND_STATE, KIND_TRACE  # Push-канал в оверлей / Push channel to overlay
+from latency_trace import TraceWriter  # Трасса задержки / Latency trace
+from startup_profile import StartupProfile  # Фазы старта и время до готовности / Startup phases and time to ready
+from memory_report import MemoryReport  # RSS процесса / Process RSS
+
+# === Процесс детектора / Detector process ===
+# Здесь только оболочка: мьютекс, файлы, канал, сигналы и потоки. Кадр -> драфт — detector_core.Detector,
+# WinAPI — platform_services; импорт модуля ничего не запускает.
+# Only the shell lives here: mutex, files, channel, signals and threads. Frame -> draft is
+# detector_core.Detector, WinAPI is platform_services; importing this module starts nothing.
 
-# === Параметры модели / Model params ===
-imgsz = 640    # Размер входа модели / Model input size
-conf = 0.25    # Порог уверенности / Confidence threshold
-iou = 0.6      # Порог NMS IOU / NMS IoU threshold
-MIN_HEIGHT = 30  # Минимальная высота бокса — меньшие отбрасываем / Min bbox height filter
-
-# === Подготовка папки / Ensure folder exists ===
-os.makedirs(SAVE_DIR, exist_ok=True)  # Создать папку при отсутствии / Create if not exists
+MUTEX_NAME = r"Global\COUNTERPICK_DETECTOR_MUTEX"  # Уникальное имя для детектора / Unique name for detector
 
-# === overlay_data.json — очистка на старте (пустая строка = «нет данных») /
-# === Clear overlay_data.json at start (empty string = "no data") ===
-with open(OVERLAY_JSON_PATH, "w", encoding="utf-8") as f:
-    f.write("")  # Сброс содержимого / Reset file contents
 
 # === Утилиты для overlay_state.json / Helpers for overlay_state.json ===
-def _read_state() -> Tuple[bool, bool]:
+def read_state(path: str) -> Tuple[bool, bool]:
     """Возвращает (enabled, detected). Если файла нет/битый — (True, False).
     Returns (enabled, detected). If missing/corrupt — (True, False)."""
     try:
-        with open(STATE_PATH, "r", encoding="utf-8") as f:
+        with open(path, "r", encoding="utf-8") as f:
             st = json.load(f)  # Парсим JSON / Parse JSON
         enabled = bool(st.get("enabled", True))    # Флаг включения / Enabled flag
         detected = bool(st.get("detected", False)) # Флаг наличия детектов / Detected flag
@@ -102,266 +50,278 @@ def _read_state() -> Tuple[bool, bool]:
     except Exception:
         return True, False  # Значения по умолчанию / Defaults on error
 
-def _robust_replace(src: str, dst: str, retries: int = 5, delay: float = 0.1) -> None:
-    """
-    Надёжная замена файла с коротким ретраем.
-    Пытается os.replace(src, dst) несколько раз, снимая read-only и выдерживая паузу.
-    :param src: временный файл (.tmp), который хотим переименовать
-    :param dst: целевой файл, который нужно атомарно заменить
-    :param retries: кол-во дополнительных попыток после первой
-    :param delay: задержка между попытками в секундах
-    """
-    last_err = None  # <- инициализация переменной заранее
-    # Первая попытка — самая быстрая
-    try:
-        os.replace(src, dst)  # Атомарная замена на Windows / Atomic replace
-        return                # Успех — выходим
-    except PermissionError:
-        # Падать не спешим — пойдём в цикл ретраев
-        pass
-    except OSError as e:
-        # Иногда это может быть sharing violation как OSError — тоже ретраим
-        last_err = e
-
-    # Ретраи: короткие и безопасные
-    for _ in range(retries):
-        # Снимаем возможный read-only с целевого файла (если он существует)
-        try:
-            if os.path.exists(dst):
-                os.chmod(dst, stat.S_IWRITE | stat.S_IREAD)  # rw- для owner
-        except Exception:
-            # Игнорируем сбои chmod — всё равно попробуем replace
-            pass
-
-        try:
-            os.replace(src, dst)  # Повторная попытка замены
-            return                # Успех
-        except PermissionError as e:
-            last_err = e          # Сохраняем последнюю ошибку
-        except OSError as e:
-            last_err = e          # Любая OSError — тоже пробуем ещё
-        time.sleep(delay)         # Короткая пауза, чтобы читатель отпустил файл
-
-    # Если все попытки исчерпаны — аккуратно удалить src, чтобы не висел .tmp, и пробросить ошибку
-    try:
-        if os.path.exists(src):
-            os.remove(src)  # Чистим временный файл, чтобы не накапливались .tmp
-    except Exception:
-        pass
-    # Финально пробрасываем последнюю ошибку — пусть упадёт явно, если совсем плохо
-    if last_err:
-        raise last_err
-    else:
-        # Теоретически сюда не попадём, но на всякий случай
-        raise PermissionError("Failed to replace file after retries")
 
-def _write_state_detected(detected: bool) -> None:
+def write_state_detected(path: str, detected: bool, channel: Optional[OverlayChannelClient] = None) -> None:
     """Атомарно перезаписывает overlay_state.json, сохраняя текущее 'enabled'.
-    Atomically rewrites overlay_state.json, preserving current 'enabled'."""
-    enabled, _ = _read_state()  # Читаем текущее enabled / Read current enabled
+    Вызывается только на переходах detected (см. DetectedState), поэтому enabled,
+    который меняет лаунчер, перечитываем здесь, а не держим копию.
+    Atomically rewrites overlay_state.json, preserving current 'enabled'.
+    Called on detected transitions only (see DetectedState), so 'enabled', which
+    the launcher owns, is re-read here instead of being cached."""
+    enabled, _ = read_state(path)  # Читаем текущее enabled / Read current enabled
     data = {"enabled": enabled, "detected": bool(detected)}  # Собираем состояние / Build state dict
 
-    tmp = STATE_PATH + ".tmp"  # Временный файл для атомарной записи / Temp file for atomic write
+    tmp = path + ".tmp"  # Временный файл для атомарной записи / Temp file for atomic write
     with open(tmp, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)  # Пишем JSON / Write JSON
+        json.dump(data, f, ensure_ascii=False)  # Пишем JSON / Write JSON
         f.flush()
         os.fsync(f.fileno())
 
     # Надёжная замена с коротким ретраем (фикс WinError 5)
-    _robust_replace(tmp, STATE_PATH)
-
-
-# === Инициализация overlay_state.json / Initialize overlay_state.json ===
-if not os.path.exists(STATE_PATH):
-    _write_state_detected(False)  # Создать файл с detected=False / Create with detected=False
-else:
-    _write_state_detected(_read_state()[1])  # Сохранить текущее detected / Preserve detected
-
-# === Загрузка модели и контрпиков / Load model and counters ===
-model = YOLO(MODEL_PATH)  # Загрузить YOLO веса / Load YOLO weights
-model.to('cuda')          # Принудительно на GPU / Force model to GPU
-
-print("CUDA device index:", torch.cuda.current_device())
-print("CUDA device name:", torch.cuda.get_device_name(0))
-
-torch.set_grad_enabled(False)  # Отключаем градиенты / Disable gradients for speed & memory
-
-print("CUDA available:", torch.cuda.is_available())
-print("Model device:", model.device)
-print("Torch version:", torch.__version__)
-
-with open(COUNTERS_PATH, 'r', encoding='utf-8') as f:
-    counters_data = json.load(f)  # Загрузить базу контрпиков / Load counters DB
-
-def get_counter_names(hero_short: str) -> List[str]:
-    """Возвращает список имён контрпиков для героя.
-    Returns list of counter names for a hero."""
-    for entry in counters_data:  # Проходим по записям / Iterate entries
-        if entry.get("hero") == hero_short:  # Совпадение героя / Match hero
-            # Вернуть список имён контрпиков / Return list of counters
-            return [c.get("counter") for c in entry.get("counters", []) if isinstance(c, dict)]
-    return []  # Пусто, если герой не найден / Empty if not found
-
-# === Утилиты снапшота / Snapshot helpers ===
-def read_existing_overlay_list() -> List[Dict]:
-    """Читает overlay_data.json как список [{hero,counters,box}], иначе возвращает пустой список.
-    Reads overlay_data.json as list, else returns empty list."""
+    robust_replace(tmp, path)
+    if channel is not None:
+        channel.send(KIND_STATE, data)  # Оверлей узнаёт сразу, без опроса / The overlay learns at once, no polling
+
+
+class PreparedFrame(NamedTuple):
+    """Кадр после стадии чтения: вход модели уже собран / Frame after the read stage: the model input is ready."""
+    frame: DecodedFrame
+    filepath: Optional[str]            # None для кадров из общей памяти / None for shared-memory frames
+    source: Optional[np.ndarray]       # Склеенные ROI или весь кадр; None — все слоты из кэша / Stacked ROIs or the whole frame; None — all slots cached
+    placed: Placed                     # Пересчёт боксов на экран и план слотов / Box mapping back to the screen and the slot plan
+    trace_id: Optional[str]            # Сквозной id от захвата / End-to-end id from capture
+
+
+def main(argv: Optional[List[str]] = None, services: Optional[PlatformServices] = None) -> int:
+    """Точка входа процесса детектора; код возврата — код выхода.
+    Detector process entry point; the return value is the exit code."""
+    ap = argparse.ArgumentParser(description="Counterpick detector")
+    ap.add_argument("--startup-profile", action="store_true",
+                    help="вывести фазы старта (импорт, загрузка, прогрев) / print startup phases (import, load, warmup)")
+    ap.add_argument("--report-memory", action="store_true",
+                    help="пиковый и рабочий RSS в консоль и memory_detector.json / peak and steady RSS to the console and memory_detector.json")
+    args = ap.parse_args(argv)
+    services = services or default_services(MUTEX_NAME)
+
+    # === Single-instance guard (detector) / Защита от второго экземпляра (детектор) ===
     try:
-        if not os.path.exists(OVERLAY_JSON_PATH) or os.path.getsize(OVERLAY_JSON_PATH) == 0:
-            return []  # Нет файла/пустой файл / Missing or empty
-        with open(OVERLAY_JSON_PATH, "r", encoding="utf-8") as f:
-            txt = f.read().strip()  # Читаем текст / Read text
-        if txt == "":
-            return []  # Пустая строка = нет данных / Empty string = no data
-        obj = json.loads(txt)  # Парсим JSON / Parse JSON
-        return obj if isinstance(obj, list) else []  # Только список / Ensure list
-    except Exception:
-        return []  # Любая ошибка — вернуть пусто / On error, empty list
-
-def write_overlay_atomic(data_list: List[Dict]) -> None:
-    """Атомарная запись снапшота (список элементов) в overlay_data.json.
-    Atomic write of snapshot list into overlay_data.json."""
-    tmp = OVERLAY_JSON_PATH + ".tmp"  # Временный файл / Temp file
-    with open(tmp, "w", encoding="utf-8") as f:
-        json.dump(data_list, f, ensure_ascii=False, indent=2) # Запись JSON / Write JSON
-        f.flush()
-        os.fsync(f.fileno())
-
-    _robust_replace(tmp, OVERLAY_JSON_PATH)  # Атомарная замена / Atomic replace
-
-# === Основной цикл / Main loop ===
-try:
-    while True:
-        # Берём самый ранний PNG / Pick the oldest PNG
-        entries = [e for e in os.scandir(SAVE_DIR) if e.is_file() and e.name.lower().endswith('.png')]
-        entries.sort(key=lambda e: e.stat().st_ctime)  # Сортировка по времени создания / Sort by ctime
-
-        if not entries:
-            time.sleep(0.5)  # Если нет файлов — подождать / Sleep when no files
-            #_write_state_detected(False)  # На всякий — погасить индикатор / Ensure overlay hidden
-            continue
+        if not services.lock.acquire():
+            return 0  # Экземпляр уже запущен — тихо завершаемся / Already running — exit quietly
+    except OSError:
+        return 1  # Не получили дескриптор — выходим / Failed to get handle -> exit
+    try:
+        return run(services, startup_profile=args.startup_profile,
+                   report_memory=args.report_memory or REPORT_MEMORY)
+    finally:
+        services.lock.release()  # Закрыть мьютекс при выходе / Release on exit
+
+
+def run(services: PlatformServices, startup_profile: bool = False, report_memory: bool = False) -> int:
+    """Детектор до сигнала завершения / The detector until a termination signal."""
+    paths = services.paths
+    profile = StartupProfile(_STARTED)
+    memory = MemoryReport("detector", paths.memory, enabled=report_memory)
+    profile.since_start("import")  # Импорты модулей скрипта / Script module imports
+    pipeline: Optional[DetectorPipeline] = None  # Конвейер кадров, создаётся перед основным циклом / Frame pipeline, created before the main loop
+
+    # === Обработка сигналов завершения / Termination signal handling ===
+    def handle_exit(signum, frame):
+        if pipeline is not None:
+            # Цикл доработает текущий батч, затем конвейер допубликует и закроется /
+            # The loop finishes the current batch, then the pipeline publishes what is left and closes
+            pipeline.stop()
+            return
+        sys.exit(0)  # Корректно завершить процесс / Exit process cleanly
+
+    signal.signal(signal.SIGINT, handle_exit)   # Обработчик Ctrl+C / Handle Ctrl+C (SIGINT)
+    signal.signal(signal.SIGTERM, handle_exit)  # Обработчик SIGTERM / Handle SIGTERM
+
+    # === Подготовка папки / Ensure folder exists ===
+    os.makedirs(paths.save_dir, exist_ok=True)  # Создать папку при отсутствии / Create if not exists
+
+    # === overlay_data.json — очистка на старте (пустая строка = «нет данных») /
+    # === Clear overlay_data.json at start (empty string = "no data") ===
+    with open(paths.overlay_data, "w", encoding="utf-8") as f:
+        f.write("")  # Сброс содержимого / Reset file contents
+
+    # Push-канал в оверлей; JSON-файлы остаются зеркалом для отладки и для оверлея без канала /
+    # Push channel to the overlay; the JSON files stay as a debug mirror and for an overlay without the channel
+    overlay_channel = OverlayChannelClient()
+    overlay_channel.send(KIND_SNAPSHOT, [])  # Пустой драфт, как и файл / Empty draft, like the file
+
+    def write_state(detected: bool) -> None:
+        write_state_detected(paths.state, detected, overlay_channel)
+
+    # === Инициализация overlay_state.json / Initialize overlay_state.json ===
+    if not os.path.exists(paths.state):
+        write_state(False)  # Создать файл с detected=False / Create with detected=False
+    else:
+        write_state(read_state(paths.state)[1])  # Сохранить текущее detected / Preserve detected
 
-        filepath = entries[0].path  # Путь к первому файлу / Path to the first file
+    # Дальше detected живёт в памяти и пишется только на переходах /
+    # From here on detected lives in memory and is written on transitions only
+    detected_state = DetectedState(write_state, initial=read_state(paths.state)[1], clear_after=STATE_CLEAR_FRAMES)
 
-        # === Безопасное чтение скрина / Safe image read ===
-        # Проверяем размер файла ретраями, чтобы не ловить «сырой» PNG
-        for _ in range(10):  # до ~1 сек ожидания
-            try:
-                size = os.path.getsize(filepath)
-            except FileNotFoundError:
-                size = 0
-            if size >= 5000:
-                break
-            time.sleep(0.1)
+    # === Загрузка модели и контрпиков / Load model and counters ===
+    try:
+        with profile.phase("import"):
+            backend_name = import_backend(INFER_BACKEND, CUDA_EXPORT)  # torch/ultralytics или onnxruntime; "auto" — с пробой CUDA / or onnxruntime; "auto" probes CUDA
+        with profile.phase("load"):
+            # Экспорт (ONNX, TorchScript) берётся из кэша по хэшу весов / The export (ONNX, TorchScript) comes from the cache by weights hash
+            detector = Detector.load(paths.model, paths.counters, backend_name, IMGSZ, CONF, IOU,
+                                     int8=ONNX_INT8, threads=ONNX_THREADS, infer_mode=INFER_MODE, min_height=MIN_HEIGHT,
+                                     export=CUDA_EXPORT, cache_dir=MODEL_CACHE_DIR, slot_lock_conf=SLOT_LOCK_CONF)
+    except BackendUnavailable as e:
+        # Явно выбранный бэкенд недоступен — сообщить и выйти кодом 2 /
+        # Explicitly selected backend is unavailable — notify and exit(2)
+        if INFER_BACKEND == "cuda":
+            services.show_error(
+                "Counterpick — GPU required",
+                "CUDA недоступна или драйвер не разрешает доступ.\n"
+                "Установите драйверы NVIDIA и разрешите приложению доступ в Защитнике Windows.\n"
+                f"(error: {e})",
+            )
         else:
-            # Если после всех попыток файл всё ещё маленький — удаляем и пропускаем
-            try:
-                os.remove(filepath)
-            except Exception:
-                pass
-            continue
-
-        # Читаем изображение ОДИН раз
-        img = cv2.imread(filepath)
-        if img is None or img.size == 0:
-            try:
-                os.remove(filepath)  # удалить битый
-            except Exception:
-                pass
-            continue
+            services.show_error("Counterpick — inference backend",
+                                f"Бэкенд инференса '{INFER_BACKEND}' недоступен.\n(error: {e})")
+        return 2
+    backend = detector.backend
+
+    print("Inference backend:", backend.name, "|", backend.describe())
 
-        # === Предикт с принудительным устройством и FP16 / Inference with forced device & FP16 ===
+    if WARMUP:
+        # Прогрев до приёма кадров: первый кадр драфта не платит за выбор ядер /
+        # Warmup before taking frames: the first draft frame does not pay for kernel selection
         try:
-            with torch.inference_mode():  # Без построения графа / No graph building
-                results = model.predict(
-                    source=img,     # Кадр как numpy-массив / Frame as numpy array
-                    imgsz=imgsz,    # Размер входа / Input size
-                    conf=conf,      # Порог уверенности / Confidence threshold
-                    iou=iou,        # Порог NMS IoU / NMS IoU
-                    device=0,       # Только GPU:0 / Force GPU:0
-                    half=True,      # FP16 на поддерживаемых картах / Use FP16 if supported
-                    verbose=False   # Без лишнего лога / No console logs
-                )
+            with profile.phase("warmup"):
+                # Кадры приходят в рабочем разрешении, а не в экранном / Frames arrive at the working resolution, not the screen one
+                detector.warmup(layout_for(*services.screen_size()).work, BATCH_SIZE)
         except Exception as e:
-            # Критическая ошибка CUDA — сообщить и завершить / CUDA runtime error — notify & exit
+            services.show_error("Counterpick — GPU runtime error" if backend.name == "cuda" else "Counterpick — runtime error",
+                                f"Критическая ошибка инференса ({backend.name}):\n{e}")
+            return 3
+
+    metrics = Metrics(paths.metrics)  # Выброшенные кадры, очередь / Dropped frames, queue
+    tracer = TraceWriter(paths.trace, enabled=TRACE_ENABLED)  # Стадии кадров по id трассы / Frame stages by trace id
+
+    # Запись overlay_data.json в фоне: цикл инференса не ждёт диск /
+    # overlay_data.json is written in the background: the inference loop never waits on disk
+    overlay_publisher = OverlayPublisher(paths.overlay_data, metrics=metrics).start()
+
+    # Очередь должна вмещать целый батч, иначе добирать нечего; расширение — по формату захвата /
+    # The queue must hold a whole batch, otherwise there is nothing to collect; the extension follows the capture format
+    source = FrameSource(FRAME_TRANSPORT, RING_NAME, paths.save_dir, extension(resolve_format(CAPTURE_FORMAT)),
+                         keep=max(QUEUE_DEPTH, BATCH_SIZE), metrics=metrics, tracer=tracer)
+    print("Frame folder watcher:", source.watcher.mode)
+
+    # === Стадии конвейера / Pipeline stages ===
+    def read_prepared(timeout: float) -> Optional[PreparedFrame]:
+        """Стадия чтения: кадр из источника, декодирование и склейка ROI (всё на CPU, пока модель занята).
+        Read stage: frame from the source, decoding and ROI stacking (all on CPU while the model is busy)."""
+        item = source.next(timeout)
+        if item is None:
+            return None
+        frame, filepath, trace_id = item
+        with tracer.span(trace_id, "roi"):
+            model_input, placed = detector.prepare(frame)  # Склеенный кроп или весь кадр / Stacked crop or the whole frame
+        if placed.slots is not None:
+            # Слоты из кэша не идут в модель / Cached slots skip the model
+            metrics.inc("slots_cached", placed.slots.cached)
+            metrics.inc("slots_inferred", len(placed.slots.inferred))
+            if model_input is None:
+                metrics.inc("frames_all_cached")
+        return PreparedFrame(frame, filepath, model_input, placed, trace_id)
+
+    def publish_prepared(item: PreparedFrame, det) -> None:
+        """Стадия публикации: состояние, драфт, канал и файл оверлея / Publish stage: state, draft, channel and overlay file."""
+        with tracer.span(item.trace_id, "postprocess"):
+            snap = detector.finish(item.frame, item.placed, det)  # Боксы на экран, герои, драфт / Boxes to screen, heroes, draft
+        # Есть детекты — включить показ; пустые кадры гасят его с гистерезисом /
+        # Detections => show overlay; empty frames hide it with hysteresis
+        if detected_state.update(snap.detected):
+            metrics.inc("state_writes")
+        metrics.set("state_writes_per_min", detected_state.writes_per_minute())
+        if detector.slot_cache is not None:
+            metrics.set("slots_locked", len(detector.slot_cache.locked()))
+        metrics.inc("frames_published")
+        if not snap.changed:
+            return  # Новых героев нет — данные не трогаем / No new heroes — keep data intact
+
+        with tracer.span(item.trace_id, "publish"):
+            metrics.set("draft_heroes", len(detector.draft))
+            if tracer.enabled and item.trace_id:
+                # id перед снапшотом: оверлей допишет receive/layout/paint / id before the snapshot: the overlay adds receive/layout/paint
+                overlay_channel.send(KIND_TRACE, {"id": item.trace_id, "t": time.time()})
+            overlay_channel.send(KIND_SNAPSHOT, snap.heroes)  # Сразу в оверлей / Straight to the overlay
+            overlay_publisher.submit(snap.heroes)             # Зеркало в файл, в фоне / File mirror, in the background
+
+    def cleanup_prepared(item: PreparedFrame) -> None:
+        """Удалить обработанный (или выброшенный) скрин / Remove a processed (or dropped) screenshot."""
+        if item.filepath:
+            source.discard(item.filepath)
+
+    def publisher_idle() -> None:
+        """Фоновые дела между публикациями / Housekeeping between publications."""
+        metrics.maybe_flush()  # Периодический снимок счётчиков / Periodic counters snapshot
+        metrics.set("overlay_channel_connected", int(overlay_channel.poll()))  # Оверлей мог стартовать позже / Overlay may start later
+        metrics.set("overlay_channel_dropped", overlay_channel.dropped)  # Вытеснены, пока запись стояла / Superseded while a write was stuck
+        if memory.maybe_sample():
+            memory.publish(metrics)  # RSS в работе / Steady-state RSS
+
+    # === Основной цикл / Main loop ===
+    # Чтение и публикация идут в своих потоках, здесь — только инференс. Очередь подготовленных кадров
+    # вмещает один батч: чтение не убегает вперёд модели, свежесть держит очередь кадров /
+    # Reading and publishing run on their own threads, only inference runs here. The prepared-frame queue
+    # holds one batch: reading does not run ahead of the model, freshness is kept by the frame queue
+    pipeline = DetectorPipeline(read_prepared, publish_prepared, cleanup=cleanup_prepared, idle=publisher_idle,
+                                decoded_depth=BATCH_SIZE, metrics=metrics).start()
+
+    # Готов: модель загружена и прогрета, кадры принимаются / Ready: the model is loaded and warm, frames are taken
+    profile.since_start("setup")  # Файлы, канал, источники / Files, channel, sources
+    print(f"Detector ready in {profile.ready():.0f} ms")
+    if startup_profile:
+        print(profile.format())
+    profile.publish(metrics)
+    memory.mark_ready()  # Пик старта и RSS после прогрева / Startup peak and RSS after warmup
+    memory.publish(metrics)
+    metrics.flush()  # startup_* сразу видны в metrics_detector.json / startup_* visible in metrics_detector.json at once
+    try:
+        while not pipeline.stopping:
+            first = pipeline.get(timeout=0.5)
+            if first is None:
+                continue
+
+            # Добор батча: до BATCH_SIZE кадров или до дедлайна / Fill the batch: up to BATCH_SIZE frames or the deadline
+            batch: List[PreparedFrame] = collect_batch(first, pipeline.get, BATCH_SIZE, BATCH_DEADLINE_MS / 1000.0)
+            metrics.inc("frames_processed", len(batch))
+            metrics.inc("batches_run")
+            metrics.set("last_batch_size", len(batch))
+
+            # === Предикт выбранным бэкендом / Inference with the selected backend ===
             try:
-                from ctypes import windll, c_wchar_p
-                windll.user32.MessageBoxW(
-                    0,
-                    c_wchar_p(f"Критическая ошибка CUDA во время инференса:\n{e}"),
-                    c_wchar_p("Counterpick — GPU runtime error"),
-                    0x10  # MB_ICONERROR
-                )
-            except Exception:
-                pass
-            sys.exit(3)
-
-        r = results[0]      # Первый результат батча / First result
-        boxes = r.boxes     # Детектированные боксы / Detected boxes
-
-        if boxes is not None and len(boxes) > 0:
-            _write_state_detected(True)  # Есть детекты — включить показ / Detected => show overlay
-
-            # Внутрикадровая дедупликация по имени героя: берём бокс с макс. уверенностью
-            # Per-frame dedup by hero: keep box with max confidence
-            by_hero: Dict[str, Dict] = {}
-
-            for b in boxes:
-                cls_id = int(b.cls[0])  # Индекс класса / Class index
-                x1, y1, x2, y2 = b.xyxy[0].cpu().numpy().astype(int)  # Координаты бокса / BBox coords
-                hero_name = model.names[cls_id]  # Короткое имя героя / Hero short name
-                conf_val = float(b.conf[0]) if hasattr(b, "conf") else 1.0  # Уверенность / Confidence
-
-                # --- фильтр по высоте бокса --- / bbox height filter
-                if (y2 - y1) < MIN_HEIGHT:
-                    continue  # Пропустить слишком маленький бокс / Skip small box
-
-                if (hero_name not in by_hero) or (conf_val > by_hero[hero_name]["conf"]):
-                    # Обновляем лучшую версию бокса по герою / Keep best box per hero
-                    counters = get_counter_names(hero_name)  # Получить контрпики / Fetch counters
-                    if counters:
-                        by_hero[hero_name] = {
-                            "hero": hero_name,                    # Имя героя / Hero name
-                            "counters": counters[:4],             # Топ-4 контрпика / Top-4 counters
-                            "box": [int(x1), int(y1), int(x2), int(y2)],  # Бокс / BBox
-                            "conf": conf_val,                     # Уверенность / Confidence
-                        }
-
-            # Текущий снапшот как список без поля conf / Snapshot list without 'conf'
-            current_snapshot = [
-                {"hero": v["hero"], "counters": v["counters"], "box": v["box"]}
-                for v in by_hero.values()
-            ]
-
-            # === добавляем только новых героев === / append only new heroes
-            prev_list = read_existing_overlay_list()  # Предыдущие данные / Previous overlay list
-            existing_names = {h["hero"] for h in prev_list if isinstance(h, dict)}  # Уже есть / Existing set
-
-            new_snapshot = []  # Новые записи / Newly found heroes
-            for hero_entry in current_snapshot:
-                if hero_entry["hero"] not in existing_names:  # Если герой новый / If hero is new
-                    new_snapshot.append(hero_entry)           # Добавить / Append
-
-            # Если появились новые герои — обновляем файл / Update file if new heroes appeared
-            if new_snapshot:
-                merged = prev_list + new_snapshot  # Объединить с прошлыми / Merge with previous
-                write_overlay_atomic(merged)       # Атомарно записать / Atomic write
-
-        else:
-            # Детекций нет — только погасить показ; данные не трогаем
-            # No detections — only hide overlay; keep data intact
-            _write_state_detected(False)
-
-        # Удаляем обработанный скрин / Remove processed screenshot
+                t_infer, p_infer = time.time(), time.perf_counter()
+                # Один проход на весь батч / One forward pass for the whole batch
+                dets = detector.infer([p.source for p in batch])  # Боксы, уверенности, классы массивами / Boxes, confs, classes as arrays
+            except Exception as e:
+                # Критическая ошибка инференса — сообщить и завершить / Inference runtime error — notify & exit
+                services.show_error("Counterpick — GPU runtime error" if backend.name == "cuda" else "Counterpick — runtime error",
+                                    f"Критическая ошибка инференса ({backend.name}):\n{e}")
+                return 3
+
+            infer_ms = (time.perf_counter() - p_infer) * 1000.0
+            for p in batch:
+                tracer.record(p.trace_id, "infer", t_infer, infer_ms)  # Время батча каждому кадру / Batch time for every frame
+
+            # Публикация в порядке кадров — в потоке публикатора / Publishing in frame order — on the publisher thread
+            pipeline.put_results(batch, dets)
+        return 0
+
+    finally:
+        # Допубликовать готовые результаты до того, как гасить детект /
+        # Publish the finished results before hiding the overlay
+        pipeline.close()
+        # При выходе гасим детект / On exit, hide overlay
         try:
-            os.remove(filepath)
+            write_state(False)  # detected=False на выходе / Set detected=False on exit
         except Exception:
             pass
+        source.close()             # Кольцо и наблюдатель папки / Ring and folder watcher
+        overlay_publisher.close()  # Дописать последний снапшот / Write the last snapshot
+        overlay_channel.close()    # Оверлей вернётся к JSON-файлам / The overlay falls back to the JSON files
+        metrics.flush()            # Финальный снимок счётчиков / Final counters snapshot
+        tracer.close()             # Дописать буфер трассы / Flush the trace buffer
+        memory.report("exit")      # Итог по памяти с --report-memory / Memory summary with --report-memory
 
-finally:
-    # При выходе гасим детект / On exit, hide overlay
-    try:
-        _write_state_detected(False)  # detected=False на выходе / Set detected=False on exit
-    except Exception:
-        pass
-    cv2.destroyAllWindows()  # Закрыть все окна OpenCV (если были) / Close any OpenCV windows
+
+if __name__ == "__main__":
+    sys.exit(main())
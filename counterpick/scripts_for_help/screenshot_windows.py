@@ -1,8 +1,22 @@
 import os      # Работа с файловой системой / File system operations
 import time    # Задержки и работа со временем / Time handling and delays
 from mss import mss  # Библиотека для скриншотов экрана / Library for taking screenshots
-from datetime import datetime  # Работа с датой и временем / Work with date and time
 import sys     # Доступ к системным переменным / Access to system-related variables
+import numpy as np  # Кадр как массив для общей памяти / Frame as array for shared memory
+import cv2  # Уменьшение до рабочего разрешения / Downscale to the working resolution
+from runtime_config import (  # Общие настройки / Shared settings
+    FRAME_TRANSPORT, RING_NAME, RING_SLOTS, QUEUE_DEPTH, QUEUE_POLICY,
+    CHANGE_THRESHOLD, KEYFRAME_INTERVAL, CAPTURE_FORMAT, CAPTURE_REGION, TRACE_ENABLED,
+)
+from frame_ring import FrameRingWriter  # Кольцевой буфер кадров / Frame ring buffer
+from frame_queue import (  # Протокол имён кадров / Frame naming
+    new_session_id, frame_filename, publish_frame, count_ready, TMP_SUFFIX,
+)
+from metrics import Metrics  # Счётчики процесса / Process counters
+from pick_zones import pick_rois, layout_for, scale_rect  # Таблица раскладки зон / Zone layout table
+from frame_codec import write_frame, extension, resolve_format  # Форматы файлов кадров / Frame file formats
+from change_detect import ZoneChangeDetector  # Пропуск неизменных кадров / Skip unchanged frames
+from latency_trace import TraceWriter, trace_id_for  # Трасса задержки / Latency trace
 # === WinAPI named mutex (single instance) / Именованный мьютекс (единственный экземпляр) ===
 import ctypes, atexit  # Импорты для работы с WinAPI и финализации / WinAPI + finalizer
 
@@ -35,6 +49,12 @@ SAVE_DIR = os.path.join(BASE_DIR, 'tmp_screenshots')
 DELAY = 2
 # Задержка между созданием скриншотов (в секундах) / Delay between screenshots in seconds
 
+metrics = Metrics(os.path.join(BASE_DIR, 'metrics_capture.json'))
+# Счётчики захвата (пропуски, очередь) / Capture counters (skips, queue)
+
+tracer = TraceWriter(os.path.join(BASE_DIR, 'trace_capture.jsonl'), enabled=TRACE_ENABLED)
+# Стадия capture для сквозной трассы (COUNTERPICK_TRACE=1) / capture stage of the end-to-end trace
+
 # === Проверка папки / Check folder ===
 os.makedirs(SAVE_DIR, exist_ok=True)
 # Создаём папку, если её нет / Create folder if it doesn't exist
@@ -43,21 +63,112 @@ os.makedirs(SAVE_DIR, exist_ok=True)
 sct = mss()
 # Создаём объект для захвата экрана / Create an MSS object for screen capturing
 
+monitor = sct.monitors[1]
+layout = layout_for(monitor["width"], monitor["height"])
+work_w, work_h = layout.work
+print(f"Capture: {monitor['width']}x{monitor['height']} ({layout.aspect}) -> working {work_w}x{work_h}")
+# Раскладка по монитору, кадр уменьшается до рабочего разрешения прямо здесь /
+# Layout from the monitor, frames are downscaled to the working resolution right here
+
+capture_format = resolve_format(CAPTURE_FORMAT)
+zone_rois = pick_rois(layout)
+grab_box, region_origin, (out_w, out_h) = monitor, (0, 0), (work_w, work_h)
+if CAPTURE_REGION == "zones":
+    if FRAME_TRANSPORT != "shm" and capture_format == "raw":
+        bx1 = max(0, min(r[0] for r in zone_rois)); by1 = max(0, min(r[1] for r in zone_rois))
+        bx2 = min(work_w, max(r[2] for r in zone_rois)); by2 = min(work_h, max(r[3] for r in zone_rois))
+        sx1, sy1, sx2, sy2 = scale_rect((bx1, by1, bx2, by2), layout.scale)
+        grab_box = {"left": monitor["left"] + sx1, "top": monitor["top"] + sy1, "width": sx2 - sx1, "height": sy2 - sy1}
+        region_origin, (out_w, out_h) = (bx1, by1), (bx2 - bx1, by2 - by1)
+        zone_rois = [(x1 - bx1, y1 - by1, x2 - bx1, y2 - by1) for x1, y1, x2, y2 in zone_rois]
+        # Захват только прямоугольника зон пиков; начало области уходит в заголовок raw /
+        # Grab only the pick-zone rectangle; the region origin goes into the raw header
+    else:
+        print("Capture: COUNTERPICK_CAPTURE_REGION=zones needs transport=png and format=raw; capturing full frames")
+frame_ext = extension(capture_format)
+
+change_detector = ZoneChangeDetector(zone_rois, threshold=CHANGE_THRESHOLD,
+                                     keyframe_interval=KEYFRAME_INTERVAL)
+# Сравнение зон пиков с последним отправленным кадром / Compare pick zones with the last sent frame
+
+ring = None
+session, seq = new_session_id(), 0
+# Сессия и счётчик для имён PNG-кадров / Session and counter for PNG frame names
+# Кольцо в общей памяти создаётся по размеру первого кадра /
+# Shared-memory ring is sized from the first frame
+
 try:
     while True:
         # Бесконечный цикл для постоянных скриншотов / Infinite loop for continuous screenshots
 
-        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        # Получаем текущую дату и время как строку / Get current date and time as string
-
-        filename = f"{timestamp}.png"
-        # Формируем имя файла на основе времени / Create filename based on timestamp
-
-        filepath = os.path.join(SAVE_DIR, filename)
-        # Полный путь до файла / Full path to the file
-
-        sct.shot(output=filepath)
-        # Делаем скриншот и сохраняем / Take screenshot and save it to file
+        metrics.maybe_flush()
+        # Периодически сбрасываем счётчики на диск / Periodically dump counters to disk
+
+        if FRAME_TRANSPORT == "shm":
+            pending = ring.pending if ring is not None else 0
+        else:
+            pending = count_ready(SAVE_DIR, frame_ext)
+        metrics.set("queue_pending", pending)
+        # Сколько кадров ещё не взял детектор / Frames the detector has not taken yet
+
+        if QUEUE_POLICY == "skip" and pending >= QUEUE_DEPTH:
+            # Очередь полна — детектор не успевает, не тратим время на захват /
+            # Queue is full — the detector is behind, don't spend time capturing
+            metrics.inc("captures_skipped_backpressure")
+            time.sleep(DELAY)
+            continue
+
+        t_grab, p_grab = time.time(), time.perf_counter()
+        # Начало стадии capture; время захвата — часть id трассы / capture stage start; the grab time is part of the trace id
+
+        shot = sct.grab(grab_box)
+        frame = np.asarray(shot)
+        # Сырой BGRA-кадр основного монитора, без кодирования / Raw BGRA frame of the primary monitor, no encoding
+
+        if (shot.width, shot.height) != (out_w, out_h):
+            frame = cv2.resize(frame, (out_w, out_h), interpolation=cv2.INTER_AREA)
+            # 1440p/4K -> рабочее разрешение: дешевле запись, кодирование и инференс /
+            # 1440p/4K -> working resolution: cheaper write, encode and inference
+
+        if not change_detector.should_send(frame):
+            # Зоны пиков не изменились — не пишем, не кодируем, не гоняем YOLO /
+            # Pick zones unchanged — no write, no encode, no YOLO
+            metrics.inc("frames_skipped_unchanged")
+            metrics.set("last_zone_diff", round(change_detector.last_diff, 2))
+            time.sleep(DELAY)
+            continue
+        metrics.inc("keyframes_forced" if change_detector.last_reason == "keyframe" else "frames_changed")
+
+        if FRAME_TRANSPORT == "shm":
+            if ring is None:
+                ring = FrameRingWriter.create(RING_NAME, RING_SLOTS, work_h, work_w, 4)
+                # Создаём кольцо под геометрию экрана / Create ring for the screen geometry
+
+            ring_seq = ring.write(frame, timestamp=t_grab)
+            # Копируем кадр в слот и публикуем номер / Copy frame into a slot and publish its number
+            trace_id = trace_id_for(int(t_grab * 1000), ring_seq)
+            # Детектор соберёт тот же id из заголовка слота / The detector rebuilds the same id from the slot header
+        else:
+            seq += 1
+            filename = frame_filename(session, seq, frame_ext)
+            # Имя с монотонным номером: порядок без stat() / Sequence-numbered name: ordering without stat()
+
+            tmp_path = os.path.join(SAVE_DIR, filename + TMP_SUFFIX)
+            # Сначала пишем во временный файл / Write to a temporary file first
+
+            t_encode = time.perf_counter()
+            size = write_frame(tmp_path, frame, capture_format, region_origin, (work_w, work_h))
+            metrics.set("last_encode_ms", round((time.perf_counter() - t_encode) * 1000.0, 2))
+            metrics.set("last_frame_bytes", size)
+            # Кодируем уже снятый кадр выбранным форматом / Encode the grabbed frame in the selected format
+
+            publish_frame(tmp_path)
+            # Переименование = кадр готов для детектора / Rename = frame is ready for the detector
+            trace_id = trace_id_for(session, seq)
+            # id трассы = имя кадра без расширения / Trace id = frame name without extension
+
+        metrics.inc("frames_captured")
+        tracer.record(trace_id, "capture", t_grab, (time.perf_counter() - p_grab) * 1000.0)
 
         time.sleep(DELAY)
         # Ждём заданное количество секунд / Wait for the specified delay
@@ -67,5 +178,16 @@ except KeyboardInterrupt:
     pass
 
 finally:
+    metrics.flush()
+    # Финальный снимок счётчиков / Final counters snapshot
+
+    tracer.close()
+    # Дописать буфер трассы / Flush the trace buffer
+
+    if ring is not None:
+        ring.close()
+        ring.unlink()
+        # Освобождаем общую память / Release shared memory
+
     sct.close()
     # Закрываем MSS и освобождаем ресурсы / Close MSS and release resources
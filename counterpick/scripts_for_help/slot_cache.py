@@ -0,0 +1,135 @@
+import threading  # План читает поток чтения, блокировки ставит поток публикации / Reader plans, publisher locks
+from typing import Dict, List, NamedTuple, Sequence, Tuple  # Типы для аннотаций / Type hints
+
+import cv2  # Уменьшение слота до отпечатка / Slot downscale to a fingerprint
+import numpy as np  # Отпечатки и боксы как массивы / Fingerprints and boxes as arrays
+
+from frame_codec import DecodedFrame  # Кадр с началом области / Frame with its region origin
+from pick_zones import Rect  # Прямоугольник экрана / Screen rect
+
+# === Кэш слотов пиков / Pick slot cache ===
+# Выбранный герой не меняется до конца драфта, а детектор гонял бы его слот через модель каждый кадр.
+# У каждого из 10 слотов есть отпечаток (разностный хэш 8x8 серого уменьшенного слота): слот, где герой
+# уверенно найден confirm раз подряд с тем же отпечатком, блокируется и в модель больше не идёт, пока
+# отпечаток не уйдёт дальше max_distance бит. Когда заблокированы все 10 слотов, кадр модель не видит вовсе.
+# A picked hero does not change until the draft ends, yet the detector would run its slot through the model
+# every frame. Each of the 10 slots has a fingerprint (an 8x8 difference hash of the downscaled gray slot):
+# a slot where a hero was confidently found confirm times in a row with the same fingerprint is locked and
+# no longer goes to the model until the fingerprint moves more than max_distance bits. With all 10 slots
+# locked, the frame skips the model entirely.
+
+HASH_SIZE = 8      # Сторона хэша: 64 бита / Hash side: 64 bits
+MAX_DISTANCE = 6   # Бит различия, при которых слот тот же / Differing bits for the same slot
+LOCK_CONF = 0.8    # Уверенность для блокировки / Confidence to lock
+CONFIRM = 2        # Подряд совпавших проходов до блокировки / Matching passes in a row before locking
+
+
+def slot_hash(image: np.ndarray) -> int:
+    """Разностный хэш: соседние пиксели серого слота 9x8 по строкам; яркость и шум JPEG его почти не двигают.
+    Difference hash: neighbouring pixels of the 9x8 gray slot along rows; brightness and JPEG noise barely move it."""
+    if image.size == 0:
+        return 0
+    gray = cv2.cvtColor(image, cv2.COLOR_BGRA2GRAY if image.shape[2] == 4 else cv2.COLOR_BGR2GRAY) \
+        if image.ndim == 3 else image
+    small = cv2.resize(gray, (HASH_SIZE + 1, HASH_SIZE), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).ravel()
+    return int(np.packbits(bits).view(">u8")[0])
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class SlotLock(NamedTuple):
+    """Заблокированный слот / A locked slot."""
+    class_id: int
+    fingerprint: int
+
+
+class SlotPlan(NamedTuple):
+    """План кадра: отпечатки всех слотов, слоты для модели и сколько слотов взято из кэша.
+    Frame plan: fingerprints of all slots, slots for the model and how many slots came from the cache."""
+    fingerprints: List[int]
+    inferred: Tuple[int, ...]
+    cached: int
+
+
+class SlotCache:
+    """Блокировки слотов пиков между кадрами; потокобезопасен (plan и observe из разных потоков).
+    Pick slot locks across frames; thread-safe (plan and observe run on different threads)."""
+
+    def __init__(self, lock_conf: float = LOCK_CONF, max_distance: int = MAX_DISTANCE, confirm: int = CONFIRM):
+        self.lock_conf = lock_conf
+        self.max_distance = max_distance
+        self.confirm = max(1, confirm)
+        self._locks: Dict[int, SlotLock] = {}
+        self._pending: Dict[int, Tuple[int, int, int]] = {}  # слот -> (класс, отпечаток, подряд) / slot -> (class, fingerprint, streak)
+        self._mutex = threading.Lock()
+
+    def fingerprints(self, frame: DecodedFrame, slots: Sequence[Rect]) -> List[int]:
+        """Отпечатки слотов кадра (слоты — в координатах полного рабочего кадра).
+        Slot fingerprints of a frame (slots are in full working-frame coordinates)."""
+        img = frame.image
+        H, W = img.shape[:2]
+        ox, oy = frame.origin
+        out = []
+        for x1, y1, x2, y2 in slots:
+            x1, x2 = max(0, x1 - ox), min(W, x2 - ox)
+            y1, y2 = max(0, y1 - oy), min(H, y2 - oy)
+            out.append(slot_hash(img[y1:y2, x1:x2]) if x2 > x1 and y2 > y1 else 0)
+        return out
+
+    def plan(self, frame: DecodedFrame, slots: Sequence[Rect]) -> SlotPlan:
+        """Какие слоты отдать модели: незаблокированные и те, чей отпечаток ушёл (их блокировка снимается).
+        Which slots go to the model: unlocked ones and those whose fingerprint moved (their lock is dropped)."""
+        fps = self.fingerprints(frame, slots)
+        inferred = []
+        with self._mutex:
+            for i, fp in enumerate(fps):
+                lock = self._locks.get(i)
+                if lock is not None and hamming(lock.fingerprint, fp) <= self.max_distance:
+                    continue
+                self._locks.pop(i, None)  # Слот изменился — снова через модель / The slot changed — back through the model
+                inferred.append(i)
+        return SlotPlan(fps, tuple(inferred), len(fps) - len(inferred))
+
+    def observe(self, plan: SlotPlan, slots: Sequence[Rect], xyxy: np.ndarray, conf: np.ndarray,
+                cls: np.ndarray, min_height: int = 0) -> List[int]:
+        """Итог модели по слотам плана: лучший бокс слота (центр внутри слота) с conf >= lock_conf
+        копит серию; серия confirm — блокировка. Вернуть заблокированные слоты.
+        Model outcome for the plan's slots: the slot's best box (centre inside the slot) with conf >= lock_conf
+        builds a streak; a streak of confirm — a lock. Return the slots that got locked."""
+        xyxy = np.asarray(xyxy, dtype=np.float32).reshape(-1, 4)
+        cx = (xyxy[:, 0] + xyxy[:, 2]) * 0.5
+        cy = (xyxy[:, 1] + xyxy[:, 3]) * 0.5
+        ok = (np.asarray(conf) >= self.lock_conf) & (xyxy[:, 3] - xyxy[:, 1] >= min_height)
+        locked = []
+        with self._mutex:
+            for i in plan.inferred:
+                x1, y1, x2, y2 = slots[i]
+                inside = ok & (cx >= x1) & (cx < x2) & (cy >= y1) & (cy < y2)
+                if not inside.any():
+                    self._pending.pop(i, None)  # Серия прервана / The streak is broken
+                    continue
+                best = int(np.flatnonzero(inside)[np.argmax(np.asarray(conf)[inside])])
+                class_id, fp = int(cls[best]), plan.fingerprints[i]
+                prev = self._pending.get(i)
+                same = prev is not None and prev[0] == class_id and hamming(prev[1], fp) <= self.max_distance
+                streak = prev[2] + 1 if same else 1
+                if streak >= self.confirm:
+                    self._locks[i] = SlotLock(class_id, fp)
+                    self._pending.pop(i, None)
+                    locked.append(i)
+                else:
+                    self._pending[i] = (class_id, fp, streak)
+        return locked
+
+    def locked(self) -> Dict[int, SlotLock]:
+        with self._mutex:
+            return dict(self._locks)
+
+    def reset(self) -> None:
+        """Новый драфт: все блокировки сняты / A new draft: all locks dropped."""
+        with self._mutex:
+            self._locks.clear()
+            self._pending.clear()
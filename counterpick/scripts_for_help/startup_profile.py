@@ -0,0 +1,54 @@
+import time  # Монотонные часы / Monotonic clock
+from contextlib import contextmanager  # Фазы как with-блоки / Phases as with blocks
+from typing import Dict, Iterator, Optional  # Типы для аннотаций / Type hints
+
+# === Профиль старта процесса / Process startup profile ===
+# Фазы (импорт, загрузка, прогрев) и время до готовности от первой строки скрипта.
+# Phases (import, load, warmup) and time to ready from the first line of the script.
+
+
+class StartupProfile:
+    """Длительности фаз старта в мс, по порядку / Startup phase durations in ms, in order."""
+
+    def __init__(self, t0: Optional[float] = None):
+        self.t0 = time.perf_counter() if t0 is None else t0  # Начало отсчёта / Reference point
+        self.phases: Dict[str, float] = {}
+        self.ready_ms: Optional[float] = None
+
+    def add(self, name: str, ms: float) -> None:
+        """Прибавить время к фазе / Add time to a phase."""
+        self.phases[name] = self.phases.get(name, 0.0) + ms
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, (time.perf_counter() - t0) * 1000.0)
+
+    def since_start(self, name: str) -> None:
+        """Всё время от t0 до сейчас, не попавшее в фазы, записать в фазу name (импорты модуля).
+        Record the time from t0 until now not covered by phases as phase name (module imports)."""
+        elapsed = (time.perf_counter() - self.t0) * 1000.0
+        self.add(name, max(0.0, elapsed - sum(self.phases.values())))
+
+    def ready(self) -> float:
+        """Отметить готовность; вернуть мс от t0 / Mark ready; return ms since t0."""
+        self.ready_ms = (time.perf_counter() - self.t0) * 1000.0
+        return self.ready_ms
+
+    def publish(self, metrics) -> None:
+        """Фазы и время до готовности в метрики процесса / Phases and time to ready into the process metrics."""
+        for name, ms in self.phases.items():
+            metrics.set(f"startup_{name}_ms", round(ms, 1))
+        if self.ready_ms is not None:
+            metrics.set("startup_ready_ms", round(self.ready_ms, 1))
+
+    def format(self) -> str:
+        """Таблица фаз для консоли / Phase table for the console."""
+        total = self.ready_ms if self.ready_ms is not None else sum(self.phases.values())
+        lines = [f"{name:<10} {ms:9.1f} ms  {ms / total * 100 if total else 0:5.1f}%" for name, ms in self.phases.items()]
+        if self.ready_ms is not None:
+            lines.append(f"{'ready':<10} {self.ready_ms:9.1f} ms")
+        return "\n".join(lines)
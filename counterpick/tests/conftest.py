@@ -3,6 +3,12 @@ import json
 import pytest
 import os, sys, subprocess, signal, time
 
+# Модули из scripts_for_help импортируются тестами напрямую /
+# Modules from scripts_for_help are imported by tests directly
+SCRIPTS_DIR = Path(__file__).resolve().parents[1] / "scripts_for_help"
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
 @pytest.fixture(scope="session")
 def app_root() -> Path:
     # .../counterpick (папка, где лежат release_stub, db, weights, tests)
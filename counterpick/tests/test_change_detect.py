@@ -0,0 +1,45 @@
+import numpy as np
+
+from change_detect import ZoneChangeDetector
+
+ROIS = [(10, 10, 50, 90), (60, 10, 100, 90)]
+
+
+def _frame(value=0):
+    return np.full((100, 120, 4), value, dtype=np.uint8)
+
+
+def test_first_frame_is_always_sent():
+    det = ZoneChangeDetector(ROIS, keyframe_interval=10)
+    assert det.should_send(_frame(), now=0.0)
+    assert det.last_reason == "changed"
+
+
+def test_identical_and_noise_frames_are_skipped_until_keyframe():
+    det = ZoneChangeDetector(ROIS, threshold=3.0, keyframe_interval=10)
+    det.should_send(_frame(100), now=0.0)
+
+    assert not det.should_send(_frame(100), now=2.0)
+    assert not det.should_send(_frame(101), now=4.0), "шум в 1 уровень не должен считаться изменением"
+    assert det.should_send(_frame(100), now=10.0), "ключевой кадр по таймеру"
+    assert det.last_reason == "keyframe"
+
+
+def test_change_inside_pick_zone_is_sent_outside_is_not():
+    det = ZoneChangeDetector(ROIS, threshold=3.0, keyframe_interval=100)
+    det.should_send(_frame(), now=0.0)
+
+    outside = _frame()
+    outside[:, 105:] = 255            # вне зон пиков / outside pick zones
+    assert not det.should_send(outside, now=1.0)
+
+    picked = _frame()
+    picked[10:50, 60:100] = 200       # новый портрет в зоне Dire / new portrait in Dire zone
+    assert det.should_send(picked, now=2.0)
+    assert det.last_reason == "changed"
+
+
+def test_zero_threshold_disables_skipping():
+    det = ZoneChangeDetector(ROIS, threshold=0)
+    assert det.should_send(_frame(), now=0.0)
+    assert det.should_send(_frame(), now=0.1)
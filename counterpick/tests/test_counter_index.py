@@ -0,0 +1,44 @@
+import json
+from pathlib import Path
+
+import numpy as np
+
+from counter_index import CounterIndex
+
+COUNTERS_JSON = Path(__file__).resolve().parents[1] / "scripts_for_help" / "counters.json"
+
+
+def test_index_matches_linear_scan_of_counters_json():
+    data = json.loads(COUNTERS_JSON.read_text(encoding="utf-8"))
+    index = CounterIndex.from_json(str(COUNTERS_JSON))
+
+    assert len(index.heroes) == len(data)
+    for entry in data:
+        expected = [c["counter"] for c in sorted(entry["counters"], key=lambda c: -c["score"])]
+        assert list(index.counters(entry["hero"])) == expected, f"[{entry['hero']}] порядок контрпиков"
+
+
+def test_score_matrix_is_dense_and_consistent():
+    index = CounterIndex.from_json(str(COUNTERS_JSON))
+    n = len(index.heroes)
+    assert index.scores.shape == (n, n)
+    assert np.all(np.diag(index.scores) == 0), "герой не может контрить сам себя"
+
+    hero = index.heroes[0]
+    best = index.counters(hero)[0]
+    assert index.score(hero, best) == index.scores[index.hero_ids[hero]].max()
+
+
+def test_class_ids_and_class_table():
+    entries = [
+        {"hero": "axe", "counters": [{"counter": "io", "score": 10}, {"counter": "lina", "score": 90}]},
+        {"hero": "lina", "counters": ["axe"]},
+    ]
+    index = CounterIndex(entries, {0: "lina", 3: "axe", 5: "unknown"})
+
+    assert index.counters_for_class(3) == ("lina", "io")
+    assert index.counters_for_class(5) == ()
+    table = index.class_table(top=1)
+    assert table.shape == (6,)
+    assert table[3] == ("lina",) and table[0] == ("axe",) and table[1] == ()
+    assert index.score("axe", "io") == 0, "io нет в списке героев — в матрице его нет"
@@ -0,0 +1,38 @@
+from detected_state import DetectedState
+
+
+def _tracker(**kwargs):
+    written = []
+    return DetectedState(written.append, **kwargs), written
+
+
+def test_repeated_frames_do_not_rewrite_state():
+    state, written = _tracker()
+    for t in range(5):
+        state.update(True, now=t)
+    assert written == [True]
+    assert state.writes == 1
+
+
+def test_hysteresis_needs_consecutive_empty_frames():
+    state, written = _tracker(clear_after=3)
+    state.update(True, now=0)
+    state.update(False, now=1)
+    state.update(False, now=2)
+    state.update(True, now=3)   # промах модели, а не конец драфта / a model miss, not the end of the draft
+    state.update(False, now=4)
+    state.update(False, now=5)
+    assert written == [True]
+
+    assert state.update(False, now=6)
+    assert written == [True, False]
+    assert state.detected is False
+
+
+def test_writes_per_minute_window():
+    state, _ = _tracker(clear_after=1)
+    state.update(True, now=0)
+    state.update(False, now=10)
+    state.update(True, now=70)
+    assert state.writes == 3
+    assert state.writes_per_minute(now=65) == 2  # запись в t=0 вышла из окна / the t=0 write left the window
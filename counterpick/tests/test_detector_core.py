@@ -0,0 +1,122 @@
+from pathlib import Path
+
+import numpy as np
+
+from counter_index import CounterIndex
+from detector_core import Detector
+from frame_codec import DecodedFrame
+from inference_backends import Detections, empty_detections
+from pick_zones import layout_for
+from slot_cache import SlotCache
+
+COUNTERS_JSON = Path(__file__).resolve().parents[1] / "scripts_for_help" / "counters.json"
+
+
+class FakeBackend:
+    """Бэкенд без модели: заранее заданные детекции по порядку / A model-free backend: preset detections in order."""
+    name = "fake"
+    names = {0: "abaddon", 1: "axe"}
+
+    def __init__(self, results):
+        self.results = list(results)
+
+    def predict_batch(self, sources):
+        return [self.results.pop(0) for _ in sources]
+
+
+def _det(*rows):
+    arr = np.array(rows, np.float32).reshape(-1, 6)
+    return Detections(arr[:, :4], arr[:, 4], arr[:, 5].astype(np.int64))
+
+
+def _frame():
+    return DecodedFrame(np.zeros((1080, 1920, 3), np.uint8), (0, 0), (1920, 1080))
+
+
+def _detector(results):
+    return Detector(FakeBackend(results), CounterIndex.from_json(str(COUNTERS_JSON)), infer_mode="full")
+
+
+def test_process_merges_new_heroes_once():
+    box = (10, 10, 60, 90, 0.9, 0)
+    det = _detector([_det(box), _det(box), _det(box, (100, 10, 150, 90, 0.8, 1))])
+
+    first = det.process(_frame())
+    assert first.detected and first.changed and first.added == [0]
+    assert [h["hero"] for h in first.heroes] == ["abaddon"]
+    assert first.heroes[0]["counters"][0] == "shadow_demon"
+
+    again = det.process(_frame())
+    assert again.detected and not again.changed and again.heroes is None
+
+    snaps = det.process_batch([_frame()])
+    assert snaps[0].added == [1] and len(det.draft) == 2
+
+
+def test_empty_and_small_boxes_leave_the_draft_alone():
+    det = _detector([empty_detections(), _det((10, 10, 60, 20, 0.9, 0))])
+    empty = det.process(_frame())
+    assert not empty.detected and not empty.changed
+
+    small = det.process(_frame())  # Ниже MIN_HEIGHT / Below MIN_HEIGHT
+    assert small.detected and not small.changed and len(det.draft) == 0
+
+
+def test_reset_starts_a_new_draft():
+    box = (10, 10, 60, 90, 0.9, 0)
+    det = _detector([_det(box), _det(box)])
+    det.process(_frame())
+    det.reset()
+    assert det.process(_frame()).added == [0]
+
+
+def test_warmup_runs_both_batch_sizes_without_touching_the_draft():
+    calls = []
+
+    class Recording(FakeBackend):
+        def predict_batch(self, sources):
+            calls.append([s.shape for s in sources])
+            return [empty_detections() for _ in sources]
+
+    det = Detector(Recording([]), CounterIndex.from_json(str(COUNTERS_JSON)))
+    assert det.warmup((1920, 1080), batch=4) >= 0.0
+    assert [len(c) for c in calls] == [1, 4]
+    assert calls[0][0] == det.prepare(_frame())[0].shape  # Та же форма, что у настоящих кадров / Same shape as real frames
+    assert len(det.draft) == 0
+
+
+def test_warmup_at_the_working_size_matches_full_mode_frames():
+    shapes = []
+
+    class Recording(FakeBackend):
+        def predict_batch(self, sources):
+            shapes.extend(s.shape for s in sources)
+            return [empty_detections() for _ in sources]
+
+    det = Detector(Recording([]), CounterIndex.from_json(str(COUNTERS_JSON)), infer_mode="full")
+    det.warmup(layout_for(3840, 2160).work)  # 4K-монитор, кадры — рабочие 1080p / 4K monitor, frames are working 1080p
+    assert shapes == [_frame().image.shape]
+
+
+def test_locked_slots_skip_the_model_and_keep_detected():
+    calls = []
+
+    class Counting(FakeBackend):
+        def predict_batch(self, sources):
+            calls.append(len(sources))
+            return super().predict_batch(sources)
+
+    # Полосы на холсте: Radiant с x=0, Dire с x=131; строка слота i — y 15+100*i /
+    # Strips on the canvas: Radiant at x=0, Dire at x=131; slot row i — y 15+100*i
+    rows = [(x, 25 + 100 * i, x + 75, 105 + 100 * i, 0.9, i % 2) for x in (20, 151) for i in range(5)]
+    det = Detector(Counting([_det(*rows)]), CounterIndex.from_json(str(COUNTERS_JSON)),
+                   slot_cache=SlotCache(confirm=1))
+    frame = DecodedFrame(np.random.default_rng(0).integers(0, 255, (1080, 1920, 3), dtype=np.uint8),
+                         (0, 0), (1920, 1080))
+    first = det.process(frame)
+    assert first.added == [0, 1] and len(det.slot_cache.locked()) == 10
+
+    source, placed = det.prepare(frame)
+    assert source is None and placed.slots.cached == 10
+    again = det.process(frame)
+    assert again.detected and not again.changed and calls == [1]  # Модель не вызывалась / The model was not called
@@ -0,0 +1,86 @@
+import queue
+import threading
+
+from detector_pipeline import DetectorPipeline
+from metrics import Metrics
+
+
+def _source(items):
+    """read(timeout) поверх списка: кадры по одному, затем None / read(timeout) over a list: frames one by one, then None."""
+    q = queue.Queue()
+    for item in items:
+        q.put(item)
+
+    def read(timeout):
+        try:
+            return q.get(timeout=timeout)
+        except queue.Empty:
+            return None
+    return read
+
+
+def _infer_all(pipe, n):
+    """Цикл инференса как в детекторе: результат = кадр * 10 / Inference loop as in the detector: result = frame * 10."""
+    seen = []
+    while len(seen) < n:
+        item = pipe.get(timeout=1)
+        assert item is not None
+        seen.append(item)
+        pipe.put_results([item], [item * 10])
+    return seen
+
+
+def test_results_are_published_in_frame_order(tmp_path):
+    published, cleaned = [], []
+    metrics = Metrics(str(tmp_path / "metrics.json"))
+    pipe = DetectorPipeline(_source(range(20)), lambda item, res: published.append((item, res)),
+                            cleanup=cleaned.append, decoded_depth=2, metrics=metrics, poll=0.01).start()
+    try:
+        assert _infer_all(pipe, 20) == list(range(20))
+    finally:
+        pipe.close()
+    assert published == [(i, i * 10) for i in range(20)]
+    assert cleaned == list(range(20))  # Ровно раз на кадр, после публикации / Exactly once per frame, after publishing
+    assert 1 <= metrics.gauges["pipeline_decoded_queue_max"] <= 2
+
+
+def test_reader_is_bounded_and_close_drops_unread_frames(tmp_path):
+    cleaned = []
+    pipe = DetectorPipeline(_source(range(10)), lambda item, res: None, cleanup=cleaned.append,
+                            decoded_depth=2, poll=0.01).start()
+    try:
+        for _ in range(50):
+            if pipe.decoded.full():
+                break
+            threading.Event().wait(0.01)
+        assert pipe.decoded.qsize() == 2  # Чтение ждёт модель, а не копит кадры / Reading waits for the model, no pile-up
+    finally:
+        pipe.close()
+    # Два кадра в очереди и один, ждавший места, — выброшены при остановке /
+    # Two queued frames and the one waiting for room are dropped at shutdown
+    assert sorted(cleaned) == [0, 1, 2]
+
+
+def test_publish_errors_are_counted_and_frames_still_cleaned(tmp_path):
+    cleaned = []
+    metrics = Metrics(str(tmp_path / "metrics.json"))
+
+    def publish(item, res):
+        if item == 1:
+            raise RuntimeError("boom")
+
+    pipe = DetectorPipeline(_source(range(3)), publish, cleanup=cleaned.append, metrics=metrics, poll=0.01).start()
+    try:
+        _infer_all(pipe, 3)
+    finally:
+        pipe.close()
+    assert cleaned == [0, 1, 2]
+    assert metrics.counters["pipeline_publish_errors"] == 1
+
+
+def test_stop_is_visible_to_the_inference_loop():
+    pipe = DetectorPipeline(_source([]), lambda item, res: None, poll=0.01).start()
+    assert not pipe.stopping
+    pipe.stop()  # Как из обработчика SIGTERM / As from the SIGTERM handler
+    assert pipe.stopping
+    pipe.close()
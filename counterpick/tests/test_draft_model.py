@@ -0,0 +1,30 @@
+from draft_model import DraftModel
+
+NAMES = {0: "axe", 1: "lina", 2: "io"}
+
+
+def test_merge_adds_only_new_heroes_in_frame_order():
+    draft = DraftModel(NAMES)
+    assert draft.merge([2, 0], [("axe",), ("lina",)], [[1, 1, 2, 2], [3, 3, 4, 4]], now=1.0) == [2, 0]
+    assert draft.merge([0, 1], [("io",), ("axe",)], [[9, 9, 9, 9], [5, 5, 6, 6]], now=2.0) == [1]
+
+    assert draft.hero_ids == {0, 1, 2}
+    assert draft.to_overlay() == [
+        {"hero": "io", "counters": ["axe"], "box": [1, 1, 2, 2]},
+        {"hero": "axe", "counters": ["lina"], "box": [3, 3, 4, 4]},   # бокс первого появления / first-seen box
+        {"hero": "lina", "counters": ["axe"], "box": [5, 5, 6, 6]},
+    ]
+
+
+def test_timestamps_and_version():
+    draft = DraftModel(NAMES)
+    draft.merge([0], [("lina",)], [[0, 0, 1, 1]], now=1.0)
+    version = draft.version
+    assert draft.merge([0], [("lina",)], [[0, 0, 1, 1]], now=5.0) == []
+    assert draft.version == version, "повтор героя — не изменение / a repeated hero is not a change"
+
+    pick = draft.picks()[0]
+    assert (pick.first_seen, pick.last_seen) == (1.0, 5.0)
+
+    draft.clear()
+    assert len(draft) == 0 and draft.version == version + 1
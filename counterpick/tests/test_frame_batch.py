@@ -0,0 +1,36 @@
+from frame_batch import collect_batch
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_batch_fills_up_to_size_in_order():
+    queued = [2, 3, 4, 5]
+    batch = collect_batch(1, lambda timeout: queued.pop(0) if queued else None, size=3, deadline=1.0)
+    assert batch == [1, 2, 3]
+    assert queued == [4, 5], "лишние кадры остаются в очереди / extra frames stay queued"
+
+
+def test_batch_stops_at_deadline_when_queue_is_empty():
+    clock = FakeClock()
+    waits = []
+
+    def next_item(timeout):
+        waits.append(timeout)
+        clock.now += timeout  # Ждали весь таймаут — кадра нет / Waited the whole timeout — no frame
+        return None
+
+    assert collect_batch("a", next_item, size=4, deadline=0.03, clock=clock) == ["a"]
+    assert waits == [0.03]
+
+
+def test_size_one_never_waits():
+    def next_item(timeout):
+        raise AssertionError("не должен ждать / must not wait")
+
+    assert collect_batch("a", next_item, size=1, deadline=1.0) == ["a"]
@@ -0,0 +1,45 @@
+import os
+
+import numpy as np
+import pytest
+
+pytest.importorskip("cv2")
+
+from frame_codec import FORMATS, extension, read_frame, write_frame  # noqa: E402
+
+
+def _frame(h=40, w=60):
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 256, size=(h, w, 4), dtype=np.uint8)
+    frame[:, :, 3] = 255
+    return frame
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_every_format_round_trips_to_bgr(tmp_path, fmt):
+    frame = _frame()
+    path = str(tmp_path / ("f" + extension(fmt)))
+    size = write_frame(path + ".tmp", frame, fmt)
+    os.replace(path + ".tmp", path)          # Как publish_frame / As publish_frame does
+    assert size == os.path.getsize(path)
+
+    decoded = read_frame(path)
+    assert decoded.image.shape == (40, 60, 3)
+    assert np.array_equal(decoded.image, frame[:, :, :3])
+    assert decoded.origin == (0, 0) and decoded.full_size == (60, 40)
+    os.remove(path)                          # mmap уже закрыт / mmap is already closed
+
+
+def test_raw_region_keeps_origin_and_full_size(tmp_path):
+    path = str(tmp_path / "r.raw")
+    write_frame(path, _frame(10, 20), "raw", origin=(1445, 200), full_size=(1920, 1080))
+    decoded = read_frame(path)
+    assert decoded.image.shape == (10, 20, 3)
+    assert decoded.origin == (1445, 200) and decoded.full_size == (1920, 1080)
+
+
+def test_raw_header_is_checked(tmp_path):
+    path = tmp_path / "bad.raw"
+    path.write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError):
+        read_frame(str(path))
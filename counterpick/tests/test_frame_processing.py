@@ -0,0 +1,38 @@
+import numpy as np
+
+from frame_codec import DecodedFrame
+from frame_processing import detections_to_screen, prepare_frame
+from pick_zones import layout_for, pick_rois
+
+
+def _frame(h=1080, w=1920):
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 255, (h, w, 3), dtype=np.uint8)
+
+
+def test_full_mode_passes_the_frame_through():
+    img = _frame()
+    source, placements = prepare_frame(DecodedFrame(img, (0, 0), (1920, 1080)), "full")
+    assert source is img and placements == []
+
+
+def test_region_frame_gives_the_same_input_as_the_full_frame():
+    img = _frame()
+    rois = pick_rois(layout_for(1920, 1080))
+    x1, y1 = min(r[0] for r in rois), min(r[1] for r in rois)
+    x2, y2 = max(r[2] for r in rois), max(r[3] for r in rois)
+
+    full_src, full_placed = prepare_frame(DecodedFrame(img, (0, 0), (1920, 1080)))
+    region = DecodedFrame(np.ascontiguousarray(img[y1:y2, x1:x2]), (x1, y1), (1920, 1080))
+    reg_src, reg_placed = prepare_frame(region)
+    np.testing.assert_array_equal(full_src, reg_src)
+
+    # Бокс на холсте ложится в одну и ту же точку полного кадра / A canvas box lands on the same full-frame spot
+    box = np.array([[5, 40, 60, 120]], np.float32)
+    np.testing.assert_allclose(detections_to_screen(box, full_placed),
+                               detections_to_screen(box, reg_placed, region.origin))
+
+
+def test_boxes_without_placements_are_only_shifted_by_origin():
+    box = np.array([[1, 2, 3, 4]], np.float32)
+    np.testing.assert_allclose(detections_to_screen(box, [], (10, 20)), [[11, 22, 13, 24]])
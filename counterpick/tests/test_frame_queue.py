@@ -0,0 +1,68 @@
+import os
+
+from frame_queue import TMP_SUFFIX, FrameDirWatcher, frame_filename, is_sequenced, publish_frame
+
+
+def _write_frame(directory, name):
+    tmp = os.path.join(directory, name + TMP_SUFFIX)
+    with open(tmp, "wb") as f:
+        f.write(b"png")
+    return publish_frame(tmp)
+
+
+def test_sequenced_names_sort_in_capture_order():
+    names = [frame_filename(1700000000000, seq) for seq in (9, 10, 100)]
+    assert sorted(names) == names
+    assert all(is_sequenced(n) for n in names)
+    assert not is_sequenced("sample_pick.png")
+
+
+def test_existing_frames_are_queued_in_order(tmp_path):
+    for seq in (3, 1, 2):
+        _write_frame(str(tmp_path), frame_filename(1, seq))
+    (tmp_path / "ignored.png.tmp").write_bytes(b"")
+
+    watcher = FrameDirWatcher(str(tmp_path)).start()
+    try:
+        got = [os.path.basename(watcher.get(timeout=1)) for _ in range(3)]
+        assert got == [frame_filename(1, s) for s in (1, 2, 3)]
+        assert watcher.get(timeout=0.1) is None, ".tmp не должен попадать в очередь"
+    finally:
+        watcher.close()
+
+
+def test_renamed_frame_wakes_waiting_reader(tmp_path):
+    watcher = FrameDirWatcher(str(tmp_path)).start()
+    try:
+        assert watcher.get(timeout=0.05) is None
+        path = _write_frame(str(tmp_path), frame_filename(1, 1))
+        assert watcher.get(timeout=2) == path, f"кадр не пришёл событием ({watcher.mode})"
+    finally:
+        watcher.close()
+
+
+def test_duplicate_notifications_are_ignored(tmp_path):
+    watcher = FrameDirWatcher(str(tmp_path))
+    watcher.push("a.png")
+    watcher.push("a.png")
+    assert watcher.pending() == 1
+
+
+def test_name_is_accepted_again_after_done(tmp_path):
+    watcher = FrameDirWatcher(str(tmp_path))
+    watcher.push("a.png")
+    path = watcher.get(timeout=0)
+    watcher.push("a.png")
+    assert watcher.pending() == 0, "кадр в работе не должен вставать в очередь повторно"
+    watcher.done(path)
+    watcher.push("a.png")
+    assert watcher.pending() == 1
+
+
+def test_trim_keeps_latest_frames(tmp_path):
+    watcher = FrameDirWatcher(str(tmp_path))
+    for seq in (1, 2, 3, 4):
+        watcher.push(frame_filename(1, seq))
+    dropped = [os.path.basename(p) for p in watcher.trim(2)]
+    assert dropped == [frame_filename(1, 1), frame_filename(1, 2)]
+    assert os.path.basename(watcher.get(timeout=0)) == frame_filename(1, 3)
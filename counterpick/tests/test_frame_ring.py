@@ -0,0 +1,167 @@
+import os
+
+import numpy as np
+import pytest
+
+import frame_ring
+from frame_ring import FrameRingReader, FrameRingWriter
+from frame_sources import FrameSource
+from metrics import Metrics
+
+
+@pytest.fixture
+def ring_name():
+    return f"cp_test_ring_{os.getpid()}"
+
+
+def _frame(value: int, h: int = 6, w: int = 8) -> np.ndarray:
+    return np.full((h, w, 4), value, dtype=np.uint8)
+
+
+def test_reader_returns_none_without_writer(ring_name):
+    assert FrameRingReader.attach(ring_name + "_missing") is None
+
+
+def test_frames_are_read_in_order_as_views(ring_name):
+    writer = FrameRingWriter.create(ring_name, slots=3, height=6, width=8)
+    reader = FrameRingReader.attach(ring_name)
+    try:
+        assert reader.read_next(0) is None, "пустое кольцо не должно отдавать кадры"
+        writer.write(_frame(1))
+        writer.write(_frame(2))
+
+        first = reader.read_next(0)
+        assert first.seq == 1 and int(first.image[0, 0, 0]) == 1
+        assert first.image.base is not None, "кадр должен быть view на общую память"
+
+        second = reader.read_next(first.seq)
+        assert second.seq == 2 and int(second.image[0, 0, 0]) == 2
+        assert reader.read_next(second.seq) is None
+        del first, second
+    finally:
+        reader.close()
+        writer.close()
+        writer.unlink()
+
+
+def test_overwritten_frames_are_skipped(ring_name):
+    writer = FrameRingWriter.create(ring_name, slots=2, height=6, width=8)
+    reader = FrameRingReader.attach(ring_name)
+    try:
+        first = None
+        for v in range(1, 6):
+            writer.write(_frame(v))
+            if v == 1:
+                first = reader.read_next(0)
+        assert not reader.is_current(first), "перезаписанный слот должен определяться"
+
+        frame = reader.read_next(1)
+        assert frame.seq == 4, "читатель должен перейти к самому старому живому кадру"
+        del first, frame
+    finally:
+        reader.close()
+        writer.close()
+        writer.unlink()
+
+
+def test_smaller_frame_fits_slot(ring_name):
+    writer = FrameRingWriter.create(ring_name, slots=2, height=6, width=8)
+    reader = FrameRingReader.attach(ring_name)
+    try:
+        writer.write(_frame(7, h=4, w=5))
+        frame = reader.read_next(0)
+        assert frame.image.shape == (4, 5, 4)
+        with pytest.raises(ValueError):
+            writer.write(_frame(1, h=10, w=8))
+        del frame
+    finally:
+        reader.close()
+        writer.close()
+        writer.unlink()
+
+
+def test_keep_latest_depth_and_backpressure(ring_name):
+    writer = FrameRingWriter.create(ring_name, slots=4, height=6, width=8)
+    reader = FrameRingReader.attach(ring_name)
+    try:
+        for v in range(1, 4):
+            writer.write(_frame(v))
+        assert writer.pending == 3, "читатель ещё ничего не взял"
+
+        frame = reader.read_next(0, depth=1)
+        assert frame.seq == 3, "при depth=1 берётся только самый свежий кадр"
+        reader.ack(frame.seq)
+        assert writer.pending == 0
+        del frame
+    finally:
+        reader.close()
+        writer.close()
+        writer.unlink()
+
+
+def test_source_reattaches_when_capture_restarts(ring_name, tmp_path):
+    writer = FrameRingWriter.create(ring_name, slots=3, height=6, width=8)
+    source = FrameSource("shm", ring_name, str(tmp_path), ".png", keep=3, reattach_after=0.0)
+    restarted = None
+    try:
+        for v in (1, 2, 3):
+            writer.write(_frame(v))
+        assert [int(source.next_ring_frame()[0].image[0, 0, 0]) for _ in range(3)] == [1, 2, 3]
+
+        # Захват упал (без unlink) и запущен снова: то же имя, голова с нуля /
+        # Capture crashed (no unlink) and started again: same name, head from zero
+        writer.close()
+        restarted = FrameRingWriter.create(ring_name, slots=3, height=6, width=8)
+        restarted.write(_frame(7))
+        assert source.next_ring_frame() is None      # Тишина — проверка сессии / Silence — session check
+        got = source.next_ring_frame()
+        assert got is not None and int(got[0].image[0, 0, 0]) == 7
+        assert source.last_ring_seq == 1 and restarted.pending == 0  # Ack дошёл до нового кольца / The ack reached the new ring
+    finally:
+        source.close()
+        for w in (restarted, writer):
+            if w is not None and w._buf is not None:
+                w.close()
+        (restarted or writer).unlink()
+
+
+def test_source_counts_a_frame_overwritten_while_reading(ring_name, tmp_path, monkeypatch):
+    writer = FrameRingWriter.create(ring_name, slots=3, height=6, width=8)
+    metrics = Metrics(str(tmp_path / "metrics.json"))
+    source = FrameSource("shm", ring_name, str(tmp_path), ".png", keep=3, metrics=metrics)
+    try:
+        writer.write(_frame(1))
+        source.next_ring_frame()  # Подключиться к кольцу / Attach to the ring
+        writer.write(_frame(2))
+        monkeypatch.setattr(source.ring_reader, "is_current", lambda frame: False)
+        assert source.next_ring_frame() is None
+        # Потерянный кадр посчитан, ack дошёл — захват не упрётся в очередь /
+        # The lost frame is counted, the ack went through — capture will not stall on the queue
+        assert metrics.counters.get("frames_dropped") == 1 and writer.pending == 0
+    finally:
+        source.close()
+        writer.close()
+        writer.unlink()
+
+
+def test_writer_reuses_a_held_segment_with_a_new_session(ring_name, monkeypatch):
+    writer = FrameRingWriter.create(ring_name, slots=2, height=6, width=8)
+    reader = FrameRingReader.attach(ring_name)
+    writer.write(_frame(1))
+    writer.close()
+    real = frame_ring.shared_memory.SharedMemory
+
+    def windows_like(*args, create=False, **kwargs):
+        if create:
+            raise FileExistsError(ring_name)  # Читатель держит имя / The reader holds the name
+        return real(*args, **kwargs)
+
+    monkeypatch.setattr(frame_ring.shared_memory, "SharedMemory", windows_like)
+    again = FrameRingWriter.create(ring_name, slots=2, height=6, width=8)
+    monkeypatch.undo()
+    try:
+        assert again.head_seq == 0 and reader.replaced()  # Тот же сегмент, новая сессия / Same segment, new session
+    finally:
+        reader.close()
+        again.close()
+        again.unlink()
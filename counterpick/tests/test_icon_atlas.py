@@ -0,0 +1,27 @@
+from icon_atlas import LRUCache, quantize_height, scan_icons
+
+
+def test_heights_snap_to_a_few_buckets():
+    buckets = (16, 24, 32)
+    assert {quantize_height(h, buckets) for h in range(10, 60)} == {16, 24, 32}
+    assert quantize_height(20, buckets) == 24  # равенство — бóльшая / tie -> larger
+    assert quantize_height(17, buckets) == 16
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1      # "a" теперь свежий / "a" is now fresh
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_scan_icons_lists_jpgs_once(tmp_path):
+    (tmp_path / "axe.jpg").write_bytes(b"")
+    (tmp_path / "lina.JPG").write_bytes(b"")
+    (tmp_path / "notes.txt").write_text("x")
+    assert set(scan_icons(str(tmp_path))) == {"axe", "lina"}
+    assert scan_icons(str(tmp_path / "missing")) == {}
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+from inference_backends import create_backend, decode_yolo_output, letterbox  # noqa: E402
+
+
+def _raw_output(rows, nc=3):
+    """Собрать выход YOLOv8 (1, 4+nc, N) из строк (cx, cy, w, h, cls, score)."""
+    out = np.zeros((1, 4 + nc, len(rows)), dtype=np.float32)
+    for i, (cx, cy, w, h, c, s) in enumerate(rows):
+        out[0, :4, i] = (cx, cy, w, h)
+        out[0, 4 + c, i] = s
+    return out
+
+
+def test_decode_filters_low_confidence_and_suppresses_overlaps():
+    out = _raw_output([
+        (100, 100, 40, 40, 0, 0.9),
+        (102, 101, 40, 40, 0, 0.8),   # дубль того же класса / same-class duplicate
+        (102, 101, 40, 40, 1, 0.7),   # другой класс — остаётся / other class — kept
+        (300, 300, 40, 40, 2, 0.1),   # ниже порога / below threshold
+    ])
+    det = decode_yolo_output(out, conf=0.25, iou=0.6)
+
+    assert sorted(det.cls.tolist()) == [0, 1]
+    best = det.xyxy[det.cls == 0][0]
+    assert best.tolist() == [80, 80, 120, 120]
+
+
+def test_letterbox_keeps_aspect_and_reports_offsets():
+    img = np.zeros((100, 200, 3), dtype=np.uint8)
+    boxed, gain, (left, top) = letterbox(img, 64)
+    assert boxed.shape == (64, 64, 3)
+    assert gain == pytest.approx(0.32)
+    assert left == 0 and top == 16
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        create_backend("tpu", "best.pt", 640, 0.25, 0.6)
+
+
+def test_onnx_export_is_reused_from_the_hash_keyed_cache(tmp_path):
+    from inference_backends import export_onnx
+    from model_cache import artifact_path
+
+    weights = tmp_path / "best.pt"
+    weights.write_bytes(b"weights")
+    cached = artifact_path(str(weights), "640.onnx")
+    (tmp_path / "model_cache").mkdir()
+    with open(cached, "wb") as f:
+        f.write(b"onnx")
+    # Готовый артефакт — без ultralytics / A finished artifact needs no ultralytics
+    assert export_onnx(str(weights), 640) == cached
@@ -0,0 +1,57 @@
+import json
+
+from latency_trace import (
+    TraceWriter, derive, load_records, percentile, summarize, trace_id_for, trace_id_from_path,
+)
+from frame_queue import frame_filename
+
+
+def test_trace_id_matches_frame_file_name():
+    tid = trace_id_for(1700000000123, 42)
+    assert trace_id_from_path("/tmp/shots/" + frame_filename(1700000000123, 42, ".raw")) == tid
+
+
+def test_disabled_writer_never_creates_the_file(tmp_path):
+    path = tmp_path / "trace_detector.jsonl"
+    tracer = TraceWriter(str(path), enabled=False)
+    with tracer.span("a", "decode"):
+        pass
+    tracer.record("a", "infer", 1.0, 2.0)
+    tracer.close()
+    assert not path.exists()
+
+
+def test_writer_appends_jsonl_and_skips_missing_ids(tmp_path):
+    path = tmp_path / "trace_detector.jsonl"
+    tracer = TraceWriter(str(path))
+    with tracer.span("a", "decode"):
+        pass
+    tracer.record(None, "infer", 1.0, 2.0)  # Кадр без id (чужой файл) / A frame without an id (foreign file)
+    tracer.close()
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [(r["id"], r["stage"]) for r in lines] == [("a", "decode")]
+
+
+def test_queue_wait_and_end_to_end_are_derived_across_processes():
+    records = [
+        {"id": "f1", "stage": "capture", "t": 100.000, "ms": 20.0},
+        {"id": "f1", "stage": "decode", "t": 100.050, "ms": 5.0},
+        {"id": "f1", "stage": "paint", "t": 100.400, "ms": 2.0},
+        {"id": "f2", "stage": "capture", "t": 101.000, "ms": 20.0},  # Не дошёл до оверлея / Never reached the overlay
+    ]
+    derived = {(r["id"], r["stage"]): r["ms"] for r in derive(records)}
+    assert round(derived[("f1", "queue_wait")], 3) == 30.0
+    assert round(derived[("f1", "end_to_end")], 3) == 402.0
+    assert ("f2", "end_to_end") not in derived
+
+
+def test_summary_percentiles_in_stage_order(tmp_path):
+    path = tmp_path / "trace_detector.jsonl"
+    lines = [json.dumps({"id": str(i), "stage": "infer", "t": i, "ms": float(i)}) for i in range(1, 101)]
+    lines += [json.dumps({"id": "x", "stage": "decode", "t": 0, "ms": 1.0}), "{broken"]
+    path.write_text("\n".join(lines), encoding="utf-8")
+    summary = summarize(load_records([str(path)]))
+    assert list(summary) == ["decode", "infer"]
+    assert summary["infer"]["count"] == 100
+    assert summary["infer"]["p50"] == 50.5
+    assert summary["infer"]["p99"] == round(percentile([float(i) for i in range(1, 101)], 99), 2)
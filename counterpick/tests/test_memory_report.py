@@ -0,0 +1,96 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from memory_report import HEAVY_MODULES, MemoryReport, loaded_heavy, rss
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[1] / "scripts_for_help"
+
+# Путь только инференса: модули процесса детектора, ядро и прогон кадра через бэкенд без модели
+# (onnxruntime — если установлен). Ни torch, ни ultralytics, ни Qt здесь не нужны.
+# The inference-only path: detector process modules, the core and one frame through a model-free
+# backend (onnxruntime — when installed). It needs neither torch, ultralytics nor Qt.
+INFERENCE_ONLY = r"""
+import json, sys
+import numpy as np
+import screenshot_detector, detector_core, frame_sources, inference_backends
+from counter_index import CounterIndex
+from frame_codec import DecodedFrame
+from memory_report import loaded_heavy
+
+class Backend:
+    name, names = "stub", {0: "abaddon"}
+    def predict_batch(self, sources):
+        return [inference_backends.empty_detections() for _ in sources]
+
+try:
+    inference_backends.import_backend("onnx")
+except inference_backends.BackendUnavailable:
+    pass
+det = detector_core.Detector(Backend(), CounterIndex.from_json(sys.argv[1]))
+det.warmup()
+det.process(DecodedFrame(np.zeros((1080, 1920, 3), np.uint8), (0, 0), (1920, 1080)))
+print(json.dumps(loaded_heavy()))
+"""
+
+
+# "auto" на машине без CUDA: подложные torch (без CUDA) и onnxruntime лежат в sys.path первыми,
+# проба должна выбрать onnx, не импортируя torch.
+# "auto" on a machine without CUDA: fake torch (no CUDA) and onnxruntime come first on sys.path,
+# the probe must pick onnx without importing torch.
+AUTO_PROBE = r"""
+import json, sys
+sys.path.insert(0, sys.argv[1])
+import inference_backends
+from memory_report import loaded_heavy
+print(json.dumps([inference_backends.import_backend("auto"), loaded_heavy()]))
+"""
+
+FAKE_TORCH = """
+class cuda:
+    @staticmethod
+    def is_available():
+        return False
+
+    @staticmethod
+    def device_count():
+        return 0
+"""
+
+
+def test_rss_reports_current_and_peak():
+    current, peak = rss()
+    if sys.platform.startswith("linux"):
+        assert 0 < current <= peak
+
+
+def test_report_writes_a_snapshot(tmp_path):
+    path = tmp_path / "memory_test.json"
+    report = MemoryReport("test", str(path), enabled=True, interval=0.0)
+    report.mark_ready()
+    assert report.maybe_sample()
+    snap = json.loads(path.read_text(encoding="utf-8"))
+    assert snap["process"] == "test" and snap["when"] == "ready"
+    assert snap["peak_rss_mb"] >= snap["ready_rss_mb"] >= 0
+    assert loaded_heavy({"torch": None, "numpy": None}) == ["torch"]
+
+
+def test_inference_only_path_does_not_import_heavy_modules():
+    out = subprocess.run([sys.executable, "-c", INFERENCE_ONLY, str(SCRIPTS_DIR / "counters.json")],
+                         cwd=SCRIPTS_DIR, capture_output=True, text=True, timeout=120)
+    assert out.returncode == 0, out.stderr
+    heavy = json.loads(out.stdout.strip().splitlines()[-1])
+    assert heavy == [], f"путь инференса тянет {heavy} / the inference path pulls in {heavy} ({HEAVY_MODULES})"
+
+
+def test_auto_probe_without_cuda_does_not_import_torch(tmp_path):
+    (tmp_path / "torch.py").write_text(FAKE_TORCH, encoding="utf-8")
+    (tmp_path / "onnxruntime.py").write_text("__version__ = 'fake'\n", encoding="utf-8")
+    env = dict(os.environ, CUDA_VISIBLE_DEVICES="")  # Драйвер, если есть, не видит устройств / A driver, if any, sees no devices
+    out = subprocess.run([sys.executable, "-c", AUTO_PROBE, str(tmp_path)], cwd=SCRIPTS_DIR, env=env,
+                         capture_output=True, text=True, timeout=120)
+    assert out.returncode == 0, out.stderr
+    name, heavy = json.loads(out.stdout.strip().splitlines()[-1])
+    assert name == "onnx" and heavy == [], heavy
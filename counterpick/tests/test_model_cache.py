@@ -0,0 +1,45 @@
+import os
+
+from model_cache import artifact_path, store, weights_hash
+
+
+def _weights(tmp_path, data=b"weights-v1"):
+    path = tmp_path / "best.pt"
+    path.write_bytes(data)
+    return str(path)
+
+
+def _touch(path):
+    path.write_bytes(b"x")
+    return str(path)
+
+
+def test_hash_follows_content_not_mtime(tmp_path):
+    path = _weights(tmp_path)
+    first = weights_hash(path)
+    os.utime(path, (1, 1))  # Дата меняется, содержимое нет / Date changes, content does not
+    assert weights_hash(path) == first
+    _weights(tmp_path, b"weights-v2")
+    assert weights_hash(path) != first
+
+
+def test_artifact_path_is_keyed_by_hash_and_tag(tmp_path):
+    path = _weights(tmp_path)
+    onnx = artifact_path(path, "640.onnx")
+    assert os.path.dirname(onnx) == str(tmp_path / "model_cache")
+    assert os.path.basename(onnx) == f"best-{weights_hash(path)}.640.onnx"
+    assert artifact_path(path, "640.onnx", cache_dir=str(tmp_path / "c")).startswith(str(tmp_path / "c"))
+    assert artifact_path(path, "640.int8.onnx") != onnx
+
+
+def test_store_replaces_exports_of_previous_weights(tmp_path):
+    path = _weights(tmp_path)
+    old_export = tmp_path / "best.onnx"
+    old_export.write_bytes(b"old")
+    old = store(str(old_export), artifact_path(path, "640.onnx"))
+    other_tag = store(_touch(tmp_path / "q.onnx"), artifact_path(path, "640.int8.onnx"))
+
+    _weights(tmp_path, b"weights-v2")
+    new = store(_touch(tmp_path / "best.onnx"), artifact_path(path, "640.onnx"))
+    assert os.path.exists(new) and not os.path.exists(old)
+    assert os.path.exists(other_tag)  # Другой тег не трогаем / Other tags are kept
@@ -0,0 +1,123 @@
+import socket
+import sys
+import threading
+import time
+
+import pytest
+
+from overlay_channel import (
+    KIND_SNAPSHOT, KIND_STATE, KIND_TRACE, MessageDecoder, OverlayChannelClient, encode_message,
+)
+
+
+def _wait(cond, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not cond():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+def test_decoder_reassembles_chunked_stream():
+    stream = encode_message(KIND_STATE, 1, {"enabled": True, "detected": True}) + \
+        encode_message(KIND_SNAPSHOT, 2, [{"hero": "axe", "counters": ["lina"], "box": [1, 2, 3, 4]}])
+    dec = MessageDecoder()
+    got = []
+    for i in range(0, len(stream), 5):  # Мелкими кусками, как из сокета / Small chunks, as from a socket
+        got += dec.feed(stream[i:i + 5])
+    assert [(k, s) for k, s, _ in got] == [(KIND_STATE, 1), (KIND_SNAPSHOT, 2)]
+    assert got[1][2][0]["hero"] == "axe"
+
+
+def test_decoder_skips_unknown_version():
+    msg = bytearray(encode_message(KIND_STATE, 1, {}))
+    msg[0] = 99
+    dec = MessageDecoder()
+    assert dec.feed(bytes(msg) + encode_message(KIND_STATE, 2, {"detected": False})) == \
+        [(KIND_STATE, 2, {"detected": False})]
+    assert dec.skipped == 1
+
+
+@pytest.mark.skipif(sys.platform.startswith("win"), reason="Unix-сокет / Unix socket")
+def test_client_works_without_server_and_resends_latest_on_connect(tmp_path):
+    client = OverlayChannelClient(retry_interval=0)
+    client.path = str(tmp_path / "overlay.sock")
+    assert not client.send(KIND_SNAPSHOT, [1])      # Оверлея нет — не падаем / No overlay — no crash
+    client.send(KIND_TRACE, {"id": "t1", "t": 0.0})  # Не досылается: прилипла бы к чужому снапшоту / Not resent: would stick to another snapshot
+    assert not client.send(KIND_SNAPSHOT, [1, 2])
+    assert not client.send(KIND_STATE, {"detected": True})
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(client.path)
+    server.listen(1)
+    try:
+        conn, _ = server.accept()  # Поток записи подключается сам / The writer thread connects by itself
+        assert _wait(lambda: client.poll())
+        conn.settimeout(1)
+        dec, got = MessageDecoder(), []
+        while len(got) < 2:
+            got += dec.feed(conn.recv(4096))
+        assert [(k, p) for k, _, p in got] == [(KIND_SNAPSHOT, [1, 2]), (KIND_STATE, {"detected": True})]
+        conn.close()
+    finally:
+        client.close()
+        server.close()
+
+
+class _StuckPipe:
+    """Клиент канала, запись в который висит, как именованный канал зависшего оверлея.
+    A channel connection whose writes hang, like the named pipe of a hung overlay."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.written = []
+
+    def write(self, msg):
+        self.release.wait(5)
+        self.written.append(msg)
+
+    def close(self):
+        pass
+
+
+def test_hung_overlay_never_blocks_send():
+    pipe = _StuckPipe()
+    client = OverlayChannelClient(retry_interval=0)
+    client._connect = lambda: pipe
+    client.send(KIND_STATE, {"detected": True})
+    assert _wait(lambda: client.connected)
+
+    t0 = time.perf_counter()
+    for i in range(50):  # Оверлей не читает / The overlay does not read
+        client.send(KIND_SNAPSHOT, [i])
+    assert time.perf_counter() - t0 < 0.5
+    assert client.dropped >= 48  # Ждёт только последний снапшот / Only the latest snapshot waits
+
+    pipe.release.set()
+    assert client.flush(2.0)
+    dec = MessageDecoder()
+    got = [p for msg in pipe.written for _, _, p in dec.feed(msg)]
+    assert got[-1] == [49]
+    client.close()
+
+
+@pytest.mark.skipif(sys.platform.startswith("win"), reason="Unix-сокет / Unix socket")
+def test_server_that_never_reads_does_not_stall_the_sender(tmp_path):
+    client = OverlayChannelClient(retry_interval=0)
+    client.path = str(tmp_path / "overlay.sock")
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(client.path)
+    server.listen(1)
+    try:
+        client.poll()
+        conn, _ = server.accept()  # Принят, но не читается / Accepted, never read
+        big = [{"hero": "axe", "counters": ["x" * 1000] * 50, "box": [0, 0, 1, 1]}]
+        t0 = time.perf_counter()
+        for _ in range(200):
+            client.send(KIND_SNAPSHOT, big)
+        assert time.perf_counter() - t0 < 1.0
+        conn.close()
+    finally:
+        client.close()
+        server.close()
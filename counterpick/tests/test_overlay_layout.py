@@ -0,0 +1,91 @@
+import numpy as np
+
+from overlay_layout import SIDE_LEFT, SIDE_RIGHT, RetainedBlocks, compute_layout, zone_iou
+
+ZONES = ((100, 0, 200, 500), (300, 0, 400, 500))
+ARGS = dict(zones=ZONES, columns=(50, 450), icon_w=40, pad=4, height_ratio=0.5, buckets=(20, 40, 50))
+
+
+def test_zone_iou_matches_box_relative_overlap():
+    boxes = np.array([[100, 0, 200, 100], [150, 0, 250, 100], [0, 0, 0, 0]], dtype=float)
+    assert zone_iou(boxes, ZONES[0]).tolist() == [1.0, 0.5, 0.0]
+
+
+def test_sides_and_slots_are_assigned_in_one_pass():
+    boxes = [
+        [110, 10, 190, 90],    # Radiant, слот 0 / slot 0
+        [310, 205, 390, 290],  # Dire, слот 2 / slot 2
+        [600, 10, 700, 90],    # вне зон, прошлая сторона L / outside zones, previous side L
+    ]
+    table = compute_layout(boxes, [-1, -1, SIDE_LEFT], **ARGS)
+    assert table.side.tolist() == [SIDE_LEFT, SIDE_RIGHT, SIDE_LEFT]
+    assert table.slot.tolist() == [0, 2, 0]
+    assert table.x.tolist() == [8, 408, 8]
+    assert table.y.tolist() == [0, 200, 0]
+    assert table.icon_h.tolist() == [50, 50, 50]
+
+
+def test_box_noise_inside_a_slot_does_not_move_the_block():
+    a = compute_layout([[110, 103, 190, 195]], [-1], **ARGS)
+    b = compute_layout([[112, 108, 188, 190]], [-1], **ARGS)
+    assert (a.x[0], a.y[0], a.icon_h[0]) == (b.x[0], b.y[0], b.icon_h[0]) == (8, 100, 50)
+
+
+def test_box_outside_zone_height_keeps_its_own_geometry():
+    table = compute_layout([[110, 520, 190, 600]], [-1], **ARGS)
+    assert table.slot[0] == -1
+    assert table.y[0] == 520 and table.icon_h[0] == 40
+
+
+class _Blocks:
+    """RetainedBlocks с картинками-кортежами и счётчиком сборок / RetainedBlocks with tuple images and a compose counter."""
+
+    def __init__(self):
+        self.composed = 0
+
+        def compose(icon_w, icon_h, counters):
+            self.composed += 1
+            return ("image", icon_w, icon_h, counters, self.composed)  # Новый объект на каждую сборку / A new object per compose
+
+        self.retained = RetainedBlocks(compose, lambda image: (2 * image[1] + 4, 2 * image[2] + 4))
+
+    def set(self, data):
+        return self.retained.set_data(data, lambda boxes, prev: compute_layout(boxes, prev, **ARGS), icon_w=40)
+
+
+def _hero(name, box, counters=("lina", "zeus")):
+    return {"hero": name, "box": list(box), "counters": list(counters)}
+
+
+def test_identical_data_repaints_nothing():
+    blocks = _Blocks()
+    data = [_hero("axe", (110, 10, 190, 90))]
+    assert blocks.set(data) == [blocks.retained.blocks["axe"].rect]
+    assert blocks.set([dict(d) for d in data]) == [] and blocks.composed == 1
+
+
+def test_moved_hero_marks_old_and_new_rect_and_reuses_the_image():
+    blocks = _Blocks()
+    blocks.set([_hero("axe", (110, 10, 190, 90))])           # Radiant, слот 0 / slot 0
+    old = blocks.retained.blocks["axe"]
+    dirty = blocks.set([_hero("axe", (110, 210, 190, 290))])  # Radiant, слот 2 / slot 2
+    new = blocks.retained.blocks["axe"]
+    assert new.rect != old.rect and sorted(dirty) == sorted([old.rect, new.rect])
+    assert new.image is old.image and blocks.composed == 1   # Те же контрпики — та же картинка / Same counters — same image
+
+
+def test_removed_hero_marks_its_old_rect():
+    blocks = _Blocks()
+    blocks.set([_hero("axe", (110, 10, 190, 90)), _hero("lina", (310, 10, 390, 90))])
+    gone = blocks.retained.blocks["lina"].rect
+    assert blocks.set([_hero("axe", (110, 10, 190, 90))]) == [gone]
+    assert list(blocks.retained.blocks) == ["axe"]
+
+
+def test_unchanged_counters_reuse_the_image_changed_ones_recompose():
+    blocks = _Blocks()
+    blocks.set([_hero("axe", (110, 10, 190, 90)), _hero("lina", (310, 10, 390, 90))])
+    axe = blocks.retained.blocks["axe"]
+    dirty = blocks.set([_hero("axe", (110, 10, 190, 90)), _hero("lina", (310, 10, 390, 90), ("pudge",))])
+    assert blocks.retained.blocks["axe"].image is axe.image and blocks.composed == 3
+    assert dirty == [blocks.retained.blocks["lina"].rect] * 2  # Новая картинка на том же месте / A new image in the same place
@@ -0,0 +1,101 @@
+import json
+import threading
+
+import overlay_publisher
+from metrics import Metrics
+from overlay_publisher import OverlayPublisher
+
+
+def test_publisher_writes_latest_snapshot(tmp_path):
+    path = tmp_path / "overlay_data.json"
+    metrics = Metrics(str(tmp_path / "metrics.json"))
+    pub = OverlayPublisher(str(path), metrics=metrics).start()
+    try:
+        pub.submit([{"hero": "axe"}])
+        assert pub.flush(timeout=2)
+        assert json.loads(path.read_text(encoding="utf-8")) == [{"hero": "axe"}]
+        assert metrics.counters["overlay_writes"] == 1
+        assert "overlay_publish_latency_ms" in metrics.gauges
+    finally:
+        pub.close()
+
+
+def test_burst_is_coalesced_while_a_write_is_blocked(tmp_path, monkeypatch):
+    path = tmp_path / "overlay_data.json"
+    metrics = Metrics(str(tmp_path / "metrics.json"))
+    gate, entered = threading.Event(), threading.Event()
+    real_replace = overlay_publisher.robust_replace
+
+    def slow_replace(*args):
+        entered.set()
+        gate.wait(2)  # Оверлей держит файл / The overlay holds the file
+        return real_replace(*args)
+
+    monkeypatch.setattr(overlay_publisher, "robust_replace", slow_replace)
+    pub = OverlayPublisher(str(path), metrics=metrics).start()
+    try:
+        pub.submit([1])
+        assert entered.wait(2)
+        for i in range(2, 6):
+            pub.submit([i])       # Не блокирует цикл инференса / Does not block the inference loop
+        gate.set()
+        assert pub.flush(timeout=2)
+        assert json.loads(path.read_text(encoding="utf-8")) == [5]
+        assert metrics.counters["overlay_writes"] == 2
+        assert metrics.counters["overlay_coalesced"] == 3
+    finally:
+        pub.close()
+
+
+def test_close_writes_pending_snapshot(tmp_path):
+    path = tmp_path / "overlay_data.json"
+    pub = OverlayPublisher(str(path)).start()
+    pub.submit(["last"])
+    pub.close()
+    assert json.loads(path.read_text(encoding="utf-8")) == ["last"]
+
+
+def test_failed_snapshot_is_retried_after_a_backoff(tmp_path, monkeypatch):
+    path = tmp_path / "overlay_data.json"
+    metrics = Metrics(str(tmp_path / "metrics.json"))
+    real_replace = overlay_publisher.robust_replace
+    failures = [PermissionError("held by the overlay")]
+
+    def flaky_replace(*args):
+        if failures:
+            raise failures.pop()  # Все ретраи исчерпаны / All retries used up
+        return real_replace(*args)
+
+    monkeypatch.setattr(overlay_publisher, "robust_replace", flaky_replace)
+    pub = OverlayPublisher(str(path), metrics=metrics, backoff=0.05).start()
+    try:
+        pub.submit(["late draft"])  # Последний герой: новее снапшота не будет / The last hero: nothing newer will come
+        assert pub.flush(timeout=2)
+        assert json.loads(path.read_text(encoding="utf-8")) == ["late draft"]
+        assert metrics.counters["overlay_publish_failures"] == 1 and metrics.counters["overlay_writes"] == 1
+    finally:
+        pub.close()
+
+
+def test_newer_snapshot_replaces_a_failed_one(tmp_path, monkeypatch):
+    path = tmp_path / "overlay_data.json"
+    written = []
+    real_replace = overlay_publisher.robust_replace
+    pub = OverlayPublisher(str(path), backoff=5.0)
+
+    def failing_once(*args):
+        if not written:
+            written.append("failed")
+            pub.submit(["newer"])  # Пришёл, пока запись падала / Arrived while the write was failing
+            raise PermissionError("held by the overlay")
+        written.append(json.loads(open(args[0], encoding="utf-8").read()))
+        return real_replace(*args)
+
+    monkeypatch.setattr(overlay_publisher, "robust_replace", failing_once)
+    pub.start()
+    try:
+        pub.submit(["older"])
+        assert pub.flush(timeout=2)  # Без паузы в 5 с: новый снапшот её прерывает / No 5 s pause: the new snapshot cuts it
+        assert written == ["failed", ["newer"]]
+    finally:
+        pub.close()
@@ -0,0 +1,49 @@
+from pick_zones import (
+    DIRE_ZONE, RADIANT_ZONE, ROI_MARGIN_X, aspect_name, expand, layout_for, pick_rois, pick_slots, scale_rect,
+    slot_strips,
+)
+
+
+def test_1080p_layout_is_the_reference_geometry():
+    layout = layout_for(1920, 1080)
+    assert layout.aspect == "16:9"
+    assert layout.work == (1920, 1080) and layout.scale == 1.0
+    assert layout.zones == (RADIANT_ZONE, DIRE_ZONE)
+    assert pick_rois() == [expand(RADIANT_ZONE, ROI_MARGIN_X, 15), expand(DIRE_ZONE, ROI_MARGIN_X, 15)]
+
+
+def test_higher_resolutions_share_the_working_frame():
+    for w, h in ((2560, 1440), (3840, 2160)):
+        layout = layout_for(w, h)
+        assert layout.work == (1920, 1080)
+        assert layout.zones == (RADIANT_ZONE, DIRE_ZONE)
+        assert scale_rect(layout.radiant_zone, layout.scale)[3] == round(RADIANT_ZONE[3] * h / 1080)
+
+
+def test_aspect_classes_and_centre_anchoring():
+    assert aspect_name(1920, 1200) == "16:10"
+    assert aspect_name(3440, 1440) == "21:9"
+
+    wide = layout_for(2560, 1080)
+    assert wide.work == (2560, 1080)
+    assert wide.radiant_zone[0] - RADIANT_ZONE[0] == 320      # Сдвиг к центру / Shift to the centre
+    assert wide.radiant_zone[1] == RADIANT_ZONE[1]
+
+    tall = layout_for(1920, 1200)
+    assert tall.work == (1728, 1080)
+    assert tall.radiant_zone == (RADIANT_ZONE[0] - 96, RADIANT_ZONE[1], RADIANT_ZONE[2] - 96, RADIANT_ZONE[3])
+
+
+def test_small_screens_are_not_upscaled():
+    layout = layout_for(1600, 900)
+    assert layout.work == (1600, 900) and layout.scale == 1.0
+    assert layout.radiant_zone[3] == round(RADIANT_ZONE[3] * 900 / 1080)
+
+
+def test_slots_tile_the_zones_and_strips_merge_neighbours():
+    layout = layout_for(1920, 1080)
+    slots = pick_slots(layout)
+    assert len(slots) == 10 and slots[0] == (1465, 215, 1540, 315) and slots[4][3] == RADIANT_ZONE[3]
+    assert slot_strips(slots, range(10), layout.roi_margin) == pick_rois(layout)  # Всё открыто — как раньше / All open — as before
+    # Соседи сливаются, граница колонок — нет / Neighbours merge, the column boundary does not
+    assert slot_strips(slots, [3, 4, 5, 9]) == [(1465, 515, 1540, 715), (1575, 215, 1650, 315), (1575, 615, 1650, 715)]
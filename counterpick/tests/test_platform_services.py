@@ -0,0 +1,21 @@
+import os
+import sys
+
+from platform_services import DetectorPaths, NullLock, default_services
+
+
+def test_paths_live_under_base_dir(tmp_path):
+    paths = DetectorPaths.under(str(tmp_path))
+    assert paths.base_dir == str(tmp_path)
+    assert paths.save_dir == os.path.join(str(tmp_path), "tmp_screenshots")
+    assert os.path.basename(paths.state) == "overlay_state.json"
+    assert all(p.startswith(str(tmp_path)) for p in paths)
+
+
+def test_default_services_without_winapi(tmp_path):
+    services = default_services(r"Global\TEST_MUTEX", base_dir=str(tmp_path))
+    assert services.paths == DetectorPaths.under(str(tmp_path))
+    if not sys.platform.startswith("win"):
+        assert isinstance(services.lock, NullLock)
+        assert services.lock.acquire()
+        services.lock.release()
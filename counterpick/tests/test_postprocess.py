@@ -0,0 +1,40 @@
+import numpy as np
+
+from counter_index import CounterIndex
+from postprocess import best_per_class, build_snapshot
+
+NAMES = {0: "axe", 1: "lina", 2: "io"}
+COUNTERS = {"axe": ["lina", "io", "pudge", "sniper", "zeus"], "lina": ["axe"], "io": []}
+
+
+def _table():
+    return CounterIndex([{"hero": h, "counters": cs} for h, cs in COUNTERS.items()], NAMES).class_table(top=4)
+
+
+def test_best_per_class_applies_height_filter_and_max_confidence():
+    xyxy = np.array([
+        [0, 0, 10, 40],   # axe 0.5
+        [0, 0, 10, 40],   # axe 0.9 — лучший / best
+        [0, 0, 10, 20],   # lina 0.99 — ниже MIN_HEIGHT / below MIN_HEIGHT
+        [0, 0, 10, 35],   # lina 0.3
+    ], dtype=np.float32)
+    conf = np.array([0.5, 0.9, 0.99, 0.3], dtype=np.float32)
+    cls = np.array([0, 0, 1, 1])
+
+    assert sorted(best_per_class(xyxy, conf, cls, 30).tolist()) == [1, 3]
+
+
+def test_snapshot_drops_heroes_without_counters():
+    xyxy = np.array([[1.9, 2.7, 50.2, 60.9], [0, 0, 10, 40]], dtype=np.float32)
+    conf = np.array([0.8, 0.9], dtype=np.float32)
+    cls = np.array([0, 2])
+    table = _table()
+
+    snap = build_snapshot(xyxy, conf, cls, NAMES, table, 30)
+    assert snap == [{"hero": "axe", "counters": ["lina", "io", "pudge", "sniper"], "box": [1, 2, 50, 60]}]
+
+
+def test_empty_frame():
+    empty = np.zeros((0, 4), np.float32)
+    table = _table()
+    assert build_snapshot(empty, np.zeros(0, np.float32), np.zeros(0, np.int64), NAMES, table, 30) == []
@@ -0,0 +1,48 @@
+import sys
+from pathlib import Path
+
+from counter_index import CounterIndex
+from detector_core import Detector
+from inference_backends import empty_detections
+
+BENCH_DIR = Path(__file__).resolve().parents[1] / "benchmarks"
+FIXTURES = Path(__file__).resolve().parent / "fixtures" / "screenshots_sample"
+if str(BENCH_DIR) not in sys.path:
+    sys.path.insert(0, str(BENCH_DIR))
+
+import replay_bench  # noqa: E402
+
+
+class StubBackend:
+    """Бэкенд без модели: харнесс гоняется без best.pt / A model-free backend: the harness runs without best.pt."""
+    name, names = "stub", {0: "abaddon"}
+
+    def __init__(self):
+        self.frames = 0
+
+    def describe(self):
+        return "stub"
+
+    def predict_batch(self, sources):
+        self.frames += len(sources)
+        return [empty_detections() for _ in sources]
+
+
+def test_replay_over_a_raw_corpus_reports_every_stage(tmp_path):
+    paths = replay_bench.build_corpus(str(FIXTURES), 3, "raw", str(tmp_path))
+    assert len(paths) == 3 and all(p.endswith(".raw") for p in paths)
+
+    backend = StubBackend()
+    detector = Detector(backend, CounterIndex.from_json(str(Path(replay_bench.ROOT) / "scripts_for_help" / "counters.json")))
+    wall, records = replay_bench.replay(detector, paths, batch=2)
+    assert wall > 0 and backend.frames == 3
+
+    row = replay_bench.result_row(backend, 640, 2, "roi", 0.0, len(paths), wall, records)
+    assert list(row["stages"])[:4] == ["decode", "roi", "infer", "postprocess"]
+    assert all(row["stages"][s]["count"] == 3 for s in ("decode", "roi", "infer", "postprocess"))
+    assert row["frames"] == 3 and row["fps"] > 0
+
+    # Отчёт сравнивается сам с собой: ключ совпадает, изменение 0% / A report against itself: the key matches, 0% change
+    lines = replay_bench.compare([row], {"meta": {"commit": "abc"}, "results": [row]})
+    assert len(lines) == 1 and lines[0].startswith("vs abc: stub imgsz 640 batch 2") and "+0.0%" in lines[0]
+    assert replay_bench.compare([row], {"results": [dict(row, batch=4)]}) == []
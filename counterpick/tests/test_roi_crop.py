@@ -0,0 +1,42 @@
+import numpy as np
+
+from pick_zones import pick_rois
+from roi_crop import STACK_GAP, boxes_to_screen, stack_rois
+
+
+def test_stack_rois_copies_pixels_side_by_side():
+    img = np.arange(100 * 200, dtype=np.uint32).reshape(100, 200)
+    canvas, placements = stack_rois(img, [(10, 20, 30, 60), (100, 10, 140, 40)])
+
+    assert canvas.shape == (40, 20 + STACK_GAP + 40)
+    assert np.array_equal(canvas[:40, :20], img[20:60, 10:30])
+    p = placements[1]
+    assert np.array_equal(canvas[:30, p.canvas_x:p.canvas_x + 40], img[10:40, 100:140])
+
+
+def test_stack_rois_clamps_to_frame():
+    img = np.zeros((50, 50, 3), dtype=np.uint8)
+    canvas, placements = stack_rois(img, [(40, 40, 80, 80), (60, 60, 90, 90)])
+    assert len(placements) == 1, "ROI вне кадра должен отбрасываться"
+    assert canvas.shape == (10, 10, 3)
+
+
+def test_boxes_map_back_to_screen():
+    img = np.zeros((1080, 1920, 3), dtype=np.uint8)
+    canvas, placements = stack_rois(img, pick_rois())
+    radiant, dire = placements
+
+    canvas_boxes = np.array([
+        [5, 100, 60, 150],                                   # в кропе Radiant / in Radiant crop
+        [dire.canvas_x + 10, 200, dire.canvas_x + 70, 260],  # в кропе Dire / in Dire crop
+    ], dtype=np.float32)
+    screen = boxes_to_screen(canvas_boxes, placements)
+
+    assert screen[0].tolist() == [radiant.src_x + 5, radiant.src_y + 100, radiant.src_x + 60, radiant.src_y + 150]
+    assert screen[1].tolist() == [dire.src_x + 10, dire.src_y + 200, dire.src_x + 70, dire.src_y + 260]
+
+
+def test_roi_canvas_is_much_smaller_than_frame():
+    img = np.zeros((1080, 1920, 3), dtype=np.uint8)
+    canvas, _ = stack_rois(img, pick_rois())
+    assert canvas.shape[0] * canvas.shape[1] * 10 < img.shape[0] * img.shape[1]
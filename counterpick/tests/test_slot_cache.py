@@ -0,0 +1,67 @@
+import numpy as np
+
+from frame_codec import DecodedFrame
+from pick_zones import pick_slots
+from slot_cache import SlotCache, hamming, slot_hash
+
+
+def _screen(seed=0):
+    rng = np.random.default_rng(seed)
+    return DecodedFrame(rng.integers(0, 255, (1080, 1920, 3), dtype=np.uint8), (0, 0), (1920, 1080))
+
+
+def _boxes(*slot_ids, conf=0.9):
+    slots = pick_slots()
+    xyxy = np.array([slots[i] for i in slot_ids], np.float32).reshape(-1, 4)
+    return xyxy, np.full(len(slot_ids), conf, np.float32), np.arange(len(slot_ids), dtype=np.int64)
+
+
+def test_hash_ignores_brightness_but_not_a_new_portrait():
+    img = _screen().image[215:315, 1465:1540]
+    brighter = np.clip(img.astype(np.int16) + 6, 0, 255).astype(np.uint8)
+    assert hamming(slot_hash(img), slot_hash(brighter)) <= 6
+    other = _screen(1).image[215:315, 1465:1540]
+    assert hamming(slot_hash(img), slot_hash(other)) > 6
+
+
+def test_slot_locks_after_confirmed_passes_and_skips_the_model():
+    cache, slots, frame = SlotCache(lock_conf=0.8, confirm=2), pick_slots(), _screen()
+    for expect_locked in ([], [0, 3]):
+        plan = cache.plan(frame, slots)
+        assert plan.inferred == tuple(range(10))
+        assert cache.observe(plan, slots, *_boxes(0, 3)) == expect_locked
+
+    plan = cache.plan(frame, slots)
+    assert plan.inferred == (1, 2, 4, 5, 6, 7, 8, 9) and plan.cached == 2
+
+
+def test_low_confidence_or_broken_streak_does_not_lock():
+    cache, slots, frame = SlotCache(lock_conf=0.8, confirm=2), pick_slots(), _screen()
+    cache.observe(cache.plan(frame, slots), slots, *_boxes(0, conf=0.5))
+    cache.observe(cache.plan(frame, slots), slots, *_boxes(0, conf=0.5))
+    assert cache.locked() == {}
+
+    cache.observe(cache.plan(frame, slots), slots, *_boxes(0))
+    cache.observe(cache.plan(frame, slots), slots, *_boxes())  # Слот пуст — серия прервана / Slot empty — streak broken
+    cache.observe(cache.plan(frame, slots), slots, *_boxes(0))
+    assert cache.locked() == {}
+
+
+def test_changed_fingerprint_unlocks_and_reset_clears():
+    cache, slots, frame = SlotCache(confirm=1), pick_slots(), _screen()
+    cache.observe(cache.plan(frame, slots), slots, *_boxes(*range(10)))
+    assert cache.plan(frame, slots).inferred == ()
+
+    changed = frame.image.copy()
+    changed[415:515, 1465:1540] = _screen(2).image[415:515, 1465:1540]  # Новый портрет в слоте 2 / New portrait in slot 2
+    assert cache.plan(DecodedFrame(changed, (0, 0), (1920, 1080)), slots).inferred == (2,)
+    assert 2 not in cache.locked()
+
+    cache.reset()
+    assert cache.plan(frame, slots).inferred == tuple(range(10))
+
+
+def test_region_frames_hash_like_full_frames():
+    cache, slots, frame = SlotCache(), pick_slots(), _screen()
+    region = DecodedFrame(frame.image[200:730, 1400:1700].copy(), (1400, 200), (1920, 1080))
+    assert cache.fingerprints(region, slots) == cache.fingerprints(frame, slots)
@@ -0,0 +1,30 @@
+import time
+
+from startup_profile import StartupProfile
+
+
+class _Gauges:
+    def __init__(self):
+        self.gauges = {}
+
+    def set(self, name, value):
+        self.gauges[name] = value
+
+
+def test_phases_add_up_to_ready():
+    profile = StartupProfile(time.perf_counter() - 0.05)  # 50 мс импортов до профиля / 50 ms of imports before the profile
+    profile.since_start("import")
+    with profile.phase("load"):
+        time.sleep(0.01)
+    profile.add("warmup", 5.0)
+    profile.since_start("setup")
+    ready = profile.ready()
+
+    assert list(profile.phases) == ["import", "load", "warmup", "setup"]
+    assert profile.phases["import"] >= 50.0 and profile.phases["load"] >= 10.0
+    assert abs(sum(profile.phases.values()) - ready) < 5.0
+    assert "ready" in profile.format().splitlines()[-1]
+
+    metrics = _Gauges()
+    profile.publish(metrics)
+    assert metrics.gauges["startup_warmup_ms"] == 5.0 and metrics.gauges["startup_ready_ms"] == round(ready, 1)